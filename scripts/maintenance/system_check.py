@@ -204,15 +204,17 @@ class SystemChecker:
             else:
                 self.log_warning(f"Missing template: {template}")
 
-        # Check data files (optional at this stage)
-        data_files = ["data/faces_data.pkl", "data/names.pkl"]
-        for data_file in data_files:
-            if os.path.exists(data_file):
-                self.log_success(f"Found training data: {data_file}")
-            else:
-                self.log_info(
-                    f"Training data not found: {data_file} (run add_faces_rpi.py first)"
-                )
+        # Check data files (optional at this stage); the gallery store, or
+        # the legacy pickles it is imported from
+        if os.path.exists("data/gallery/manifest.json"):
+            self.log_success("Found training data: data/gallery/")
+        elif all(
+            os.path.exists(data_file)
+            for data_file in ["data/faces_data.pkl", "data/names.pkl"]
+        ):
+            self.log_success("Found training data: data/faces_data.pkl, data/names.pkl")
+        else:
+            self.log_info("Training data not found (run add_faces_rpi.py first)")
 
         print()
 
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+ANN Index Benchmark for Face Recognition Attendance System
+Compares exact matching with the LSH index for several probe counts,
+reporting per-face latency, nearest-neighbour recall and top-1 agreement
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmark_utils import make_feature_gallery, time_call
+from face_ann import LSHIndex
+from face_matcher import FaceMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact vs LSH approximate search")
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    parser.add_argument("--dims", type=int, default=128, help="Feature dimensions")
+    parser.add_argument("--tables", type=int, default=8)
+    parser.add_argument("--bits", type=int, default=12)
+    parser.add_argument("--probes", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    features, label_ids, names, queries = make_feature_gallery(
+        args.people, args.samples_per_person, args.dims
+    )
+    queries = queries[: args.queries]
+    exact = FaceMatcher(n_neighbors=5).fit_encoded(features, label_ids, names)
+    exact_names = [r[0] for r in exact.match_batch(queries)]
+    true_nearest = np.argmin(exact.squared_distances(queries), axis=1)
+    exact_ms = time_call(lambda: exact.match_batch(queries[:1]), args.repeats)
+
+    index = LSHIndex(args.tables, args.bits).build(features)
+    print(
+        f"🧪 Gallery: {args.people} people, {len(label_ids)} samples, "
+        f"{args.dims} dims; LSH {args.tables} tables x {args.bits} bits"
+    )
+
+    print("\n⏱️  Exact vs LSH search (median ms per face)")
+    print("=" * 66)
+    print(
+        f"{'mode':>10} | {'ms/face':>8} | {'speedup':>7} | "
+        f"{'candidates':>10} | {'NN recall':>9} | {'top-1':>6}"
+    )
+    print("-" * 66)
+    print(
+        f"{'exact':>10} | {exact_ms:>8.3f} | {'1.0x':>7} | "
+        f"{len(label_ids):>10} | {'100.0%':>9} | {'100.0%':>6}"
+    )
+
+    for n_probes in args.probes:
+        index.n_probes = n_probes
+        approx = FaceMatcher(n_neighbors=5).fit_encoded(
+            features, label_ids, names, centroids=exact.centroids
+        )
+        approx.ann_index = index
+
+        candidates = index.query(queries)
+        recall = np.mean([t in rows for t, rows in zip(true_nearest, candidates)])
+        mean_candidates = np.mean([len(rows) for rows in candidates])
+        approx_names = [r[0] for r in approx.match_batch(queries)]
+        agreement = np.mean([a == b for a, b in zip(exact_names, approx_names)])
+        approx_ms = time_call(lambda: approx.match_batch(queries[:1]), args.repeats)
+
+        print(
+            f"{'probes=' + str(n_probes):>10} | {approx_ms:>8.3f} | "
+            f"{exact_ms / max(approx_ms, 1e-9):>6.1f}x | {mean_candidates:>10.0f} | "
+            f"{recall * 100:>8.1f}% | {agreement * 100:>5.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
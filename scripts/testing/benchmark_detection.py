@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Face Detection Benchmark for Face Recognition Attendance System
+Times the Haar cascade on the kiosk's 800x480 frame at several detection
+widths and reports recall against full-resolution detection
+"""
+
+import argparse
+import glob
+
+import cv2
+import numpy as np
+
+from benchmark_utils import PROJECT_ROOT, box_recall, time_call
+from face_detector import CASCADE_WINDOW, FaceDetector
+
+FRAME_SIZE = (800, 480)  # what the kiosk resizes camera frames to
+
+
+def load_frames(patterns, zooms, camera=None, camera_frames=0):
+    """Kiosk-sized frames from image files (centre-cropped at each zoom
+    level, to vary face sizes) and optionally from a camera"""
+    frames = []
+    for path in sorted({p for pattern in patterns for p in glob.glob(pattern)}):
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        height, width = image.shape[:2]
+        for zoom in zooms:
+            crop_w, crop_h = int(width / zoom), int(height / zoom)
+            x, y = (width - crop_w) // 2, (height - crop_h) // 2
+            frames.append(
+                cv2.resize(image[y : y + crop_h, x : x + crop_w], FRAME_SIZE)
+            )
+
+    if camera is not None:
+        video = cv2.VideoCapture(camera)
+        for _ in range(camera_frames):
+            ret, frame = video.read()
+            if ret:
+                frames.append(cv2.resize(frame, FRAME_SIZE))
+        video.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detection cost per resolution")
+    parser.add_argument(
+        "--images",
+        nargs="+",
+        default=[str(PROJECT_ROOT / "assets" / "*.png")],
+        help="Image files or glob patterns to use as frames (captures of "
+        "people at the kiosk give meaningful recall)",
+    )
+    parser.add_argument("--zooms", type=float, nargs="+", default=[1, 1.5, 2, 3])
+    parser.add_argument("--camera", type=int, help="Also grab frames from this camera")
+    parser.add_argument("--camera-frames", type=int, default=30)
+    parser.add_argument("--widths", type=int, nargs="+", default=[640, 480, 400, 320, 240])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    frames = load_frames(args.images, args.zooms, args.camera, args.camera_frames)
+    if not frames:
+        print("❌ No frames to benchmark, pass --images or --camera")
+        return
+
+    full = FaceDetector()
+    reference = [full.detect(frame) for frame in frames]
+    n_faces = sum(len(boxes) for boxes in reference)
+    print(
+        f"\n🔍 {len(frames)} frames at {FRAME_SIZE[0]}x{FRAME_SIZE[1]}, "
+        f"{n_faces} faces found at full resolution"
+    )
+    print("=" * 66)
+    print(
+        f"{'detect size':>11} | {'ms/frame':>8} | {'speedup':>7} | "
+        f"{'recall':>6} | {'extra':>5} | {'min face px':>11}"
+    )
+    print("-" * 66)
+
+    full_ms = None
+    for width in [0] + sorted(set(args.widths), reverse=True):
+        detector = full if width == 0 else FaceDetector(detect_width=width)
+        ms = float(
+            np.mean([time_call(lambda: detector.detect(f), args.repeats) for f in frames])
+        )
+        full_ms = full_ms or ms
+
+        detections = [detector.detect(frame) for frame in frames]
+        found = sum(box_recall(ref, det) for ref, det in zip(reference, detections))
+        extra = sum(
+            len(det) - box_recall(det, ref) for ref, det in zip(reference, detections)
+        )
+
+        size = detector.detection_size(frames[0].shape)
+        min_face = max(
+            detector.min_size[0], int(np.ceil(CASCADE_WINDOW * FRAME_SIZE[0] / size[0]))
+        )
+        print(
+            f"{size[0]:>5}x{size[1]:<5} | {ms:>8.2f} | {full_ms / ms:>6.1f}x | "
+            f"{(found / n_faces * 100 if n_faces else 0):>5.0f}% | {extra:>5} | "
+            f"{min_face:>11}"
+        )
+
+    print(
+        "\n💡 recall: full-resolution faces also found at this size (IoU >= 0.5); "
+        "extra: detections with no full-resolution match"
+    )
+
+
+if __name__ == "__main__":
+    main()
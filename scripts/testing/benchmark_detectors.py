@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Face Detector Backend Benchmark for Face Recognition Attendance System
+Times every detector backend (Haar, LBP, YuNet, SSD) on the same frames and
+reports recall against hand-annotated face boxes
+
+Usage: python benchmark_detectors.py --images "frames/*.jpg" --annotations boxes.csv
+"""
+
+import argparse
+import csv
+import glob
+from pathlib import Path
+
+import cv2
+
+from benchmark_utils import PROJECT_ROOT, box_recall, time_call
+from face_detector import DETECTOR_BACKENDS, FaceDetector, get_detector_backend
+
+FRAME_WIDTH = 800  # the kiosk's frame width
+
+
+def load_annotations(path):
+    """{image file name: [(x, y, w, h), ...]} from an IMAGE,X,Y,W,H csv"""
+    boxes = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            boxes.setdefault(Path(row["IMAGE"]).name, []).append(
+                tuple(int(float(row[k])) for k in ("X", "Y", "W", "H"))
+            )
+    return boxes
+
+
+def load_frames(patterns, annotations):
+    """[(name, frame, boxes)] resized to the kiosk's frame width; images
+    without annotation rows are frames without faces"""
+    frames = []
+    for path in sorted({p for pattern in patterns for p in glob.glob(pattern)}):
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        scale = FRAME_WIDTH / image.shape[1]
+        frame = cv2.resize(image, (FRAME_WIDTH, round(image.shape[0] * scale)))
+        boxes = [
+            tuple(round(v * scale) for v in box)
+            for box in annotations.get(Path(path).name, [])
+        ]
+        frames.append((Path(path).name, frame, boxes))
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare face detector backends")
+    parser.add_argument(
+        "--images",
+        nargs="+",
+        required=True,
+        help="Image files or glob patterns (captures from the kiosk camera work best)",
+    )
+    parser.add_argument(
+        "--annotations",
+        required=True,
+        help="CSV with one IMAGE,X,Y,W,H row per true face box",
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(DETECTOR_BACKENDS), default=list(DETECTOR_BACKENDS)
+    )
+    parser.add_argument("--detect-width", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    annotations = load_annotations(args.annotations)
+    frames = load_frames(args.images, annotations)
+    if not frames:
+        print("❌ No images found for --images")
+        return
+    unmatched = set(annotations) - {name for name, _, _ in frames}
+    if unmatched:
+        print(f"⚠️  {len(unmatched)} annotated images not among --images")
+
+    model_dir = PROJECT_ROOT / "data" / "detectors"
+    detectors = {}
+    for name in args.backends:
+        try:
+            detectors[name] = FaceDetector(
+                get_detector_backend(name, model_dir), detect_width=args.detect_width
+            )
+        except (FileNotFoundError, cv2.error) as e:
+            print(f"⏭️  Skipping {name}: {e}")
+
+    reference = [boxes for _, _, boxes in frames]
+    n_faces = sum(len(boxes) for boxes in reference)
+
+    print(f"\n🔍 {len(frames)} frames, {FRAME_WIDTH} px wide, {n_faces} annotated faces")
+    print("=" * 58)
+    print(
+        f"{'backend':>8} | {'ms/frame':>8} | {'recall':>6} | "
+        f"{'extra':>5} | {'extra/frame':>11}"
+    )
+    print("-" * 58)
+    for name, detector in detectors.items():
+        ms = sum(
+            time_call(lambda: detector.detect(frame), args.repeats)
+            for _, frame, _ in frames
+        ) / len(frames)
+        detections = [detector.detect(frame) for _, frame, _ in frames]
+        found = sum(box_recall(ref, det) for ref, det in zip(reference, detections))
+        extra = sum(
+            len(det) - box_recall(det, ref) for ref, det in zip(reference, detections)
+        )
+        recall = f"{found / n_faces * 100:>5.0f}%" if n_faces else f"{'-':>6}"
+        print(
+            f"{name:>8} | {ms:>8.2f} | {recall} | {extra:>5} | "
+            f"{extra / len(frames):>11.2f}"
+        )
+
+    print(
+        "\n💡 Set the fastest backend with acceptable recall as DETECTOR in "
+        "config/config.ini"
+    )
+
+
+if __name__ == "__main__":
+    main()
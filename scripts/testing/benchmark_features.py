@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Feature Extractor Benchmark for Face Recognition Attendance System
+Compares held-out accuracy, extraction cost and matching cost of every
+registered feature extractor on the same gallery
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmark_utils import load_gallery, split_holdout, time_call
+from face_features import FEATURE_EXTRACTORS, SAMPLE_EXTRACTOR, get_feature_extractor
+from face_matcher import FaceMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature extractor comparison")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument(
+        "--synthetic-people",
+        type=int,
+        default=0,
+        help="Use a synthetic gallery with this many people instead of data/",
+    )
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    args = parser.parse_args()
+
+    faces, names = load_gallery(args.synthetic_people, args.samples_per_person)
+    train_faces, train_names, test_faces, test_names = split_holdout(faces, names)
+
+    # Gallery samples are stored as raw BGR crops; rebuild the images
+    width, height = get_feature_extractor(SAMPLE_EXTRACTOR).image_size
+    train_images = train_faces.astype(np.uint8).reshape(-1, height, width, 3)
+    test_images = test_faces.astype(np.uint8).reshape(-1, height, width, 3)
+
+    print("\n⏱️  Feature extractor comparison")
+    print("=" * 62)
+    print(
+        f"{'extractor':>10} | {'dims':>5} | {'accuracy':>8} | "
+        f"{'extract ms':>10} | {'match ms':>8}"
+    )
+    print("-" * 62)
+
+    for name in FEATURE_EXTRACTORS:
+        extractor = get_feature_extractor(name)
+        matcher = FaceMatcher(n_neighbors=5).fit(
+            extractor.extract_batch(train_images), train_names
+        )
+        test_features = extractor.extract_batch(test_images)
+        results = matcher.match_batch(test_features)
+        accuracy = np.mean([r[0] == n for r, n in zip(results, test_names)])
+
+        extract_ms = time_call(lambda: extractor.extract(test_images[0]), args.repeats)
+        match_ms = time_call(lambda: matcher.match(test_features[0]), args.repeats)
+        print(
+            f"{name:>10} | {extractor.dims:>5} | {accuracy * 100:>7.1f}% | "
+            f"{extract_ms:>10.3f} | {match_ms:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Gallery Storage Benchmark for Face Recognition Attendance System
+Compares a float32 raw-pixel gallery with the uint8 one the model artifact
+now keeps, reporting resident gallery size, per-face latency and agreement
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmark_utils import make_synthetic_gallery, time_call
+from face_matcher import FaceMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="float32 vs uint8 gallery")
+    parser.add_argument("--rosters", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument(
+        "--queries", type=int, default=200, help="Queries used to measure agreement"
+    )
+    args = parser.parse_args()
+
+    print("\n💾 float32 vs uint8 raw-pixel gallery (exhaustive search)")
+    print("=" * 76)
+    print(
+        f"{'people':>7} | {'float32 MB':>10} | {'uint8 MB':>8} | "
+        f"{'float32 ms':>10} | {'uint8 ms':>8} | {'agreement':>9}"
+    )
+    print("-" * 76)
+
+    for people in args.rosters:
+        faces, names = make_synthetic_gallery(people, args.samples_per_person)
+        float_matcher = FaceMatcher(n_neighbors=5).fit(faces.astype(np.float32), names)
+        uint8_matcher = FaceMatcher(n_neighbors=5).fit(faces, names)
+
+        query = faces[:1]
+        float_ms = time_call(lambda: float_matcher.match_batch(query), args.repeats)
+        uint8_ms = time_call(lambda: uint8_matcher.match_batch(query), args.repeats)
+
+        sample = faces[:: max(1, len(faces) // args.queries)]
+        full = [r[0] for r in float_matcher.match_batch(sample)]
+        compact = [r[0] for r in uint8_matcher.match_batch(sample)]
+        agreement = np.mean([a == b for a, b in zip(full, compact)])
+
+        print(
+            f"{people:>7} | {float_matcher.gallery.nbytes / 1e6:>10.1f} | "
+            f"{uint8_matcher.gallery.nbytes / 1e6:>8.1f} | {float_ms:>10.3f} | "
+            f"{uint8_ms:>8.3f} | {agreement * 100:>8.1f}%"
+        )
+
+    per_person = args.samples_per_person * faces.shape[1]
+    print(
+        f"\n📐 3000 people x {args.samples_per_person} samples: "
+        f"{3000 * per_person * 4 / 1e6:.0f} MB as float32, "
+        f"{3000 * per_person / 1e6:.0f} MB as uint8"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Candidate Prefilter Benchmark for Face Recognition Attendance System
+Compares exhaustive matching with centroid-prefiltered matching as the
+roster grows, on synthetic projected (PCA-sized) feature galleries
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmark_utils import make_feature_gallery, time_call
+from face_matcher import FaceMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exhaustive vs prefiltered matching")
+    parser.add_argument(
+        "--rosters", type=int, nargs="+", default=[100, 1000, 10000]
+    )
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    parser.add_argument("--dims", type=int, default=128, help="Feature dimensions")
+    parser.add_argument(
+        "--candidates", type=int, default=10, help="People kept by the coarse stage"
+    )
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument(
+        "--queries", type=int, default=200, help="Queries used to measure agreement"
+    )
+    args = parser.parse_args()
+
+    print("\n⏱️  Exhaustive vs centroid-prefiltered matching (median ms per face)")
+    print("=" * 72)
+    print(
+        f"{'people':>7} | {'samples':>8} | {'exhaustive':>10} | "
+        f"{'prefilter':>9} | {'speedup':>7} | {'agreement':>9}"
+    )
+    print("-" * 72)
+
+    for people in args.rosters:
+        features, label_ids, names, queries = make_feature_gallery(
+            people, args.samples_per_person, args.dims
+        )
+        exhaustive = FaceMatcher(n_neighbors=5).fit_encoded(features, label_ids, names)
+        prefiltered = FaceMatcher(
+            n_neighbors=5, candidate_people=args.candidates
+        ).fit_encoded(features, label_ids, names, centroids=exhaustive.centroids)
+
+        query = queries[:1]
+        exhaustive_ms = time_call(lambda: exhaustive.match_batch(query), args.repeats)
+        prefilter_ms = time_call(lambda: prefiltered.match_batch(query), args.repeats)
+
+        # How often the prefilter returns the same person as the full search
+        sample = queries[: args.queries]
+        full = [r[0] for r in exhaustive.match_batch(sample)]
+        fast = [r[0] for r in prefiltered.match_batch(sample)]
+        agreement = np.mean([a == b for a, b in zip(full, fast)])
+
+        print(
+            f"{people:>7} | {len(label_ids):>8} | {exhaustive_ms:>10.3f} | "
+            f"{prefilter_ms:>9.3f} | {exhaustive_ms / max(prefilter_ms, 1e-9):>6.1f}x | "
+            f"{agreement * 100:>8.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
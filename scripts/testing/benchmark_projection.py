@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Projection Benchmark for Face Recognition Attendance System
+Compares accuracy, per-face latency and gallery memory of raw-pixel matching
+against PCA (eigenface) projections of different sizes
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmark_utils import load_gallery, split_holdout, time_call
+from face_matcher import FaceMatcher
+from face_projection import PCAProjection
+
+
+def evaluate(matcher, test_faces, test_names, repeats):
+    """Held-out accuracy and median per-face match latency"""
+    results = matcher.match_batch(test_faces)
+    correct = sum(result[0] == name for result, name in zip(results, test_names))
+    accuracy = correct / max(len(test_names), 1)
+    latency_ms = time_call(lambda: matcher.match(test_faces[0]), repeats)
+    return accuracy, latency_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw pixels vs PCA projection")
+    parser.add_argument(
+        "--dims",
+        type=int,
+        nargs="+",
+        default=[32, 64, 100, 150],
+        help="PCA sizes to compare",
+    )
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument(
+        "--synthetic-people",
+        type=int,
+        default=0,
+        help="Use a synthetic gallery with this many people instead of data/",
+    )
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    args = parser.parse_args()
+
+    faces, names = load_gallery(args.synthetic_people, args.samples_per_person)
+    train_faces, train_names, test_faces, test_names = split_holdout(faces, names)
+    print(f"📊 Train samples: {len(train_names)}, held-out samples: {len(test_names)}")
+
+    print("\n⏱️  Raw pixels vs PCA projection")
+    print("=" * 66)
+    print(
+        f"{'mode':>12} | {'dims':>5} | {'accuracy':>8} | {'ms/face':>7} | "
+        f"{'gallery MB':>10} | {'variance':>8}"
+    )
+    print("-" * 66)
+
+    raw_matcher = FaceMatcher(n_neighbors=5).fit(train_faces, train_names)
+    accuracy, latency_ms = evaluate(raw_matcher, test_faces, test_names, args.repeats)
+    print(
+        f"{'raw':>12} | {raw_matcher.gallery.shape[1]:>5} | {accuracy * 100:>7.1f}% | "
+        f"{latency_ms:>7.3f} | {raw_matcher.gallery.nbytes / 1e6:>10.2f} | {'-':>8}"
+    )
+
+    for dims in args.dims:
+        projection = PCAProjection().fit(train_faces, dims)
+        matcher = FaceMatcher(n_neighbors=5)
+        names_table, label_ids = np.unique(train_names, return_inverse=True)
+        matcher.fit_encoded(
+            np.ascontiguousarray(projection.transform(train_faces)),
+            label_ids,
+            names_table.tolist(),
+            projection=projection,
+        )
+        accuracy, latency_ms = evaluate(matcher, test_faces, test_names, args.repeats)
+        # Basis and mean are part of the memory cost of the projected gallery
+        memory_mb = (
+            matcher.gallery.nbytes + projection.components.nbytes + projection.mean.nbytes
+        ) / 1e6
+        print(
+            f"{'pca':>12} | {projection.n_components:>5} | {accuracy * 100:>7.1f}% | "
+            f"{latency_ms:>7.3f} | {memory_mb:>10.2f} | "
+            f"{projection.explained_variance_ratio * 100:>7.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
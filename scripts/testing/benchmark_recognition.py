@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Recognition Benchmark for Face Recognition Attendance System
+Compares per-face recognition against batched recognition as faces per frame grow
+"""
+
+import argparse
+
+import cv2
+import numpy as np
+
+from benchmark_utils import load_gallery, time_call
+from face_matcher import FaceMatcher
+
+
+def make_frame(n_faces, rng):
+    """Random 800x480 frame with n face boxes laid out left to right"""
+    frame = rng.integers(0, 256, (480, 800, 3), dtype=np.uint8)
+    faces = [(20 + i * 130, 150, 120, 120) for i in range(n_faces)]
+    return frame, faces
+
+
+def recognize_one_by_one(matcher, frame, faces):
+    """Old kiosk path: resize, reshape and match each face separately"""
+    results = []
+    for x, y, w, h in faces:
+        resized_face = cv2.resize(frame[y : y + h, x : x + w], (50, 50))
+        results.append(matcher.match(resized_face.flatten().reshape(1, -1)))
+    return results
+
+
+def recognize_batched(matcher, frame, faces):
+    """New kiosk path: stack all faces and match them in one call"""
+    features = np.empty((len(faces), matcher.n_features), dtype=np.uint8)
+    for i, (x, y, w, h) in enumerate(faces):
+        features[i] = cv2.resize(frame[y : y + h, x : x + w], (50, 50)).reshape(-1)
+    return matcher.match_batch(features)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame recognition benchmark")
+    parser.add_argument(
+        "--max-faces", type=int, default=6, help="Largest faces-per-frame to test"
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=50, help="Timed runs per measurement"
+    )
+    parser.add_argument(
+        "--synthetic-people",
+        type=int,
+        default=0,
+        help="Use a random gallery with this many people instead of data/",
+    )
+    parser.add_argument("--samples-per-person", type=int, default=20)
+    args = parser.parse_args()
+
+    faces_data, names = load_gallery(args.synthetic_people, args.samples_per_person)
+    matcher = FaceMatcher(n_neighbors=5).fit(faces_data, names)
+    rng = np.random.default_rng(1)
+
+    print("\n⏱️  Recognition cost per frame (median ms)")
+    print("=" * 50)
+    print(f"{'faces':>5} | {'one-by-one':>10} | {'batched':>8} | {'speedup':>7}")
+    print("-" * 50)
+
+    for n_faces in range(1, args.max_faces + 1):
+        frame, faces = make_frame(n_faces, rng)
+        single_ms = time_call(
+            lambda: recognize_one_by_one(matcher, frame, faces), args.repeats
+        )
+        batch_ms = time_call(
+            lambda: recognize_batched(matcher, frame, faces), args.repeats
+        )
+        print(
+            f"{n_faces:>5} | {single_ms:>10.2f} | {batch_ms:>8.2f} | "
+            f"{single_ms / max(batch_ms, 1e-9):>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
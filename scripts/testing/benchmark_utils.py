@@ -0,0 +1,106 @@
+"""
+Shared helpers for the recognition benchmark scripts
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+
+def load_registered_gallery():
+    """Gallery from the data/ gallery store, or None"""
+    from gallery_store import GalleryStore
+
+    gallery = GalleryStore(PROJECT_ROOT / "data")
+    if not gallery.exists():
+        return None
+
+    faces, names = gallery.load()
+    return (faces, names) if names else None
+
+
+def make_synthetic_gallery(people, samples_per_person, n_features=7500, seed=0):
+    """Random per-person base faces plus per-sample pixel noise
+
+    Each person gets a smooth random 'face' and every sample is that face
+    with brightness shift and pixel noise, so nearest-neighbour accuracy is
+    meaningful but not trivial.
+    """
+    rng = np.random.default_rng(seed)
+    base_faces = rng.integers(40, 216, (people, n_features)).astype(np.float32)
+    faces = np.repeat(base_faces, samples_per_person, axis=0)
+    faces += rng.normal(0, 25, (faces.shape[0], 1))  # lighting
+    faces += rng.normal(0, 35, faces.shape)  # sensor noise / pose
+    faces = np.clip(faces, 0, 255).astype(np.uint8)
+    names = [f"person_{i:05d}" for i in range(people) for _ in range(samples_per_person)]
+    return faces, names
+
+
+def make_feature_gallery(people, samples_per_person, dims, seed=0):
+    """Per-person cluster centres plus sample noise, directly in feature space"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(0, 1.0, (people, dims)).astype(np.float32)
+    label_ids = np.repeat(np.arange(people), samples_per_person)
+    features = centres[label_ids] + rng.normal(0, 0.35, (len(label_ids), dims))
+    queries = centres + rng.normal(0, 0.35, (people, dims))
+    return (
+        features.astype(np.float32),
+        label_ids,
+        [f"person_{i:05d}" for i in range(people)],
+        queries.astype(np.float32),
+    )
+
+
+def load_gallery(synthetic_people=0, samples_per_person=20):
+    """Registered gallery, or a synthetic one when requested or unavailable"""
+    if synthetic_people == 0:
+        gallery = load_registered_gallery()
+        if gallery is not None:
+            print(f"📂 Using registered gallery: {len(gallery[1])} samples")
+            return gallery
+
+    people = max(synthetic_people, 2)
+    faces, names = make_synthetic_gallery(people, samples_per_person)
+    print(f"🧪 Using synthetic gallery: {people} people, {len(names)} samples")
+    return faces, names
+
+
+def split_holdout(faces, names, every=4):
+    """Hold out every n-th sample of each person for evaluation"""
+    seen = {}
+    train_idx, test_idx = [], []
+    for i, name in enumerate(names):
+        seen[name] = seen.get(name, 0) + 1
+        (test_idx if seen[name] % every == 0 else train_idx).append(i)
+
+    names = np.asarray(names)
+    return (
+        faces[train_idx],
+        names[train_idx].tolist(),
+        faces[test_idx],
+        names[test_idx].tolist(),
+    )
+
+
+def box_recall(reference, detected, iou_threshold=0.5):
+    """Number of reference boxes overlapped (IoU >= threshold) by a detection"""
+    from face_tracker import box_iou
+
+    if not reference or not detected:
+        return 0
+    return int(np.sum(box_iou(reference, detected).max(axis=1) >= iou_threshold))
+
+
+def time_call(func, repeats):
+    """Median wall time of a call in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
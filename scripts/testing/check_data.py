@@ -1,28 +1,29 @@
-import pickle
+import sys
 import numpy as np
 import os
 
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "src")
+)
+
+from gallery_store import GalleryStore
+
 # Cek file data
 print("Checking data files:")
-data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+data_dir = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "data"
+)
 print(f"Data directory: {data_dir}")
 print(f"Files in data directory: {os.listdir(data_dir)}")
 
-faces_file = os.path.join(data_dir, "faces_data.pkl")
-names_file = os.path.join(data_dir, "names.pkl")
-
-print(f"Faces file exists: {os.path.exists(faces_file)}")
-print(f"Names file exists: {os.path.exists(names_file)}")
-print(f"Faces file size: {os.path.getsize(faces_file)} bytes")
-print(f"Names file size: {os.path.getsize(names_file)} bytes")
+# Galeri (atau pickle lama jika belum diimpor)
+gallery = GalleryStore(data_dir)
+print(f"Gallery exists: {gallery.exists()}")
+print(f"Gallery store imported: {gallery.imported()}")
 
 # Load data
 try:
-    with open(faces_file, "rb") as f:
-        faces = pickle.load(f)
-
-    with open(names_file, "rb") as f:
-        names = pickle.load(f)
+    faces, names = gallery.load()
 
     print("\nData Analysis:")
     print(f"Faces data type: {type(faces)}")
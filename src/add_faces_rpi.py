@@ -1,6 +1,4 @@
 import cv2
-import pickle
-import os
 import time
 import sys
 from pathlib import Path
@@ -25,23 +23,61 @@ except ImportError as e:
     print("💡 Install with: pip install scikit-learn")
     SKLEARN_AVAILABLE = False
 
+# Speech synthesis is only needed to pre-render announcement clips
+try:
+    import pyttsx3
+
+    SPEECH_AVAILABLE = True
+except ImportError:
+    SPEECH_AVAILABLE = False
+
+from face_detector import FaceDetector
+from face_features import SAMPLE_EXTRACTOR, get_feature_extractor
+from face_model import FaceModelArtifact
+from gallery_store import GalleryStore
+from system_config import load_system_config
+from voice_cache import VoiceClipCache
+
 
 class FaceRegistration:
     def __init__(self):
         self.DATA_DIR = Path(__file__).parent.parent / "data"
         self.DATA_DIR.mkdir(exist_ok=True)
+        self.gallery = GalleryStore(self.DATA_DIR)
+        self.gallery.import_legacy()  # one-time move off the legacy pickles
+        config = load_system_config()
+
+        # The kiosk plays these clips instead of synthesizing announcements
+        self.voice_cache = VoiceClipCache.from_config(self.DATA_DIR, config)
+        self.prerender_voice = (
+            SPEECH_AVAILABLE
+            and config.getboolean("AUDIO", "TTS_ENABLED", fallback=True)
+            and config.getboolean("AUDIO", "VOICE_CACHE", fallback=True)
+            and self.voice_cache.available
+        )
 
         self.video = None
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        # Same detector backend as the kiosk, with registration's stricter
+        # settings (only clear, close-up faces become samples)
+        self.face_detector = FaceDetector.from_config(
+            self.DATA_DIR,
+            config,
+            scale_factor=1.3,
+            min_neighbors=5,
+            equalize=False,
+            detect_width=0,
+            min_size=(50, 50),
+            max_size=None,
         )
 
         self.SAMPLES_NEEDED = 20
         self.CAPTURE_DURATION = 60  # seconds
-        self.IMAGE_SIZE = (50, 50)  # Target image size for training
-        self.EXPECTED_FEATURES = (
-            self.IMAGE_SIZE[0] * self.IMAGE_SIZE[1] * 3
-        )  # Assuming color images (50x50x3)
+
+        # Samples are stored in the shared registration layout (50x50 BGR);
+        # the kiosk's configured extractor is applied when the model is built
+        self.sample_extractor = get_feature_extractor(SAMPLE_EXTRACTOR)
+        self.IMAGE_SIZE = self.sample_extractor.image_size
+        self.EXPECTED_FEATURES = self.sample_extractor.dims  # 7500 for 50x50x3
 
     def initialize_camera(self):
         """Initialize camera with optimal settings for Raspberry Pi"""
@@ -97,14 +133,11 @@ class FaceRegistration:
             elapsed_time = current_time - start_time
             remaining_time = max(self.CAPTURE_DURATION - int(elapsed_time), 0)
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(
-                gray, scaleFactor=1.3, minNeighbors=5, minSize=(50, 50)
-            )
+            faces = self.face_detector.detect(frame)
 
             for x, y, w, h in faces:
                 face_roi = frame[y : y + h, x : x + w]
-                resized_face = cv2.resize(face_roi, self.IMAGE_SIZE)
+                resized_face = self.sample_extractor.prepare(face_roi)
 
                 if len(faces_data) < self.SAMPLES_NEEDED and frame_count % 3 == 0:
                     faces_data.append(resized_face)
@@ -165,15 +198,11 @@ class FaceRegistration:
 
     def check_existing_data(self, name):
         """Check if name already exists in database and return unique names"""
-        names_file = self.DATA_DIR / "names.pkl"
-
-        if not names_file.exists():
+        if not self.gallery.exists():
             return False, []
 
         try:
-            with open(names_file, "rb") as f:
-                existing_names = pickle.load(f)
-            unique_names = list(set(existing_names))
+            unique_names = list(self.gallery.people())
 
             return name.lower() in [n.lower() for n in unique_names], unique_names
         except Exception as e:
@@ -186,17 +215,11 @@ class FaceRegistration:
             print("⚠️  Face similarity checking disabled (scikit-learn not available)")
             return False, None
 
-        faces_file = self.DATA_DIR / "faces_data.pkl"
-        names_file = self.DATA_DIR / "names.pkl"
-
-        if not faces_file.exists() or not names_file.exists():
+        if not self.gallery.exists():
             return False, None
 
         try:
-            with open(faces_file, "rb") as f:
-                existing_faces_raw = pickle.load(f)
-            with open(names_file, "rb") as f:
-                existing_names = pickle.load(f)
+            existing_faces_raw, existing_names = self.gallery.load()
 
             # Ensure existing_faces_raw is a numpy array
             if not isinstance(existing_faces_raw, np.ndarray):
@@ -290,70 +313,27 @@ class FaceRegistration:
                 return False
 
         faces_data_to_save = faces_data[: self.SAMPLES_NEEDED]
-        faces_array = np.array(faces_data_to_save)
-        faces_flattened = faces_array.reshape(self.SAMPLES_NEEDED, -1)
-
-        names_file = self.DATA_DIR / "names.pkl"
-        faces_file = self.DATA_DIR / "faces_data.pkl"
+        faces_flattened = self.sample_extractor.extract_batch(
+            np.array(faces_data_to_save)
+        )
 
         try:
-            # Load existing data (if any) or initialize empty lists/arrays
-            existing_names_list = []
-            existing_faces_array = np.empty((0, self.EXPECTED_FEATURES))
-
-            if names_file.exists():
-                with open(names_file, "rb") as f:
-                    existing_names_list = pickle.load(f)
-            if faces_file.exists():
-                with open(faces_file, "rb") as f:
-                    existing_faces_raw = pickle.load(f)
-                    if not isinstance(
-                        existing_faces_raw, np.ndarray
-                    ):  # Convert if not already numpy array
-                        existing_faces_raw = np.array(existing_faces_raw)
-                    if existing_faces_raw.ndim == 4:  # e.g. (N, 50, 50, 3)
-                        existing_faces_array = existing_faces_raw.reshape(
-                            existing_faces_raw.shape[0], -1
-                        )
-                    elif (
-                        existing_faces_raw.ndim == 2
-                        and existing_faces_raw.shape[1] == self.EXPECTED_FEATURES
-                    ):
-                        existing_faces_array = existing_faces_raw
-                    else:
-                        print(
-                            f"⚠️ Warning: Existing faces data has unexpected shape or feature count: {existing_faces_raw.shape}. Skipping old data."
-                        )
-                        existing_faces_array = np.empty(
-                            (0, self.EXPECTED_FEATURES)
-                        )  # Reset if incompatible
-
-            # If updating, remove old data for this name
+            # Only this person's shard is written; other people's samples
+            # are not read or rewritten
             if name_exists:
-                indices_to_keep = [
-                    i
-                    for i, n in enumerate(existing_names_list)
-                    if n.lower() != name.lower()
-                ]
-                filtered_names = [existing_names_list[i] for i in indices_to_keep]
-                filtered_faces = existing_faces_array[indices_to_keep]
+                name = self.gallery.find_person(name) or name
+                self.gallery.replace_person(name, faces_flattened)
             else:
-                filtered_names = existing_names_list
-                filtered_faces = existing_faces_array
-
-            # Add new data
-            names_combined = filtered_names + [name] * self.SAMPLES_NEEDED
-            faces_combined = np.vstack((filtered_faces, faces_flattened))
-
-            # Save updated data
-            with open(names_file, "wb") as f:
-                pickle.dump(names_combined, f)
-            with open(faces_file, "wb") as f:
-                pickle.dump(faces_combined, f)
+                self.gallery.add_person(name, faces_flattened)
 
             print(f"✅ Successfully registered {name}")
-            print(f"📁 Data saved to: {self.DATA_DIR}")
-            print(f"📊 Total samples in database: {len(faces_combined)}")
+            print(f"📁 Data saved to: {self.gallery.gallery_dir}")
+            print(
+                f"📊 Total samples in database: {sum(self.gallery.people().values())}"
+            )
+
+            self.rebuild_model()
+            self.prerender_announcements(name)
 
             return True
 
@@ -361,6 +341,29 @@ class FaceRegistration:
             print(f"❌ Error saving data: {e}")
             return False
 
+    def prerender_announcements(self, name):
+        """Render the kiosk's announcement clips for a registered person"""
+        if not self.prerender_voice:
+            return
+        try:
+            engine = self.voice_cache.configure_engine(pyttsx3.init())
+            rendered = self.voice_cache.prerender(engine, name)
+            if rendered:
+                print(f"🔊 Pre-rendered {rendered} announcement clips")
+        except Exception as e:
+            # The kiosk renders missing clips on first use
+            print(f"⚠️  Could not pre-render announcements: {e}")
+
+    def rebuild_model(self):
+        """Recompile the kiosk's face model artifact after the gallery changed"""
+        try:
+            # Fits the PCA projection on the gallery when it is enabled
+            manifest = FaceModelArtifact.from_config(self.DATA_DIR).build()
+            print(f"🔨 Model artifact rebuilt ({manifest['n_samples']} samples)")
+        except Exception as e:
+            # The kiosk rebuilds on start-up if this fails
+            print(f"⚠️  Could not rebuild model artifact: {e}")
+
     def cleanup(self):
         """Clean up resources"""
         if self.video:
@@ -369,24 +372,12 @@ class FaceRegistration:
 
     def show_existing_users(self):
         """Display existing users in database"""
-        names_file = self.DATA_DIR / "names.pkl"
-        faces_file = self.DATA_DIR / "faces_data.pkl"
-
-        if not names_file.exists() or not faces_file.exists():
+        if not self.gallery.exists():
             print("📝 No existing users found in database")
             return []
 
         try:
-            with open(names_file, "rb") as f:
-                names = pickle.load(f)
-            with open(faces_file, "rb") as f:
-                faces = pickle.load(
-                    f
-                )  # Just to get total count, not used for individual users
-
-            unique_names = {}
-            for name in names:
-                unique_names[name] = unique_names.get(name, 0) + 1
+            unique_names = self.gallery.people()
 
             print(f"\n📋 Existing users in database:")
             print("=" * 40)
@@ -397,9 +388,7 @@ class FaceRegistration:
                 print("   (No unique users found)")
 
             print(f"\n📊 Total users: {len(unique_names)}")
-            print(
-                f"📊 Total samples in data file: {len(names) if names else 0}"
-            )  # Use len(names) for actual saved samples
+            print(f"📊 Total samples in data file: {sum(unique_names.values())}")
 
             return list(unique_names.keys())
 
@@ -409,47 +398,24 @@ class FaceRegistration:
 
     def delete_user(self, name_to_delete):
         """Delete a user from the database"""
-        names_file = self.DATA_DIR / "names.pkl"
-        faces_file = self.DATA_DIR / "faces_data.pkl"
-
-        if not names_file.exists() or not faces_file.exists():
+        if not self.gallery.exists():
             print("❌ No database found")
             return False
 
         try:
-            with open(names_file, "rb") as f:
-                names = pickle.load(f)
-            with open(faces_file, "rb") as f:
-                faces = pickle.load(f)
-
-            if not isinstance(faces, np.ndarray):
-                faces = np.array(faces)
-
-            # Find indices to keep (not matching the name to delete)
-            # Ensure case-insensitive comparison
-            indices_to_keep = [
-                i
-                for i, name_item in enumerate(names)
-                if name_item.lower() != name_to_delete.lower()
-            ]
-
-            if len(indices_to_keep) == len(names):
+            # Case-insensitive lookup; samples are tombstoned and the shard
+            # files are reclaimed by a later compaction
+            samples_removed = self.gallery.remove_person(name_to_delete)
+            if not samples_removed:
                 print(f"❌ User '{name_to_delete}' not found in database")
                 return False
 
-            # Filter data
-            filtered_names = [names[i] for i in indices_to_keep]
-            filtered_faces = faces[indices_to_keep]
-
-            # Save filtered data
-            with open(names_file, "wb") as f:
-                pickle.dump(filtered_names, f)
-            with open(faces_file, "wb") as f:
-                pickle.dump(filtered_faces, f)
-
-            samples_removed = len(names) - len(filtered_names)
             print(f"✅ User '{name_to_delete}' deleted successfully")
             print(f"📊 Removed {samples_removed} samples")
+            self.voice_cache.invalidate(name_to_delete)
+
+            # Also after the last person: the kiosk then loads an empty model
+            self.rebuild_model()
 
             return True
 
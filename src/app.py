@@ -188,23 +188,17 @@ def format_csv_for_export(df, filename_prefix="export"):
 def get_training_data_info():
     """Get information about registered faces from training data"""
     try:
-        import pickle
+        from gallery_store import GalleryStore
 
-        data_dir = BASE_DIR / "data"
-        names_file = data_dir / "names.pkl"
-        faces_file = data_dir / "faces_data.pkl"
-
-        if not names_file.exists() or not faces_file.exists():
+        gallery = GalleryStore(BASE_DIR / "data")
+        if not gallery.exists():
             return {"unique_faces": 0, "total_samples": 0, "names": []}
 
-        with open(names_file, "rb") as f:
-            names_data = pickle.load(f)
-
-        unique_names = list(set(names_data))
+        people = gallery.people()
         return {
-            "unique_faces": len(unique_names),
-            "total_samples": len(names_data),
-            "names": sorted(unique_names),
+            "unique_faces": len(people),
+            "total_samples": sum(people.values()),
+            "names": sorted(people),
         }
     except Exception as e:
         print(f"Error reading training data: {e}")
@@ -432,15 +426,11 @@ def attendance_reports():
                 # Get all registered users from training data
                 all_registered_users = set()
                 try:
-                    import pickle
-                    from pathlib import Path
-
-                    BASE_DIR = Path(__file__).parent.parent
-                    names_file = BASE_DIR / "data" / "names.pkl"
-                    if names_file.exists():
-                        with open(names_file, "rb") as f:
-                            names_data = pickle.load(f)
-                            all_registered_users = set(names_data)
+                    from gallery_store import GalleryStore
+
+                    gallery = GalleryStore(BASE_DIR / "data")
+                    if gallery.exists():
+                        all_registered_users = set(gallery.people())
                 except Exception as e:
                     print(f"Error loading registered users: {e}")
                     all_registered_users = set(combined_df["NAME"].unique())
@@ -0,0 +1,72 @@
+"""
+In-memory index of today's attendance records
+Keeps the kiosk loop from re-parsing the attendance CSV on every frame
+"""
+
+import csv
+from pathlib import Path
+
+
+class DailyAttendanceIndex:
+    """Per-day attendance records keyed by name
+
+    The CSV for a date is parsed once, when that date is first requested.
+    New rows are added with append() after they have been written to disk,
+    and a request for a different date (midnight rollover) reloads the index.
+    """
+
+    def __init__(self, attendance_dir):
+        self.attendance_dir = Path(attendance_dir)
+        self.date = None
+        self.records_by_name = {}
+        self.total_records = 0
+
+    def attendance_file(self, date):
+        """Path of the attendance CSV for a date"""
+        return self.attendance_dir / f"Attendance_{date}.csv"
+
+    def load(self, date):
+        """Parse the attendance CSV for a date into the index"""
+        records_by_name = {}
+        total_records = 0
+        attendance_file = self.attendance_file(date)
+
+        if attendance_file.exists():
+            try:
+                with open(attendance_file, "r") as f:
+                    reader = csv.DictReader(f)
+                    for row in reader:
+                        records_by_name.setdefault(row["NAME"], []).append(row)
+                        total_records += 1
+            except Exception as e:
+                print(f"⚠️ Error loading attendance index for {date}: {e}")
+
+        self.date = date
+        self.records_by_name = records_by_name
+        self.total_records = total_records
+        return total_records
+
+    def ensure_date(self, date):
+        """Load the index for a date if it is not the one currently held"""
+        if date != self.date:
+            self.load(date)
+
+    def records(self, name, date):
+        """All records for a person on a date, oldest first"""
+        self.ensure_date(date)
+        return self.records_by_name.get(name, [])
+
+    def last_record(self, name, date):
+        """Most recent record for a person on a date, or None"""
+        records = self.records(name, date)
+        return records[-1] if records else None
+
+    def append(self, row, date):
+        """Add a row that has just been written to the CSV for a date"""
+        if date != self.date:
+            # Loading the file picks up the row that was just written
+            self.load(date)
+            return
+
+        self.records_by_name.setdefault(row["NAME"], []).append(dict(row))
+        self.total_records += 1
@@ -0,0 +1,130 @@
+"""
+Approximate nearest-neighbour index for large face galleries
+Random-projection LSH: each table hashes a feature vector to an n-bit code
+from the signs of its projections on random hyperplanes, and a query only
+looks at gallery rows that share a bucket with it.
+"""
+
+import numpy as np
+
+
+class LSHIndex:
+    """Multi-table random-hyperplane LSH with multi-probe queries
+
+    n_tables and n_bits are fixed when the index is built. n_probes is the
+    recall-vs-latency knob at query time: besides its own bucket, a query
+    also visits the n_probes buckets reached by flipping its least
+    confident bits (those whose projection is closest to the hyperplane).
+    """
+
+    def __init__(self, n_tables=8, n_bits=12, n_probes=2, seed=0):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_probes = n_probes
+        self.seed = seed
+        self.mean = None
+        self.planes = None  # (n_tables * n_bits, n_features)
+        self.codes = None  # (n_rows, n_tables)
+        self.sorted_codes = None  # (n_tables, n_rows)
+        self.sorted_rows = None  # (n_tables, n_rows)
+
+    @property
+    def n_rows(self):
+        return 0 if self.codes is None else self.codes.shape[0]
+
+    def build(self, features, mean=None):
+        """Draw hyperplanes through the data mean and hash every row"""
+        features = np.asarray(features, dtype=np.float32)
+        rng = np.random.default_rng(self.seed)
+        self.mean = (
+            features.mean(axis=0) if mean is None else np.asarray(mean, np.float32)
+        )
+        self.planes = rng.standard_normal(
+            (self.n_tables * self.n_bits, features.shape[1])
+        ).astype(np.float32)
+        self.codes = np.empty((0, self.n_tables), dtype=np.int64)
+        self.add(features)
+        return self
+
+    def projections(self, features):
+        """(n, n_tables, n_bits) signed distances to the hyperplanes"""
+        features = np.asarray(features, dtype=np.float32)
+        projected = (features - self.mean) @ self.planes.T
+        return projected.reshape(len(features), self.n_tables, self.n_bits)
+
+    def hash(self, features):
+        """(n, n_tables) bucket codes"""
+        bits = self.projections(features) > 0
+        weights = 1 << np.arange(self.n_bits, dtype=np.int64)
+        return (bits * weights).sum(axis=2)
+
+    def add(self, features, codes=None):
+        """Append rows to the index; only the new rows are hashed
+
+        Precomputed codes (e.g. reused from a previous index built with the
+        same hyperplanes) can be passed instead of features.
+        """
+        if codes is None:
+            codes = self.hash(features) if len(features) else np.empty(
+                (0, self.n_tables), dtype=np.int64
+            )
+        self.codes = np.concatenate((self.codes, codes.astype(np.int64)))
+        self._sort()
+        return self
+
+    def _sort(self):
+        self.sorted_rows = np.argsort(self.codes.T, axis=1, kind="stable").astype(
+            np.int32
+        )
+        self.sorted_codes = np.take_along_axis(self.codes.T, self.sorted_rows, axis=1)
+
+    def probe_codes(self, queries):
+        """(n_queries, n_tables, 1 + n_probes) bucket codes to visit"""
+        projections = self.projections(queries)
+        weights = 1 << np.arange(self.n_bits, dtype=np.int64)
+        codes = ((projections > 0) * weights).sum(axis=2)
+
+        n_probes = min(self.n_probes, self.n_bits)
+        # Least confident bits first
+        flip_order = np.argsort(np.abs(projections), axis=2)[:, :, :n_probes]
+        probes = codes[:, :, None] ^ weights[flip_order]
+        return np.concatenate((codes[:, :, None], probes), axis=2)
+
+    def query(self, queries):
+        """Candidate gallery rows per query, as a list of int arrays"""
+        probe_codes = self.probe_codes(queries)
+        candidates = [[] for _ in range(len(queries))]
+
+        for table in range(self.n_tables):
+            table_codes = probe_codes[:, table, :]
+            starts = np.searchsorted(self.sorted_codes[table], table_codes, "left")
+            ends = np.searchsorted(self.sorted_codes[table], table_codes, "right")
+            for q in range(len(queries)):
+                for start, end in zip(starts[q], ends[q]):
+                    if end > start:
+                        candidates[q].append(self.sorted_rows[table, start:end])
+
+        return [
+            np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int32)
+            for rows in candidates
+        ]
+
+    def save(self, path):
+        np.savez(
+            path,
+            params=np.array([self.n_tables, self.n_bits, self.seed]),
+            mean=self.mean,
+            planes=self.planes,
+            codes=self.codes,
+        )
+
+    @classmethod
+    def load(cls, path, n_probes=2):
+        with np.load(path) as data:
+            n_tables, n_bits, seed = (int(v) for v in data["params"])
+            index = cls(n_tables, n_bits, n_probes, seed)
+            index.mean = data["mean"]
+            index.planes = data["planes"]
+            index.codes = data["codes"]
+        index._sort()
+        return index
@@ -0,0 +1,176 @@
+"""
+Unknown-face threshold calibration
+Sweeps the matcher's distance-score threshold over held-out captures of
+registered people and over people left out of the gallery (stand-ins for
+visitors), and writes the resulting ROC curve.
+
+Usage: python src/face_calibrate.py [--target-fpr 0.01] [--output roc.csv]
+"""
+
+import csv
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from face_condense import condense_gallery, split_latest
+from face_matcher import FaceMatcher
+from face_projection import PCAProjection
+
+
+def collect_scores(
+    features,
+    label_ids,
+    names,
+    n_folds=4,
+    projection_dims=0,
+    condense_method="none",
+    prototypes_per_person=8,
+):
+    """Distance scores of genuine and impostor queries
+
+    People are split into n_folds groups; each group in turn is left out of
+    the gallery and its captures become impostor queries, while the latest
+    captures of everyone else are genuine queries against a gallery of
+    their earlier captures. Each fold's gallery is projected and condensed
+    the way the model build does it. Returns (genuine_scores,
+    genuine_correct, impostor_scores).
+    """
+    n_people = len(names)
+    n_folds = max(2, min(n_folds, n_people))
+    train, held_out = split_latest(label_ids)
+    fold_of = np.arange(n_people) % n_folds
+
+    genuine, correct, impostor = [], [], []
+    for fold in range(n_folds):
+        enrolled = fold_of[label_ids] != fold
+        gallery_rows = train[enrolled[train]]
+        if len(gallery_rows) == 0:
+            continue
+
+        gallery = features[gallery_rows]
+        projection = None
+        if projection_dims > 0 and len(gallery_rows) >= 2:
+            projection = PCAProjection().fit(gallery, projection_dims)
+            gallery = projection.transform(gallery)
+        gallery, gallery_labels, centroids, person_stats = condense_gallery(
+            gallery,
+            label_ids[gallery_rows],
+            names,
+            condense_method,
+            prototypes_per_person,
+        )
+        matcher = FaceMatcher(n_neighbors=5).fit_encoded(
+            gallery,
+            gallery_labels,
+            names,
+            projection=projection,
+            centroids=centroids,
+            person_stats=person_stats,
+        )
+
+        genuine_rows = held_out[enrolled[held_out]]
+        for row, (name, _, _, score) in zip(
+            genuine_rows, matcher.match_batch(features[genuine_rows])
+        ):
+            genuine.append(score)
+            correct.append(name == names[label_ids[row]])
+
+        impostor_rows = np.flatnonzero(~enrolled)
+        impostor.extend(r[3] for r in matcher.match_batch(features[impostor_rows]))
+
+    return np.array(genuine), np.array(correct, dtype=bool), np.array(impostor)
+
+
+def roc_curve(genuine, correct, impostor):
+    """(threshold, true accept rate, false accept rate) per distinct score
+
+    A genuine face counts as accepted only if it is also given the right
+    name; an impostor counts as falsely accepted whenever it is not
+    rejected.
+    """
+    thresholds = np.unique(np.concatenate((genuine, impostor)))
+    tar = np.array([np.mean((genuine <= t) & correct) for t in thresholds])
+    far = np.array([np.mean(impostor <= t) for t in thresholds])
+    return thresholds, tar, far
+
+
+def main():
+    import argparse
+
+    from face_model import FaceModelArtifact
+
+    parser = argparse.ArgumentParser(description="Calibrate UNKNOWN_THRESHOLD")
+    parser.add_argument(
+        "--target-fpr",
+        type=float,
+        default=0.01,
+        help="Highest acceptable fraction of visitors taken for someone",
+    )
+    parser.add_argument(
+        "--output",
+        default=str(Path(__file__).parent.parent / "logs" / "unknown_roc.csv"),
+        help="Where to write the ROC curve",
+    )
+    args = parser.parse_args()
+
+    artifact = FaceModelArtifact.from_config(Path(__file__).parent.parent / "data")
+    if not artifact.sources_exist():
+        print("❌ Training data not found!")
+        print("💡 Please run 'python add_faces_rpi.py' first to register faces")
+        sys.exit(1)
+
+    face_images, sample_names = artifact.load_sources()
+    names, label_ids = np.unique(np.asarray(sample_names), return_inverse=True)
+    if len(names) < 2:
+        print("❌ Calibration needs at least 2 registered people")
+        sys.exit(1)
+    order = np.argsort(label_ids, kind="stable")
+    label_ids = label_ids[order]
+    features = artifact.feature_extractor.extract_batch(face_images[order])
+
+    genuine, correct, impostor = collect_scores(
+        features,
+        label_ids,
+        names.tolist(),
+        projection_dims=artifact.projection_dims,
+        condense_method=artifact.condense_method,
+        prototypes_per_person=artifact.prototypes_per_person,
+    )
+    thresholds, tar, far = roc_curve(genuine, correct, impostor)
+
+    output = Path(args.output)
+    output.parent.mkdir(exist_ok=True)
+    with open(output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["THRESHOLD", "TRUE_ACCEPT_RATE", "FALSE_ACCEPT_RATE"])
+        writer.writerows(
+            [f"{t:.4f}", f"{a:.4f}", f"{b:.4f}"] for t, a, b in zip(thresholds, tar, far)
+        )
+
+    print(
+        f"\n🧪 {len(genuine)} genuine and {len(impostor)} impostor queries "
+        f"({len(names)} people)"
+    )
+    print("=" * 44)
+    print(f"{'threshold':>10} | {'true accept':>11} | {'false accept':>12}")
+    print("-" * 44)
+    for i in np.linspace(0, len(thresholds) - 1, min(10, len(thresholds))).astype(int):
+        print(f"{thresholds[i]:>10.2f} | {tar[i] * 100:>10.1f}% | {far[i] * 100:>11.1f}%")
+    print(f"\n📈 ROC curve written to {output}")
+
+    within_target = np.flatnonzero(far <= args.target_fpr)
+    if len(within_target) == 0:
+        print(f"⚠️  No threshold keeps false accepts at {args.target_fpr * 100:.1f}%")
+        return
+    best = within_target[np.argmax(tar[within_target])]
+    # Any value is a valid threshold, negative ones included
+    print(
+        f"💡 Suggested: UNKNOWN_REJECTION = true, "
+        f"UNKNOWN_THRESHOLD = {thresholds[best]:.2f} "
+        f"({tar[best] * 100:.1f}% true accepts, {far[best] * 100:.1f}% false accepts)"
+    )
+
+
+if __name__ == "__main__":
+    main()
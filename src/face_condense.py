@@ -0,0 +1,240 @@
+"""
+Gallery condensation for the face matcher
+Registration keeps ~20 near-identical captures per person; these helpers
+pick a few representative prototypes per person so KNN compares against
+fewer rows.
+
+Usage: python src/face_condense.py [--method kmedoids|cnn] [--prototypes N]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from face_matcher import FaceMatcher, row_sq_norms, squared_distances
+
+CONDENSE_METHODS = ("none", "kmedoids", "cnn")
+
+
+def kmedoids(features, k, n_iter=20, seed=0):
+    """Indices of k medoids of one person's samples
+
+    k-medoids++ seeding followed by alternating assignment / medoid update
+    on the full pairwise distance matrix (a person only has a few dozen
+    samples). Medoids are real captures, so they stay in the gallery's
+    dtype and layout.
+    """
+    n = len(features)
+    if n <= k:
+        return np.arange(n)
+
+    distances = squared_distances(features, features, row_sq_norms(features))
+    rng = np.random.default_rng(seed)
+
+    medoids = [int(np.argmin(distances.sum(axis=1)))]
+    while len(medoids) < k:
+        nearest = distances[:, medoids].min(axis=1)
+        if nearest.sum() == 0:
+            break  # the remaining samples duplicate a medoid
+        medoids.append(int(rng.choice(n, p=nearest / nearest.sum())))
+    medoids = np.array(medoids)
+
+    for _ in range(n_iter):
+        assignment = np.argmin(distances[:, medoids], axis=1)
+        updated = medoids.copy()
+        for c in range(len(medoids)):
+            members = np.flatnonzero(assignment == c)
+            if len(members):
+                within = distances[np.ix_(members, members)].sum(axis=1)
+                updated[c] = members[np.argmin(within)]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+
+    return np.sort(np.unique(medoids))
+
+
+def condensed_nearest_neighbour(
+    features, label_ids, seed_prototypes=5, max_passes=20, batch=256
+):
+    """Indices of a consistent subset for 1-NN (Hart's CNN, batched)
+
+    Starts from seed_prototypes medoids per person (the kiosk votes over
+    n_neighbors samples, so a person needs that many to win outright) and,
+    every pass, adds for each person the misclassified sample furthest from
+    that person's prototypes, until every sample's nearest prototype has
+    the right label. Samples are expected to be grouped by label id.
+    """
+    label_ids = np.asarray(label_ids)
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(label_ids))))
+    keep = np.zeros(len(label_ids), dtype=bool)
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        if end > start:
+            keep[start + kmedoids(features[start:end], seed_prototypes)] = True
+
+    sq_norms = row_sq_norms(features)
+    predicted = np.empty_like(label_ids)
+    own_distance = np.empty(len(label_ids), dtype=np.float32)
+    for _ in range(max_passes):
+        prototypes = np.flatnonzero(keep)
+        prototype_labels = label_ids[prototypes]
+        # Queries in batches so a uint8 gallery is never widened whole
+        for start in range(0, len(label_ids), batch):
+            rows = slice(start, start + batch)
+            distances = squared_distances(
+                features[rows], features[prototypes], sq_norms[prototypes]
+            )
+            predicted[rows] = prototype_labels[np.argmin(distances, axis=1)]
+            distances[prototype_labels[None, :] != label_ids[rows, None]] = np.inf
+            own_distance[rows] = distances.min(axis=1)
+
+        wrong = np.flatnonzero((predicted != label_ids) & ~keep)
+        if len(wrong) == 0:
+            break
+
+        # One new prototype per person per pass
+        order = np.lexsort((-own_distance[wrong], label_ids[wrong]))
+        first = np.unique(label_ids[wrong][order], return_index=True)[1]
+        keep[wrong[order][first]] = True
+
+    return np.flatnonzero(keep)
+
+
+def condense(features, label_ids, method, prototypes_per_person=8, n_neighbors=5):
+    """Row indices to keep, still grouped by person
+
+    method is one of CONDENSE_METHODS; "kmedoids" keeps up to
+    prototypes_per_person medoids per person, "cnn" keeps n_neighbors
+    medoids per person plus the samples needed to classify the rest of the
+    gallery correctly.
+    """
+    if method == "none":
+        return np.arange(len(label_ids))
+    if method == "cnn":
+        return condensed_nearest_neighbour(features, label_ids, n_neighbors)
+    if method != "kmedoids":
+        raise ValueError(
+            f"Unknown condensation method '{method}', "
+            f"expected one of {', '.join(CONDENSE_METHODS)}"
+        )
+
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(label_ids))))
+    return np.concatenate(
+        [
+            start + kmedoids(features[start:end], prototypes_per_person)
+            for start, end in zip(offsets[:-1], offsets[1:])
+            if end > start
+        ]
+    )
+
+
+def condense_gallery(features, label_ids, names, method="none", prototypes_per_person=8):
+    """The gallery the kiosk matches against
+
+    Per-person centroids come from every sample, the stored rows are the
+    ones condense() keeps, and the unknown-face distance statistics are
+    taken over those rows. Shared by the model build and threshold
+    calibration, so calibrated scores match the kiosk's.
+    Returns (features, label_ids, centroids, person_stats).
+    """
+    centroids = FaceMatcher().fit_encoded(features, label_ids, names).centroids
+    if method != "none" and len(label_ids):
+        keep = condense(features, label_ids, method, prototypes_per_person)
+        features = np.ascontiguousarray(features[keep])
+        label_ids = label_ids[keep]
+    person_stats = (
+        FaceMatcher()
+        .fit_encoded(features, label_ids, names, centroids=centroids)
+        .intra_class_stats()
+    )
+    return features, label_ids, centroids, person_stats
+
+
+def split_latest(label_ids, holdout_fraction=0.25):
+    """Train / held-out rows, holding out each person's latest captures
+
+    Consecutive captures are nearly identical, so the last ones are a more
+    honest stand-in for a later visit than a random subset.
+    """
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(label_ids))))
+    train, held_out = [], []
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        n_held = int((end - start) * holdout_fraction)
+        train.extend(range(start, end - n_held))
+        held_out.extend(range(end - n_held, end))
+    return np.array(train, dtype=int), np.array(held_out, dtype=int)
+
+
+def evaluate(features, label_ids, names, method, prototypes_per_person):
+    """(accuracy, ms per face, rows) with and without condensation"""
+    train, held_out = split_latest(label_ids)
+    expected = [names[label] for label in label_ids[held_out]]
+
+    results = {}
+    for label, rows in (
+        ("full", train),
+        (
+            method,
+            train[
+                condense(
+                    features[train], label_ids[train], method, prototypes_per_person
+                )
+            ],
+        ),
+    ):
+        matcher = FaceMatcher(n_neighbors=5).fit_encoded(
+            features[rows], label_ids[rows], names
+        )
+        start = time.perf_counter()
+        predicted = [r[0] for r in matcher.match_batch(features[held_out])]
+        elapsed = (time.perf_counter() - start) * 1000 / max(len(held_out), 1)
+        accuracy = np.mean([p == e for p, e in zip(predicted, expected)])
+        results[label] = (accuracy, elapsed, len(rows))
+    return results
+
+
+def main():
+    import argparse
+
+    from face_model import FaceModelArtifact
+
+    parser = argparse.ArgumentParser(
+        description="Report how condensing the gallery changes accuracy"
+    )
+    parser.add_argument("--method", choices=CONDENSE_METHODS[1:], default="kmedoids")
+    parser.add_argument(
+        "--prototypes", type=int, default=8, help="Medoids kept per person"
+    )
+    args = parser.parse_args()
+
+    artifact = FaceModelArtifact.from_config(Path(__file__).parent.parent / "data")
+    if not artifact.sources_exist():
+        print("❌ Training data not found!")
+        print("💡 Please run 'python add_faces_rpi.py' first to register faces")
+        sys.exit(1)
+
+    face_images, sample_names = artifact.load_sources()
+    names, label_ids = np.unique(np.asarray(sample_names), return_inverse=True)
+    order = np.argsort(label_ids, kind="stable")
+    label_ids = label_ids[order]
+    features = artifact.feature_extractor.extract_batch(face_images[order])
+
+    results = evaluate(features, label_ids, names.tolist(), args.method, args.prototypes)
+    print(f"\n🧪 Held-out: latest 25% of each person's captures")
+    print("=" * 52)
+    print(f"{'gallery':>10} | {'rows':>6} | {'accuracy':>8} | {'ms/face':>8}")
+    print("-" * 52)
+    for label, (accuracy, elapsed, rows) in results.items():
+        print(f"{label:>10} | {rows:>6} | {accuracy * 100:>7.1f}% | {elapsed:>8.3f}")
+
+    full, condensed = results["full"], results[args.method]
+    print(
+        f"\n📉 Rows: {condensed[2] / max(full[2], 1) * 100:.0f}% of the full gallery, "
+        f"accuracy delta {(condensed[0] - full[0]) * 100:+.1f} points"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Face detection for the kiosk and registration
+Pluggable detector backends (Haar or LBP cascades, OpenCV DNN models) run
+on an optionally downscaled copy of the frame; boxes are mapped back to
+frame coordinates, so recognition still crops its ROIs from the
+full-resolution frame.
+"""
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+# Smallest window the frontal-face cascades can report
+CASCADE_WINDOW = 24
+
+# Where DNN models and extra cascades live when no data_dir is given
+DEFAULT_MODEL_DIR = Path(__file__).parent.parent / "data" / "detectors"
+
+
+class DetectorBackend:
+    """Base class: image -> face boxes (x, y, w, h) in that image
+
+    Subclasses set name and grayscale (whether they take a single-channel
+    image, which is cheaper to shrink), and implement detect(). Model files
+    are looked up in model_dir; a missing one raises FileNotFoundError.
+    """
+
+    name = None
+    grayscale = False
+    min_window = 1  # smallest face (pixels) the backend can report
+
+    def __init__(
+        self,
+        model_dir,
+        scale_factor=1.1,
+        min_neighbors=3,
+        equalize=True,
+        score_threshold=0.7,
+    ):
+        self.model_dir = Path(model_dir)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.equalize = equalize
+        self.score_threshold = score_threshold
+
+    def model_file(self, filename):
+        path = self.model_dir / filename
+        if not path.exists():
+            raise FileNotFoundError(
+                f"{self.name} detector needs {path} (see data/README.md)"
+            )
+        return path
+
+    def preprocess(self, image):
+        """Whole-frame normalization applied before detection; windows of
+        a frame are cropped from its result so they see the same contrast"""
+        return image
+
+    def detect(self, image, min_size, max_size):
+        raise NotImplementedError
+
+    @staticmethod
+    def filter_sizes(boxes, min_size, max_size):
+        return [
+            box
+            for box in boxes
+            if box[2] >= min_size[0]
+            and box[3] >= min_size[1]
+            and (not max_size or (box[2] <= max_size[0] and box[3] <= max_size[1]))
+        ]
+
+
+class CascadeBackend(DetectorBackend):
+    grayscale = True
+    min_window = CASCADE_WINDOW
+    cascade_file = None
+
+    def __init__(self, model_dir, **params):
+        super().__init__(model_dir, **params)
+        path = self.cascade_path()
+        self.cascade = cv2.CascadeClassifier(str(path))
+        if self.cascade.empty():
+            raise FileNotFoundError(f"Could not load cascade {path}")
+
+    def cascade_path(self):
+        return self.model_file(self.cascade_file)
+
+    def preprocess(self, image):
+        return cv2.equalizeHist(image) if self.equalize else image
+
+    def detect(self, image, min_size, max_size):
+        faces = self.cascade.detectMultiScale(
+            image,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=min_size,
+            maxSize=max_size or (0, 0),
+        )
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class HaarBackend(CascadeBackend):
+    """Viola-Jones Haar cascade shipped with OpenCV (the original detector)"""
+
+    name = "haar"
+    cascade_file = "haarcascade_frontalface_default.xml"
+
+    def cascade_path(self):
+        return Path(cv2.data.haarcascades) / self.cascade_file
+
+
+class LBPBackend(CascadeBackend):
+    """LBP cascade: integer features, ~2-3x faster than Haar, a little less
+    accurate"""
+
+    name = "lbp"
+    cascade_file = "lbpcascade_frontalface_improved.xml"
+
+
+class YuNetBackend(DetectorBackend):
+    """OpenCV's YuNet CNN detector (cv2.FaceDetectorYN, OpenCV >= 4.5.4)"""
+
+    name = "yunet"
+    model = "face_detection_yunet_2023mar.onnx"
+    min_window = 10
+
+    def __init__(self, model_dir, **params):
+        super().__init__(model_dir, **params)
+        self.net = cv2.FaceDetectorYN.create(
+            str(self.model_file(self.model)), "", (320, 320), self.score_threshold
+        )
+        self.input_size = (320, 320)
+
+    def detect(self, image, min_size, max_size):
+        size = (image.shape[1], image.shape[0])
+        if size != self.input_size:
+            self.net.setInputSize(size)
+            self.input_size = size
+        _, faces = self.net.detect(image)
+        if faces is None:
+            return []
+        boxes = [tuple(int(round(v)) for v in face[:4]) for face in faces]
+        return self.filter_sizes(boxes, min_size, max_size)
+
+
+class SSDBackend(DetectorBackend):
+    """OpenCV's ResNet-10 SSD face detector (Caffe, 300x300 input)"""
+
+    name = "ssd"
+    prototxt = "deploy.prototxt"
+    weights = "res10_300x300_ssd_iter_140000.caffemodel"
+    min_window = 20
+
+    def __init__(self, model_dir, **params):
+        super().__init__(model_dir, **params)
+        self.net = cv2.dnn.readNetFromCaffe(
+            str(self.model_file(self.prototxt)), str(self.model_file(self.weights))
+        )
+
+    def detect(self, image, min_size, max_size):
+        height, width = image.shape[:2]
+        self.net.setInput(
+            cv2.dnn.blobFromImage(image, 1.0, (300, 300), (104.0, 177.0, 123.0))
+        )
+        detections = self.net.forward()[0, 0]
+        detections = detections[detections[:, 2] >= self.score_threshold]
+        corners = detections[:, 3:7] * np.array([width, height, width, height])
+        boxes = [
+            (int(x1), int(y1), int(x2 - x1), int(y2 - y1)) for x1, y1, x2, y2 in corners
+        ]
+        return self.filter_sizes(boxes, min_size, max_size)
+
+
+DETECTOR_BACKENDS = {
+    backend.name: backend
+    for backend in (HaarBackend, LBPBackend, YuNetBackend, SSDBackend)
+}
+
+
+def get_detector_backend(name, model_dir, **params):
+    """Instantiate a registered detector backend by name"""
+    try:
+        backend = DETECTOR_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown face detector '{name}', "
+            f"choose from: {', '.join(DETECTOR_BACKENDS)}"
+        )
+    return backend(model_dir, **params)
+
+
+class FaceDetector:
+    """Face detector with a pluggable backend and detection resolution
+
+    detect_width is the width of the image the backend sees (0 = detect on
+    the full frame); the height follows the frame's aspect ratio. min_size
+    and max_size (None = no limit) are given in frame pixels and scaled
+    with the image, so faces smaller than the backend's min_window times
+    the scale cannot be found on a downscaled image.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        detect_width=0,
+        min_size=(20, 20),
+        max_size=(400, 400),
+    ):
+        self.backend = backend or HaarBackend(DEFAULT_MODEL_DIR)
+        self.detect_width = detect_width
+        self.min_size = tuple(min_size)
+        self.max_size = tuple(max_size) if max_size else None
+
+    @classmethod
+    def from_config(cls, data_dir, config, **params):
+        """Detector from [FACE_DETECTION]; keyword arguments override the
+        kiosk defaults (detect_width, min_size, max_size and the backend's
+        scale_factor, min_neighbors, equalize, score_threshold)
+
+        Falls back to the Haar cascade, with a warning, if the configured
+        backend's model files are missing.
+        """
+        section = "FACE_DETECTION"
+        name = config.get(section, "DETECTOR", fallback=HaarBackend.name)
+        detector_params = {
+            key: params.pop(key)
+            for key in ("detect_width", "min_size", "max_size")
+            if key in params
+        }
+        detector_params.setdefault(
+            "detect_width", config.getint(section, "DETECT_WIDTH", fallback=0)
+        )
+        params.setdefault(
+            "score_threshold",
+            config.getfloat(section, "DETECTION_SCORE_THRESHOLD", fallback=0.7),
+        )
+
+        model_dir = Path(data_dir) / "detectors"
+        try:
+            backend = get_detector_backend(name, model_dir, **params)
+        except (FileNotFoundError, cv2.error) as e:
+            print(f"⚠️  Could not load '{name}' face detector ({e}), using haar")
+            backend = HaarBackend(model_dir, **params)
+        return cls(backend, **detector_params)
+
+    def detection_size(self, frame_shape):
+        """(width, height) of the image the backend runs on"""
+        height, width = frame_shape[:2]
+        if self.detect_width <= 0 or self.detect_width >= width:
+            return width, height
+        return self.detect_width, max(1, round(height * self.detect_width / width))
+
+    def frame_scale(self, frame_shape):
+        """Frame pixels per detection pixel"""
+        return frame_shape[1] / self.detection_size(frame_shape)[0]
+
+    def prepare(self, image, scale):
+        """Copy of image shrunk by scale, grayscale if the backend wants it"""
+        if self.backend.grayscale and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if scale != 1:
+            size = (
+                max(1, round(image.shape[1] / scale)),
+                max(1, round(image.shape[0] / scale)),
+            )
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        return image
+
+    def prepare_frame(self, frame):
+        """The image the backend searches for this frame: shrunk, converted
+        and normalized (histogram equalization) once for the whole frame"""
+        return self.backend.preprocess(
+            self.prepare(frame, self.frame_scale(frame.shape))
+        )
+
+    def detect(self, frame, region=None, prepared=None):
+        """Face boxes (x, y, w, h) in frame coordinates
+
+        region (x, y, w, h) restricts the search to that window of the
+        frame, at the same detection scale as a full scan. The window is
+        cropped from the whole frame's prepared image, which can be passed
+        in as prepared (from prepare_frame) to share it between windows.
+        """
+        scale = self.frame_scale(frame.shape)
+        if prepared is None:
+            prepared = self.prepare_frame(frame)
+        image, x0, y0 = prepared, 0, 0
+        if region is not None:
+            x, y, w, h = region
+            x0, y0 = round(x / scale), round(y / scale)
+            image = prepared[y0 : round((y + h) / scale), x0 : round((x + w) / scale)]
+            if min(image.shape[:2]) < self.backend.min_window:
+                return []
+
+        min_size = tuple(max(1, round(v / scale)) for v in self.min_size)
+        max_size = (
+            tuple(max(1, round(v / scale)) for v in self.max_size)
+            if self.max_size
+            else None
+        )
+        faces = self.backend.detect(image, min_size, max_size)
+
+        # Back to frame pixels, clipped so ROI crops stay inside the frame
+        frame_height, frame_width = frame.shape[:2]
+        boxes = []
+        for face in faces:
+            x, y, w, h = (int(round(v * scale)) for v in face)
+            x, y = x + int(round(x0 * scale)), y + int(round(y0 * scale))
+            left, top = min(max(x, 0), frame_width - 1), min(max(y, 0), frame_height - 1)
+            right, bottom = min(x + w, frame_width), min(y + h, frame_height)
+            if right > left and bottom > top:
+                boxes.append((left, top, right - left, bottom - top))
+        return boxes
+
+
+def expand_box(box, margin, frame_shape):
+    """box grown by margin times its size on every side, clipped to the frame"""
+    x, y, w, h = box
+    frame_height, frame_width = frame_shape[:2]
+    dx, dy = int(w * margin), int(h * margin)
+    left, top = max(0, x - dx), max(0, y - dy)
+    right, bottom = min(frame_width, x + w + dx), min(frame_height, y + h + dy)
+    return (left, top, right - left, bottom - top)
+
+
+def merge_windows(windows):
+    """Union overlapping (x, y, w, h) windows into their bounding boxes"""
+    merged = [list(w) for w in windows]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                ax, ay, aw, ah = merged[i]
+                bx, by, bw, bh = merged[j]
+                if ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah:
+                    left, top = min(ax, bx), min(ay, by)
+                    right = max(ax + aw, bx + bw)
+                    bottom = max(ay + ah, by + bh)
+                    merged[i] = [left, top, right - left, bottom - top]
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return [tuple(w) for w in merged]
+
+
+class DetectionScheduler:
+    """Searches around the last known faces, with periodic full scans
+
+    Most frames only run the cascade on windows around the previous
+    frame's faces (grown by margin times the face size on each side), which
+    is far cheaper than a full scan while the same people stand still. A
+    full-frame scan runs every full_scan_every frames (to pick up people
+    who just walked in), when there are no known faces, and on the frame
+    after a window came back empty (a face moved away or left), so a lost
+    face never costs a window search and a full scan in the same frame.
+    """
+
+    def __init__(self, detector, full_scan_every=5, margin=0.5):
+        self.detector = detector
+        self.full_scan_every = max(1, full_scan_every)
+        self.margin = margin
+        self.last_boxes = []
+        self.frames_since_full_scan = 0
+
+        # Statistics
+        self.full_scans = 0
+        self.window_scans = 0
+
+    def detect(self, frame):
+        """Face boxes (x, y, w, h) in frame coordinates"""
+        self.frames_since_full_scan += 1
+        if self.last_boxes and self.frames_since_full_scan < self.full_scan_every:
+            boxes, lost = self._detect_windows(frame)
+            if lost:
+                self.frames_since_full_scan = self.full_scan_every
+            self.last_boxes = boxes
+            return boxes
+
+        self.full_scans += 1
+        self.frames_since_full_scan = 0
+        self.last_boxes = self.detector.detect(frame)
+        return self.last_boxes
+
+    def _detect_windows(self, frame):
+        """(faces found around the last boxes, whether a face was lost)"""
+        windows = merge_windows(
+            [expand_box(box, self.margin, frame.shape) for box in self.last_boxes]
+        )
+        # Every window is cropped from one equalized copy of the frame, so
+        # window scans see the same contrast as full scans
+        prepared = self.detector.prepare_frame(frame)
+        boxes, lost = [], False
+        for window in windows:
+            self.window_scans += 1
+            found = self.detector.detect(frame, window, prepared)
+            lost = lost or not found
+            boxes.extend(found)
+
+        # Two faces sharing a merged window may come back as one
+        return boxes, lost or len(boxes) < len(self.last_boxes)
@@ -0,0 +1,200 @@
+"""
+Face feature extractors
+Registration and recognition both turn a face crop into a feature vector
+through one of these, so the gallery and live faces always match layout.
+"""
+
+import cv2
+import numpy as np
+
+# Registration stores 50x50 BGR crops; every extractor starts from this size
+FACE_IMAGE_SIZE = (50, 50)
+
+# Layout of the samples in the gallery store
+SAMPLE_EXTRACTOR = "raw_bgr"
+
+
+class FeatureExtractor:
+    """Base class: canonical face image (50x50 BGR) -> 1D feature vector
+
+    Subclasses set name, version and dtype, and implement dims and
+    extract_batch(). Bump version whenever the output of an extractor
+    changes so galleries built with the old one are rebuilt.
+    """
+
+    name = None
+    version = 1
+    dtype = np.float32
+
+    def __init__(self, image_size=FACE_IMAGE_SIZE):
+        self.image_size = image_size
+
+    @property
+    def dims(self):
+        raise NotImplementedError
+
+    def describe(self):
+        """Identity recorded in the gallery that was built with this extractor"""
+        return {"name": self.name, "version": self.version, "dims": self.dims}
+
+    def prepare(self, face_roi):
+        """Resize a detected face crop to the canonical image size"""
+        return cv2.resize(face_roi, self.image_size)
+
+    def extract_batch(self, face_images):
+        """(n, h, w, 3) uint8 canonical images -> (n, dims) features"""
+        raise NotImplementedError
+
+    def extract(self, face_image):
+        return self.extract_batch(face_image[np.newaxis])[0]
+
+    def extract_from_frame(self, frame, faces):
+        """Features for every (x, y, w, h) box of a detectMultiScale result"""
+        face_images = np.empty(
+            (len(faces), self.image_size[1], self.image_size[0], 3), dtype=np.uint8
+        )
+        for i, (x, y, w, h) in enumerate(faces):
+            face_images[i] = self.prepare(frame[y : y + h, x : x + w])
+        return self.extract_batch(face_images)
+
+    @staticmethod
+    def to_gray(face_images):
+        """(n, h, w, 3) BGR -> (n, h, w) grayscale using OpenCV's weights"""
+        n, h, w, _ = face_images.shape
+        # Converting the stack as one tall image is a single OpenCV call
+        gray = cv2.cvtColor(face_images.reshape(n * h, w, 3), cv2.COLOR_BGR2GRAY)
+        return gray.reshape(n, h, w)
+
+
+class RawBGRExtractor(FeatureExtractor):
+    """Raw BGR pixels (50x50x3 = 7500 dims), the original kiosk layout"""
+
+    name = "raw_bgr"
+    dtype = np.uint8
+
+    @property
+    def dims(self):
+        return self.image_size[0] * self.image_size[1] * 3
+
+    def extract_batch(self, face_images):
+        return face_images.reshape(len(face_images), -1)
+
+
+class GrayscaleExtractor(FeatureExtractor):
+    """Grayscale pixels, 3x fewer dims than raw BGR"""
+
+    name = "grayscale"
+    dtype = np.uint8
+
+    @property
+    def dims(self):
+        return self.image_size[0] * self.image_size[1]
+
+    def extract_batch(self, face_images):
+        return self.to_gray(face_images).reshape(len(face_images), -1)
+
+
+class HOGExtractor(FeatureExtractor):
+    """Histogram of oriented gradients from cv2.HOGDescriptor"""
+
+    name = "hog"
+
+    def __init__(self, image_size=FACE_IMAGE_SIZE):
+        super().__init__(image_size)
+        # Window is the largest multiple of the 8px cell inside the face image
+        self.window = (image_size[0] // 8 * 8, image_size[1] // 8 * 8)
+        self.descriptor = cv2.HOGDescriptor(self.window, (16, 16), (8, 8), (8, 8), 9)
+
+    @property
+    def dims(self):
+        return int(self.descriptor.getDescriptorSize())
+
+    def extract_batch(self, face_images):
+        gray = self.to_gray(face_images)
+        # Centre crop to the HOG window
+        top = (gray.shape[1] - self.window[1]) // 2
+        left = (gray.shape[2] - self.window[0]) // 2
+        features = np.empty((len(gray), self.dims), dtype=np.float32)
+        for i, face in enumerate(gray):
+            window = np.ascontiguousarray(
+                face[top : top + self.window[1], left : left + self.window[0]]
+            )
+            features[i] = self.descriptor.compute(window).ravel()
+        return features
+
+
+def _uniform_lbp_table():
+    """Map 8-bit LBP codes to 59 uniform-pattern bins (58 uniform + 1 other)"""
+    table = np.full(256, 58, dtype=np.int32)
+    next_bin = 0
+    for code in range(256):
+        bits = [(code >> i) & 1 for i in range(8)]
+        transitions = sum(bits[i] != bits[(i + 1) % 8] for i in range(8))
+        if transitions <= 2:
+            table[code] = next_bin
+            next_bin += 1
+    return table
+
+
+class LBPHistogramExtractor(FeatureExtractor):
+    """Uniform local binary pattern histograms over a grid of cells"""
+
+    name = "lbp"
+    n_bins = 59
+    grid = (4, 4)
+
+    def __init__(self, image_size=FACE_IMAGE_SIZE):
+        super().__init__(image_size)
+        self.lbp_table = _uniform_lbp_table()
+
+    @property
+    def dims(self):
+        return self.grid[0] * self.grid[1] * self.n_bins
+
+    def extract_batch(self, face_images):
+        gray = self.to_gray(face_images).astype(np.int16)
+        n, h, w = gray.shape
+        center = gray[:, 1:-1, 1:-1]
+
+        # 8-neighbour comparison, clockwise from the top-left pixel
+        offsets = [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0), (1, 0)]
+        codes = np.zeros(center.shape, dtype=np.int32)
+        for bit, (dy, dx) in enumerate(offsets):
+            neighbour = gray[:, dy : dy + h - 2, dx : dx + w - 2]
+            codes |= (neighbour >= center).astype(np.int32) << bit
+        codes = self.lbp_table[codes]
+
+        # Cell index of every pixel, then one bincount for all cells and faces
+        rows = np.arange(h - 2) * self.grid[0] // (h - 2)
+        cols = np.arange(w - 2) * self.grid[1] // (w - 2)
+        cell_ids = rows[:, None] * self.grid[1] + cols[None, :]
+        bins = cell_ids[None] * self.n_bins + codes
+        bins += (np.arange(n) * self.dims)[:, None, None]
+
+        histograms = np.bincount(bins.ravel(), minlength=n * self.dims)
+        histograms = histograms.reshape(n, self.grid[0] * self.grid[1], self.n_bins)
+        # Normalise per cell so cell size does not weight the distance
+        histograms = histograms / np.maximum(histograms.sum(axis=2, keepdims=True), 1)
+        return histograms.reshape(n, self.dims).astype(np.float32)
+
+
+FEATURE_EXTRACTORS = {
+    extractor.name: extractor
+    for extractor in (
+        RawBGRExtractor,
+        GrayscaleExtractor,
+        HOGExtractor,
+        LBPHistogramExtractor,
+    )
+}
+
+
+def get_feature_extractor(name=SAMPLE_EXTRACTOR):
+    """Instantiate a registered extractor by name"""
+    try:
+        return FEATURE_EXTRACTORS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown feature extractor '{name}', "
+            f"choose from: {', '.join(FEATURE_EXTRACTORS)}"
+        )
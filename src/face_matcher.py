@@ -0,0 +1,327 @@
+"""
+Vectorized nearest-neighbour face matcher
+Replaces the scikit-learn KNN in the kiosk with a single NumPy distance pass
+"""
+
+import numpy as np
+
+# Scratch budget for converting a compact (uint8) gallery to float32
+CHUNK_BYTES = 1 << 20
+
+
+def float_chunks(gallery):
+    """Yield (start, float32 block) over gallery rows
+
+    A float32 gallery is yielded whole. A uint8 gallery is converted
+    CHUNK_BYTES at a time, so it stays 8-bit in memory and only a small
+    float32 scratch block exists while distances are computed.
+    """
+    if gallery.dtype == np.float32:
+        yield 0, gallery
+        return
+    rows = max(1, CHUNK_BYTES // (4 * max(gallery.shape[1], 1)))
+    for start in range(0, gallery.shape[0], rows):
+        yield start, gallery[start : start + rows].astype(np.float32)
+
+
+def row_sq_norms(gallery):
+    """Squared norm of every gallery row, accumulated in float32"""
+    norms = np.empty(gallery.shape[0], dtype=np.float32)
+    for start, block in float_chunks(gallery):
+        norms[start : start + len(block)] = np.einsum("ij,ij->i", block, block)
+    return norms
+
+
+def squared_distances(queries, gallery, gallery_sq_norms):
+    """Squared Euclidean distances between query rows and gallery rows"""
+    queries = np.asarray(queries, dtype=np.float32)
+    query_sq_norms = np.einsum("ij,ij->i", queries, queries)
+    if gallery.dtype == np.float32:
+        distances = queries @ gallery.T
+    else:
+        distances = np.empty((len(queries), gallery.shape[0]), dtype=np.float32)
+        for start, block in float_chunks(gallery):
+            distances[:, start : start + len(block)] = queries @ block.T
+    distances *= -2.0
+    distances += query_sq_norms[:, None]
+    distances += gallery_sq_norms[None, :]
+    # Rounding in the expansion can leave tiny negative values
+    np.maximum(distances, 0.0, out=distances)
+    return distances
+
+
+class FaceMatcher:
+    """K-nearest-neighbour vote over a face gallery
+
+    The gallery is kept as one contiguous matrix with its squared row norms
+    precomputed, so the squared distance to every sample is a single matrix
+    product: |q|^2 - 2 q.g + |g|^2. Label, vote confidence and nearest
+    distance all come from that one computation. Pixel galleries stay uint8
+    (4x smaller than float32) and are widened to float32 in small chunks
+    inside the product; other features are float32.
+
+    Samples are grouped by person. With candidate_people > 0, a coarse pass
+    ranks per-person centroids and the neighbour vote only runs over the
+    samples of the closest candidate_people people, so the cost grows with
+    that number instead of with the roster. For very large galleries an
+    approximate nearest-neighbour index (face_ann.LSHIndex) can supply the
+    candidate rows instead.
+
+    Open-set rejection: person_stats holds, per person, the mean and spread
+    of each sample's distance to the nearest other sample of that person.
+    The winner's nearest distance is turned into a score in units of that
+    spread (close matches score below 0), and unless unknown_threshold is
+    None a face scoring above it is reported as unknown (name None). This
+    reuses the vote's distances.
+    """
+
+    def __init__(self, n_neighbors=5, candidate_people=0, unknown_threshold=None):
+        self.n_neighbors = n_neighbors
+        self.candidate_people = candidate_people
+        self.unknown_threshold = unknown_threshold
+        self.projection = None
+        self.gallery = None
+        self.gallery_sq_norms = None
+        self.label_ids = None
+        self.names = []
+        self.person_offsets = None
+        self.centroids = None
+        self.centroid_sq_norms = None
+        self.person_stats = None
+        self.ann_index = None
+
+    @property
+    def n_samples(self):
+        return 0 if self.gallery is None else self.gallery.shape[0]
+
+    @property
+    def n_features(self):
+        """Length of the flattened face vectors the matcher expects as input"""
+        if self.projection is not None:
+            return self.projection.n_input_features
+        return 0 if self.gallery is None else self.gallery.shape[1]
+
+    def fit(self, features, labels):
+        """Build the gallery from (n_samples, n_features) data and per-sample names"""
+        # Sorted name table, like the classes_ of the sklearn classifier
+        names, label_ids = np.unique(np.asarray(labels), return_inverse=True)
+        return self.fit_encoded(features, label_ids, names.tolist())
+
+    def fit_encoded(
+        self,
+        features,
+        label_ids,
+        names,
+        projection=None,
+        centroids=None,
+        person_stats=None,
+    ):
+        """Build the gallery from integer label ids into a name table
+
+        A uint8 or float32 C-contiguous array (e.g. a memory-mapped model
+        artifact) whose samples are already grouped by label id is used
+        as-is without copying; other dtypes are converted to float32. If a
+        projection is given, the gallery is expected to be already projected
+        and queries are projected with it before matching.
+        Per-person centroids are computed here unless they are passed in;
+        person_stats are computed on first use unless passed in.
+        """
+        features = np.asarray(features)
+        dtype = np.uint8 if features.dtype == np.uint8 else np.float32
+        gallery = np.ascontiguousarray(features, dtype=dtype)
+        if gallery.ndim != 2:
+            gallery = gallery.reshape(gallery.shape[0], -1)
+        label_ids = np.asarray(label_ids, dtype=np.int32)
+        if gallery.shape[0] != len(label_ids):
+            raise ValueError(
+                f"Gallery has {gallery.shape[0]} samples but {len(label_ids)} labels"
+            )
+
+        # Group samples by person so each person is one contiguous block
+        if np.any(np.diff(label_ids) < 0):
+            order = np.argsort(label_ids, kind="stable")
+            gallery = gallery[order]
+            label_ids = label_ids[order]
+
+        counts = np.bincount(label_ids, minlength=len(names))
+        self.person_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        if centroids is None:
+            centroids = np.zeros((len(names), gallery.shape[1]), dtype=np.float32)
+            present = counts > 0
+            if gallery.shape[0]:
+                sums = np.add.reduceat(
+                    gallery, self.person_offsets[:-1][present], dtype=np.float64
+                )
+                centroids[present] = sums / counts[present, None]
+
+        self.projection = projection
+        self.gallery = gallery
+        self.gallery_sq_norms = row_sq_norms(gallery)
+        self.names = list(names)
+        self.label_ids = label_ids
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.centroid_sq_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        self.person_stats = (
+            None if person_stats is None else np.asarray(person_stats, np.float32)
+        )
+        return self
+
+    def intra_class_stats(self):
+        """(n_people, 2) mean and std of leave-one-out nearest own-sample distances
+
+        People with a single sample get the median statistics of everyone
+        else, since they have no second sample to measure against.
+        """
+        stats = np.full((len(self.names), 2), np.nan, dtype=np.float32)
+        for p in range(len(self.names)):
+            start, end = self.person_offsets[p], self.person_offsets[p + 1]
+            if end - start < 2:
+                continue
+            block = self.gallery[start:end]
+            distances = squared_distances(
+                block, block, self.gallery_sq_norms[start:end]
+            )
+            np.fill_diagonal(distances, np.inf)
+            nearest = np.sqrt(distances.min(axis=1))
+            stats[p] = nearest.mean(), nearest.std()
+
+        measured = ~np.isnan(stats[:, 0])
+        fallback = np.median(stats[measured], axis=0) if measured.any() else (0, 0)
+        stats[~measured] = fallback
+        return stats
+
+    def distance_scores(self, label_ids, distances):
+        """Nearest distances to the given people in units of their spread"""
+        if self.person_stats is None:
+            self.person_stats = self.intra_class_stats()
+        mean, std = self.person_stats[label_ids].T
+        # Near-duplicate captures can give an unrealistically small spread
+        spread = np.maximum(std, 0.1 * mean) + 1e-6
+        return (distances - mean) / spread
+
+    def squared_distances(self, queries):
+        """Squared Euclidean distances from (n_queries, n_features) to every sample"""
+        return squared_distances(queries, self.gallery, self.gallery_sq_norms)
+
+    def candidate_rows(self, queries):
+        """Coarse stage: gallery rows of each query's closest people
+
+        Returns (rows, allowed) where rows are the gallery rows of every
+        person that is a candidate for at least one query, and allowed is
+        an (n_queries, len(rows)) mask of the rows that belong to that
+        query's own candidates.
+        """
+        centroid_distances = squared_distances(
+            queries, self.centroids, self.centroid_sq_norms
+        )
+        n_candidates = self.candidate_people
+        candidates = np.argpartition(centroid_distances, n_candidates - 1, axis=1)
+        candidates = candidates[:, :n_candidates]
+
+        people = np.unique(candidates)
+        rows = np.concatenate(
+            [
+                np.arange(self.person_offsets[p], self.person_offsets[p + 1])
+                for p in people
+            ]
+        )
+
+        is_candidate = np.zeros((len(queries), len(self.names)), dtype=bool)
+        is_candidate[np.arange(len(queries))[:, None], candidates] = True
+        return rows, is_candidate[:, self.label_ids[rows]]
+
+    def ann_candidate_rows(self, queries):
+        """Candidate rows from the ANN index, in the same form as candidate_rows
+
+        Returns (None, None) when a query has fewer candidates than
+        n_neighbors, so the caller falls back to the exhaustive search.
+        """
+        per_query = self.ann_index.query(queries)
+        if min(len(rows) for rows in per_query) < self.n_neighbors:
+            return None, None
+
+        rows = np.unique(np.concatenate(per_query))
+        allowed = np.zeros((len(queries), len(rows)), dtype=bool)
+        for q, query_rows in enumerate(per_query):
+            allowed[q, np.searchsorted(rows, query_rows)] = True
+        return rows, allowed
+
+    def match(self, feature):
+        """Match one flattened face, returning (name, vote confidence,
+        nearest distance, distance score)"""
+        return self.match_batch(np.asarray(feature).reshape(1, -1))[0]
+
+    def match_batch(self, features):
+        """Match (n_faces, n_features) faces in one distance computation
+
+        Returns a list of (name, vote confidence, nearest distance, distance
+        score) per face; name is None for faces rejected as unknown, and for
+        every face when the gallery is empty.
+        """
+        features = np.asarray(features).reshape(len(features), -1)
+        if features.shape[0] == 0:
+            return []
+        if self.n_samples == 0:
+            return [(None, 0.0, float("inf"), float("inf"))] * features.shape[0]
+        if self.projection is not None:
+            features = self.projection.transform(features)
+
+        rows = None
+        if self.ann_index is not None:
+            rows, allowed = self.ann_candidate_rows(features)
+        elif 0 < self.candidate_people < len(self.names):
+            rows, allowed = self.candidate_rows(features)
+
+        if rows is not None:
+            distances = squared_distances(
+                features, self.gallery[rows], self.gallery_sq_norms[rows]
+            )
+            # Rows outside a face's own candidates never vote
+            distances[~allowed] = np.inf
+            label_ids = self.label_ids[rows]
+        else:
+            distances = self.squared_distances(features)
+            label_ids = self.label_ids
+        n_faces, n_samples = distances.shape
+
+        k = min(self.n_neighbors, n_samples)
+        if k < n_samples:
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(n_samples), (n_faces, n_samples))
+        nearest_sq_distances = np.take_along_axis(distances, nearest, axis=1)
+
+        votes = np.zeros((n_faces, len(self.names)), dtype=np.int32)
+        faces = np.repeat(np.arange(n_faces), k)
+        valid = np.isfinite(nearest_sq_distances).ravel().astype(np.int32)
+        np.add.at(votes, (faces, label_ids[nearest].ravel()), valid)
+
+        # argmax picks the lowest label id on ties, matching KNeighborsClassifier
+        best_labels = np.argmax(votes, axis=1)
+        confidences = votes[np.arange(n_faces), best_labels] / k
+        nearest_distances = np.sqrt(nearest_sq_distances.min(axis=1))
+
+        # Distance to the winner's closest sample among the k neighbours
+        is_winner = label_ids[nearest] == best_labels[:, None]
+        winner_distances = np.sqrt(
+            np.where(is_winner, nearest_sq_distances, np.inf).min(axis=1)
+        )
+        scores = self.distance_scores(best_labels, winner_distances)
+        rejected = (
+            np.zeros(n_faces, dtype=bool)
+            if self.unknown_threshold is None
+            else scores > self.unknown_threshold
+        )
+
+        return [
+            (
+                None if reject else self.names[label],
+                float(confidence),
+                float(distance),
+                float(score),
+            )
+            for label, confidence, distance, score, reject in zip(
+                best_labels, confidences, nearest_distances, scores, rejected
+            )
+        ]
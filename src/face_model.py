@@ -0,0 +1,499 @@
+"""
+Precompiled face model artifact
+Builds a versioned, memory-mappable copy of the face gallery from the
+gallery store so the kiosk does not refit on every start.
+
+Usage: python src/face_model.py [--force]
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from face_ann import LSHIndex
+from face_condense import condense_gallery
+from face_features import SAMPLE_EXTRACTOR, get_feature_extractor
+from face_matcher import FaceMatcher
+from face_projection import PCAProjection
+from gallery_store import GalleryStore, file_lock
+from system_config import load_system_config
+
+# Bump when the artifact layout changes so old artifacts get rebuilt
+MODEL_FORMAT_VERSION = 7
+
+
+class FaceModelArtifact:
+    """Versioned model artifact stored in data/model/
+
+    Layout:
+        features.npy   (n_samples, n_features) gallery matrix from the
+                       configured feature extractor in its own dtype (uint8
+                       for pixel extractors), float32 PCA-projected
+                       vectors when projection_dims > 0, and only each
+                       person's prototypes when condensation is enabled
+        label_ids.npy  int32 per-sample index into names.json, samples are
+                       grouped by person
+        names.json     sorted name table
+        centroids.npy  float32 per-person mean of all their samples
+        person_stats.npy
+                       float32 per-person mean / std of the nearest
+                       own-sample distance in features.npy, for rejecting
+                       unknown faces
+        projection_mean.npy, projection_components.npy
+                       PCA basis (only when projection is enabled)
+        ann_index.npz  LSH index over features.npy (only when enabled)
+        manifest.json  format version, extractor, source fingerprints and
+                       hashes
+
+    Builds and loads hold data/model.lock, so the kiosk and registration
+    never build at the same time or read an artifact while it is swapped.
+    """
+
+    def __init__(
+        self,
+        data_dir,
+        projection_dims=0,
+        extractor_name=SAMPLE_EXTRACTOR,
+        candidate_people=0,
+        ann_tables=0,
+        ann_bits=12,
+        ann_probes=2,
+        condense_method="none",
+        prototypes_per_person=8,
+        unknown_threshold=None,
+    ):
+        self.data_dir = Path(data_dir)
+        self.projection_dims = projection_dims
+        self.candidate_people = candidate_people
+        self.ann_tables = ann_tables  # 0 disables the ANN index
+        self.ann_bits = ann_bits
+        self.ann_probes = ann_probes
+        self.condense_method = condense_method
+        self.prototypes_per_person = prototypes_per_person
+        self.unknown_threshold = unknown_threshold  # match-time, None = off
+        self.feature_extractor = get_feature_extractor(extractor_name)
+        self.gallery = GalleryStore(self.data_dir)
+        self.model_dir = self.data_dir / "model"
+        self.features_file = self.model_dir / "features.npy"
+        self.label_ids_file = self.model_dir / "label_ids.npy"
+        self.names_file = self.model_dir / "names.json"
+        self.centroids_file = self.model_dir / "centroids.npy"
+        self.person_stats_file = self.model_dir / "person_stats.npy"
+        self.projection_mean_file = self.model_dir / "projection_mean.npy"
+        self.projection_components_file = self.model_dir / "projection_components.npy"
+        self.ann_index_file = self.model_dir / "ann_index.npz"
+        self.manifest_file = self.model_dir / "manifest.json"
+        self.lock_file = self.data_dir / "model.lock"
+
+    @classmethod
+    def from_config(cls, data_dir, config=None):
+        """Artifact using the [RECOGNITION] settings from config.ini"""
+        config = config or load_system_config()
+        return cls(
+            data_dir,
+            projection_dims=config.getint(
+                "RECOGNITION", "PROJECTION_DIMS", fallback=0
+            ),
+            extractor_name=config.get(
+                "RECOGNITION", "FEATURE_EXTRACTOR", fallback=SAMPLE_EXTRACTOR
+            ),
+            candidate_people=config.getint(
+                "RECOGNITION", "CANDIDATE_PEOPLE", fallback=0
+            ),
+            ann_tables=config.getint("RECOGNITION", "ANN_TABLES", fallback=0),
+            ann_bits=config.getint("RECOGNITION", "ANN_BITS", fallback=12),
+            ann_probes=config.getint("RECOGNITION", "ANN_PROBES", fallback=2),
+            condense_method=config.get(
+                "RECOGNITION", "CONDENSE_METHOD", fallback="none"
+            ),
+            prototypes_per_person=config.getint(
+                "RECOGNITION", "PROTOTYPES_PER_PERSON", fallback=8
+            ),
+            unknown_threshold=(
+                config.getfloat("RECOGNITION", "UNKNOWN_THRESHOLD", fallback=3.0)
+                if config.getboolean("RECOGNITION", "UNKNOWN_REJECTION", fallback=False)
+                else None
+            ),
+        )
+
+    def sources_exist(self):
+        return self.gallery.exists()
+
+    def source_fingerprint(self):
+        """Cheap (size, mtime) fingerprint of the gallery manifest"""
+        if not self.gallery.imported():
+            return {self.gallery.manifest_file.name: None}
+        stat = self.gallery.manifest_file.stat()
+        return {self.gallery.manifest_file.name: [stat.st_size, stat.st_mtime_ns]}
+
+    def source_hash(self):
+        """Content signature of the live gallery shards"""
+        return self.gallery.signature()
+
+    def read_manifest(self):
+        if not self.manifest_file.exists():
+            return None
+        try:
+            with open(self.manifest_file, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read model manifest: {e}")
+            return None
+
+    def write_manifest(self, manifest, model_dir=None):
+        manifest_file = Path(model_dir or self.model_dir) / "manifest.json"
+        tmp_file = manifest_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_file, manifest_file)
+
+    def is_current(self):
+        """True if the artifact exists and was built from the current gallery"""
+        manifest = self.read_manifest()
+        if manifest is None or manifest.get("format_version") != MODEL_FORMAT_VERSION:
+            return False
+        if manifest.get("projection_dims", 0) != self.projection_dims:
+            return False
+        if manifest.get("extractor") != self.feature_extractor.describe():
+            return False
+        if manifest.get("ann_index") != self.ann_settings():
+            return False
+        if manifest.get("condense") != self.condense_settings():
+            return False
+        if not self.sources_exist():
+            return False
+
+        fingerprint = self.source_fingerprint()
+        if manifest.get("source_fingerprint") == fingerprint:
+            return True
+
+        # Files were touched (e.g. copied back from a backup), compare contents
+        if manifest.get("source_hash") != self.source_hash():
+            return False
+
+        manifest["source_fingerprint"] = fingerprint
+        self.write_manifest(manifest)
+        return True
+
+    def load_sources(self):
+        """Read the gallery store as canonical face images and names; both
+        are empty once everyone has been deleted"""
+        faces, names = self.gallery.load(verify=True)
+
+        # Samples are stored in the registration layout (50x50 BGR pixels)
+        width, height = self.gallery.sample_extractor.image_size
+        face_images = faces.reshape(-1, height, width, 3)
+        return face_images, names
+
+    def ann_settings(self):
+        """Build-time ANN parameters recorded in the manifest"""
+        if self.ann_tables <= 0:
+            return None
+        return {"n_tables": self.ann_tables, "n_bits": self.ann_bits}
+
+    def condense_settings(self):
+        """Build-time condensation parameters recorded in the manifest"""
+        if self.condense_method == "none":
+            return None
+        return {
+            "method": self.condense_method,
+            "prototypes_per_person": self.prototypes_per_person,
+        }
+
+    def build_ann_index(self, features, label_ids, names, reuse=True):
+        """LSH index over the new gallery, re-hashing only changed people
+
+        The previous artifact's hyperplanes are kept, and a person whose
+        stored rows are unchanged keeps their old bucket codes, so a
+        registration only hashes the samples it added. That only holds
+        without projection: a refit PCA basis moves every row, so the build
+        passes reuse=False and the index is hashed from scratch.
+        Returns (index, reused_rows).
+        """
+        index = LSHIndex(self.ann_tables, self.ann_bits, self.ann_probes)
+        previous = None
+        try:
+            if reuse and self.ann_index_file.exists():
+                previous = LSHIndex.load(self.ann_index_file)
+                old_features, old_label_ids, old_names = self.load()
+        except Exception as e:
+            print(f"⚠️ Previous ANN index not reusable: {e}")
+            previous = None
+
+        if (
+            previous is None
+            or (previous.n_tables, previous.n_bits) != (self.ann_tables, self.ann_bits)
+            or previous.planes.shape[1] != features.shape[1]
+            or old_features.dtype != features.dtype
+        ):
+            return index.build(features), 0
+
+        index.mean, index.planes = previous.mean, previous.planes
+        index.codes = np.empty((0, self.ann_tables), dtype=np.int64)
+
+        old_people = {name: p for p, name in enumerate(old_names)}
+        old_counts = np.bincount(old_label_ids, minlength=len(old_names))
+        old_offsets = np.concatenate(([0], np.cumsum(old_counts)))
+        counts = np.bincount(label_ids, minlength=len(names))
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        codes = np.empty((len(label_ids), self.ann_tables), dtype=np.int64)
+        stale = np.ones(len(label_ids), dtype=bool)
+        for p, name in enumerate(names):
+            q = old_people.get(name)
+            if (
+                q is not None
+                and old_counts[q] == counts[p]
+                and np.array_equal(
+                    old_features[old_offsets[q] : old_offsets[q + 1]],
+                    features[offsets[p] : offsets[p + 1]],
+                )
+            ):
+                codes[offsets[p] : offsets[p + 1]] = previous.codes[
+                    old_offsets[q] : old_offsets[q + 1]
+                ]
+                stale[offsets[p] : offsets[p + 1]] = False
+
+        if stale.any():
+            codes[stale] = index.hash(features[stale])
+        index.add(None, codes=codes)
+        return index, int((~stale).sum())
+
+    def build(self):
+        """Compile the gallery store into a fresh artifact, after any build
+        running in another process has finished"""
+        with file_lock(self.lock_file):
+            return self._build()
+
+    def _build(self):
+        fingerprint = self.source_fingerprint()
+        source_hash = self.source_hash()
+        face_images, names = self.load_sources()
+
+        name_table, label_ids = np.unique(np.asarray(names), return_inverse=True)
+        # Group samples by person so per-person blocks are contiguous
+        order = np.argsort(label_ids, kind="stable")
+        label_ids = label_ids[order].astype(np.int32)
+        # Pixel extractors keep their uint8 samples, 4x smaller than float32
+        if len(names):
+            features = self.feature_extractor.extract_batch(face_images[order])
+        else:
+            # Everyone was deleted: an empty artifact, every face is unknown
+            features = np.empty((0, self.feature_extractor.dims))
+        features = np.ascontiguousarray(features, dtype=self.feature_extractor.dtype)
+
+        # Optional eigenface stage: store projected vectors next to the basis
+        projection = None
+        projection_info = None
+        if self.projection_dims > 0 and features.shape[0] >= 2:
+            projection = PCAProjection().fit(features, self.projection_dims)
+            features = np.ascontiguousarray(projection.transform(features))
+            projection_info = {
+                "n_components": projection.n_components,
+                "n_input_features": projection.n_input_features,
+                "explained_variance_ratio": round(
+                    projection.explained_variance_ratio, 4
+                ),
+            }
+
+        # Per-person centroids for the coarse candidate search come from
+        # every sample; the stored rows are condensed if enabled, and their
+        # distance statistics are kept for unknown rejection
+        n_source_samples = int(features.shape[0])
+        features, label_ids, centroids, person_stats = condense_gallery(
+            features,
+            label_ids,
+            name_table,
+            self.condense_method,
+            self.prototypes_per_person,
+        )
+        if self.condense_method != "none":
+            print(
+                f"🗜️  Condensed gallery ({self.condense_method}): "
+                f"{n_source_samples} -> {len(label_ids)} samples"
+            )
+
+        ann_index = None
+        if self.ann_tables > 0 and len(label_ids):
+            ann_index, reused_rows = self.build_ann_index(
+                features, label_ids, name_table.tolist(), reuse=projection is None
+            )
+            print(
+                f"🔎 ANN index: {len(label_ids) - reused_rows} samples hashed, "
+                f"{reused_rows} reused"
+            )
+
+        content_digest = hashlib.sha256()
+        content_digest.update(features.tobytes())
+        content_digest.update(label_ids.tobytes())
+        content_digest.update(json.dumps(name_table.tolist()).encode())
+
+        manifest = {
+            "format_version": MODEL_FORMAT_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "n_samples": int(features.shape[0]),
+            "n_source_samples": n_source_samples,
+            "n_features": int(features.shape[1]),
+            "n_people": int(len(name_table)),
+            "dtype": str(features.dtype),
+            "extractor": self.feature_extractor.describe(),
+            "projection_dims": self.projection_dims,
+            "projection": projection_info,
+            "ann_index": self.ann_settings(),
+            "condense": self.condense_settings(),
+            "content_hash": content_digest.hexdigest(),
+            "source_hash": source_hash,
+            "source_fingerprint": fingerprint,
+        }
+
+        # Write into a scratch directory and swap it in, so a crash mid-build
+        # never leaves a half-written artifact behind. Scratch directories
+        # left by a crashed build are safe to remove while holding the lock.
+        for stale in self.data_dir.glob("model.*"):
+            if stale.is_dir():
+                shutil.rmtree(stale, ignore_errors=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix="model.", dir=self.data_dir))
+        tmp_dir.chmod(0o755)  # mkdtemp makes it private to this user
+        old_dir = tmp_dir.with_name(tmp_dir.name + ".old")
+
+        np.save(tmp_dir / self.features_file.name, features)
+        np.save(tmp_dir / self.label_ids_file.name, label_ids)
+        np.save(tmp_dir / self.centroids_file.name, centroids)
+        np.save(tmp_dir / self.person_stats_file.name, person_stats)
+        if ann_index is not None:
+            ann_index.save(tmp_dir / self.ann_index_file.name)
+        with open(tmp_dir / self.names_file.name, "w") as f:
+            json.dump(name_table.tolist(), f)
+        if projection is not None:
+            projection.save(
+                tmp_dir / self.projection_mean_file.name,
+                tmp_dir / self.projection_components_file.name,
+            )
+        self.write_manifest(manifest, tmp_dir)
+
+        if self.model_dir.exists():
+            os.replace(self.model_dir, old_dir)
+        os.replace(tmp_dir, self.model_dir)
+        if old_dir.exists():
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+        return manifest
+
+    def load(self):
+        """Open the artifact, memory-mapping the feature matrix
+
+        Returns (features, label_ids, names).
+        """
+        features = np.load(self.features_file, mmap_mode="r")
+        label_ids = np.load(self.label_ids_file)
+        with open(self.names_file, "r") as f:
+            names = json.load(f)
+        return features, label_ids, names
+
+    def load_projection(self):
+        """PCA basis stored with the artifact, or None for raw-pixel mode"""
+        if not self.projection_components_file.exists():
+            return None
+        return PCAProjection.load(
+            self.projection_mean_file, self.projection_components_file
+        )
+
+    def load_feature_extractor(self):
+        """Extractor the artifact's gallery was built with"""
+        manifest = self.read_manifest() or {}
+        extractor = manifest.get("extractor") or {"name": SAMPLE_EXTRACTOR}
+        return get_feature_extractor(extractor["name"])
+
+    def load_matcher(self, n_neighbors=5):
+        """FaceMatcher over the memory-mapped artifact"""
+        # The lock keeps a concurrent build from swapping the directory
+        # between files; the memory map stays valid after it is released
+        with file_lock(self.lock_file):
+            features, label_ids, names = self.load()
+            matcher = FaceMatcher(
+                n_neighbors=n_neighbors,
+                candidate_people=self.candidate_people,
+                unknown_threshold=self.unknown_threshold,
+            )
+            matcher.fit_encoded(
+                features,
+                label_ids,
+                names,
+                projection=self.load_projection(),
+                centroids=np.load(self.centroids_file),
+                person_stats=np.load(self.person_stats_file),
+            )
+            if self.ann_tables > 0 and self.ann_index_file.exists():
+                matcher.ann_index = LSHIndex.load(
+                    self.ann_index_file, self.ann_probes
+                )
+        return matcher
+
+    def ensure(self, blocking=True):
+        """Rebuild the artifact if the gallery or settings changed
+
+        Returns False, without building, if blocking is False and another
+        process holds the model lock (is building); True otherwise.
+        """
+        if self.is_current():
+            return True
+        with file_lock(self.lock_file, blocking=blocking) as locked:
+            if not locked:
+                return False
+            if self.is_current():
+                return True  # built by the process we waited for
+            print("🔨 Face data changed, rebuilding model artifact...")
+            manifest = self._build()
+            print(
+                f"✅ Model artifact built: {manifest['n_people']} people, "
+                f"{manifest['n_samples']} samples"
+            )
+        return True
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the face model artifact")
+    parser.add_argument(
+        "--force", action="store_true", help="Rebuild even if the artifact is current"
+    )
+    args = parser.parse_args()
+
+    artifact = FaceModelArtifact.from_config(Path(__file__).parent.parent / "data")
+    if not artifact.sources_exist():
+        print("❌ Training data not found!")
+        print("💡 Please run 'python add_faces_rpi.py' first to register faces")
+        sys.exit(1)
+    artifact.gallery.import_legacy()
+
+    if artifact.is_current() and not args.force:
+        print(f"✅ Model artifact is up to date: {artifact.model_dir}")
+        return
+
+    manifest = artifact.build()
+    print(f"✅ Model artifact written to {artifact.model_dir}")
+    print(f"📊 People: {manifest['n_people']}, samples: {manifest['n_samples']}")
+    print(
+        f"🧬 Feature extractor: {manifest['extractor']['name']} "
+        f"v{manifest['extractor']['version']} ({manifest['extractor']['dims']} dims)"
+    )
+    if manifest["projection"]:
+        projection = manifest["projection"]
+        print(
+            f"📉 PCA projection: {projection['n_input_features']} -> "
+            f"{projection['n_components']} dims "
+            f"({projection['explained_variance_ratio'] * 100:.1f}% variance kept)"
+        )
+    print(f"🔑 Content hash: {manifest['content_hash'][:16]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+PCA (eigenface) projection for the face gallery
+Projects 7500-dim raw pixel samples onto a small basis before matching
+"""
+
+import numpy as np
+
+# Above this many samples the basis is found with a randomized SVD
+EXACT_SVD_MAX_SAMPLES = 2000
+
+
+class PCAProjection:
+    """Mean-centred linear projection onto the top principal components"""
+
+    def __init__(self, mean=None, components=None):
+        self.mean = mean
+        self.components = components  # (n_components, n_input_features)
+        self.explained_variance_ratio = None
+
+    @property
+    def n_components(self):
+        return 0 if self.components is None else self.components.shape[0]
+
+    @property
+    def n_input_features(self):
+        return 0 if self.components is None else self.components.shape[1]
+
+    def fit(self, features, n_components, seed=0):
+        """Fit the basis on (n_samples, n_features) gallery data"""
+        data = np.asarray(features, dtype=np.float32).reshape(len(features), -1)
+        n_samples, n_features = data.shape
+        # A centred gallery of n samples spans at most n - 1 directions
+        n_components = max(1, min(n_components, n_samples - 1, n_features))
+
+        self.mean = data.mean(axis=0)
+        centred = data - self.mean
+        total_variance = float(np.einsum("ij,ij->", centred, centred))
+
+        if n_samples <= EXACT_SVD_MAX_SAMPLES:
+            _, singular_values, vt = np.linalg.svd(centred, full_matrices=False)
+        else:
+            singular_values, vt = self._randomized_svd(centred, n_components, seed)
+
+        self.components = np.ascontiguousarray(vt[:n_components], dtype=np.float32)
+        kept_variance = float(np.sum(singular_values[:n_components] ** 2))
+        self.explained_variance_ratio = kept_variance / max(total_variance, 1e-12)
+        return self
+
+    @staticmethod
+    def _randomized_svd(centred, n_components, seed, oversample=10, n_iter=2):
+        """Top singular vectors without forming the feature covariance matrix"""
+        rng = np.random.default_rng(seed)
+        sketch = rng.standard_normal(
+            (centred.shape[1], n_components + oversample)
+        ).astype(np.float32)
+
+        basis, _ = np.linalg.qr(centred @ sketch)
+        for _ in range(n_iter):
+            basis, _ = np.linalg.qr(centred.T @ basis)
+            basis, _ = np.linalg.qr(centred @ basis)
+
+        _, singular_values, vt = np.linalg.svd(basis.T @ centred, full_matrices=False)
+        return singular_values, vt
+
+    def transform(self, features):
+        """Project (n, n_input_features) samples to (n, n_components) float32"""
+        data = np.asarray(features, dtype=np.float32).reshape(len(features), -1)
+        return (data - self.mean) @ self.components.T
+
+    def save(self, mean_file, components_file):
+        np.save(mean_file, self.mean)
+        np.save(components_file, self.components)
+
+    @classmethod
+    def load(cls, mean_file, components_file):
+        return cls(np.load(mean_file), np.load(components_file))
@@ -0,0 +1,137 @@
+"""
+Face recognition for the kiosk
+The face model, its hot reloader, the feature extractor / matcher and the
+face tracker, bundled so recognition can run in the kiosk's recognize
+stage or in a separate worker process.
+"""
+
+from face_model import FaceModelArtifact
+from face_tracker import FaceTracker
+from model_reloader import ModelReloader
+
+
+class FaceRecognizer:
+    """Frame plus detected face boxes -> one identified track per face
+
+    Recognitions of a face add up as evidence on its track, so each face is
+    matched every few frames until its identity is decided and only
+    re-checked after that. Confidences below confidence_threshold are
+    reported as None (shown, never auto-recorded).
+    """
+
+    def __init__(
+        self, face_model, face_tracker, reloader=None, confidence_threshold=0.6
+    ):
+        self.face_model = face_model
+        self.face_tracker = face_tracker
+        self.reloader = reloader
+        self.confidence_threshold = confidence_threshold
+        self.n_neighbors = reloader.n_neighbors if reloader else 5
+
+        self.matcher = None
+        self.feature_extractor = None
+
+    @classmethod
+    def from_config(cls, data_dir, config, confidence_threshold=0.6):
+        face_model = FaceModelArtifact.from_config(data_dir, config)
+        # Picks up registrations made while the kiosk is running
+        reloader = ModelReloader(
+            face_model,
+            n_neighbors=5,
+            poll_interval=config.getfloat(
+                "RECOGNITION", "MODEL_RELOAD_INTERVAL", fallback=2.0
+            ),
+        )
+        return cls(
+            face_model,
+            FaceTracker.from_config(config),
+            reloader,
+            confidence_threshold=confidence_threshold,
+        )
+
+    def load(self):
+        """Build the model artifact if needed, load it and start watching
+        for registrations; raises if the model cannot be loaded"""
+        # Kiosk start-up is where a pre-store install's pickles get imported
+        self.face_model.gallery.import_legacy()
+        # Memory-mapped model artifact, rebuilt only when the gallery changes
+        self.face_model.ensure()
+
+        # Vectorized KNN matcher (with PCA projection if enabled)
+        self.matcher = self.face_model.load_matcher(n_neighbors=self.n_neighbors)
+        self.feature_extractor = self.face_model.load_feature_extractor()
+        if self.reloader is not None:
+            self.reloader.start(self.face_model.read_manifest())
+
+    def stop(self):
+        if self.reloader is not None:
+            self.reloader.stop()
+
+    def apply_model_update(self):
+        """Swap in a gallery reloaded in the background, between frames;
+        returns its manifest, or None if there was no update"""
+        update = self.reloader.take_update() if self.reloader else None
+        if update is None:
+            return None
+        self.matcher, self.feature_extractor, manifest = update
+        # Identities came from the old gallery, re-recognize every track
+        self.face_tracker.forget_identities()
+        return manifest
+
+    def recognize_face(self, face_roi):
+        """(name, confidence or None, raw confidence) of one face crop"""
+        try:
+            face_image = self.feature_extractor.prepare(face_roi)
+            features = self.feature_extractor.extract(face_image)
+
+            # Single distance pass gives the vote, the nearest distance and
+            # the unknown decision (prediction is None for strangers)
+            prediction, confidence, distance, score = self.matcher.match(features)
+
+            return (
+                prediction,
+                confidence if confidence >= self.confidence_threshold else None,
+                confidence,
+            )
+
+        except Exception as e:
+            print(f"❌ Face recognition error: {e}")
+            return None, 0.0
+
+    def recognize_faces(self, frame, faces):
+        """Recognize all faces from a detectMultiScale result in one batch"""
+        if len(faces) == 0:
+            return []
+
+        try:
+            features = self.feature_extractor.extract_from_frame(frame, faces)
+            matches = self.matcher.match_batch(features)
+
+            return [
+                (
+                    prediction,
+                    confidence if confidence >= self.confidence_threshold else None,
+                    confidence,
+                )
+                for prediction, confidence, distance, score in matches
+            ]
+
+        except Exception as e:
+            print(f"❌ Face recognition error: {e}")
+            return [(None, 0.0)] * len(faces)
+
+    def process(self, frame, faces):
+        """Track of every face box, with its identity evidence updated"""
+        tracker = self.face_tracker
+
+        # Follow faces across frames; only new tracks and tracks due for
+        # another recognition are matched, the others reuse their evidence
+        tracks = tracker.update(faces)
+        pending = [i for i, track in enumerate(tracks) if tracker.needs_recognition(track)]
+
+        # All pending faces in the frame share one distance computation
+        recognition_results = self.recognize_faces(frame, [faces[i] for i in pending])
+        for i, recognition_result in zip(pending, recognition_results):
+            tracker.set_recognition(tracks[i], recognition_result)
+        tracker.note_reuse(len(tracks) - len(pending))
+        return tracks
@@ -0,0 +1,293 @@
+"""
+Lightweight multi-face tracker for the kiosk
+Associates detections across frames by box overlap and accumulates identity
+evidence per track, so a face is recognized every few frames instead of on
+every frame.
+"""
+
+import time
+
+import numpy as np
+
+
+def box_iou(boxes_a, boxes_b):
+    """IoU matrix between two lists of (x, y, w, h) boxes"""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    left = np.maximum(a[:, None, 0], b[None, :, 0])
+    top = np.maximum(a[:, None, 1], b[None, :, 1])
+    right = np.minimum(a[:, None, 0] + a[:, None, 2], b[None, :, 0] + b[None, :, 2])
+    bottom = np.minimum(a[:, None, 1] + a[:, None, 3], b[None, :, 1] + b[None, :, 3])
+
+    intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    area_a = a[:, 2] * a[:, 3]
+    area_b = b[:, 2] * b[:, 3]
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+class FaceTrack:
+    """One face followed across frames
+
+    Besides its box, a track keeps running (exponential moving average)
+    statistics of its position and recognition confidence, and the decayed
+    identity evidence collected from the recognitions run on it.
+    """
+
+    def __init__(self, track_id, box, frame_index, smoothing=0.3):
+        self.track_id = track_id
+        self.box = tuple(int(v) for v in box)
+        self.first_frame = frame_index
+        self.first_seen = time.time()
+        self.last_seen_frame = frame_index
+        self.missed_frames = 0
+        self.hits = 1
+        self.smoothing = smoothing
+
+        # Running position / confidence statistics (O(1) per update)
+        self.center_mean = np.array(self.center, dtype=np.float64)
+        self.center_var = np.zeros(2)
+        self.confidence_mean = 0.0
+        self.confidence_var = 0.0
+        self.observations = 0
+
+        # Identity evidence: name (None = unknown) -> decayed log-odds sum
+        self.evidence = {}
+        self.evidence_frame = frame_index
+        self.decided = None  # name the evidence settled on, or None
+        self.is_decided = False
+        self.decision_frame = None  # frame of the first decision
+        self.recognition = None  # last raw (name, confidence, raw_confidence)
+        self.recognized_frame = None
+
+    @property
+    def name(self):
+        return self.decided if self.is_decided else None
+
+    @property
+    def center(self):
+        x, y, w, h = self.box
+        return (x + w // 2, y + h // 2)
+
+    @staticmethod
+    def _ema(mean, var, value, alpha):
+        """Exponentially weighted mean and variance update"""
+        delta = value - mean
+        mean = mean + alpha * delta
+        var = (1 - alpha) * (var + alpha * delta * delta)
+        return mean, var
+
+    def update_position(self, box):
+        self.box = tuple(int(v) for v in box)
+        self.center_mean, self.center_var = self._ema(
+            self.center_mean, self.center_var, np.array(self.center), self.smoothing
+        )
+
+    def update_confidence(self, confidence):
+        if self.observations == 0:
+            self.confidence_mean = confidence
+        else:
+            self.confidence_mean, self.confidence_var = self._ema(
+                self.confidence_mean, self.confidence_var, confidence, self.smoothing
+            )
+        self.observations += 1
+
+    @property
+    def identity(self):
+        """(name, confidence, raw_confidence) for the kiosk
+
+        Until the evidence settles, the leading candidate is reported with
+        a None confidence so it is shown but never recorded.
+        """
+        if not self.evidence:
+            return (None, None, 0.0)
+        if self.is_decided:
+            return (self.decided, self.confidence_mean, self.confidence_mean)
+        leader = max(self.evidence, key=self.evidence.get)
+        raw_confidence = self.recognition[-1] if self.recognition else 0.0
+        return (leader, None, raw_confidence or 0.0)
+
+
+class FaceTracker:
+    """IoU/centroid association of detections to tracks with identity evidence
+
+    Each recognition of a track adds evidence for the name it returned:
+    the log-odds of its vote confidence, clipped to +-max_evidence, with
+    votes under 50% adding nothing. All evidence decays by evidence_decay
+    every frame. A track's identity is decided once one name's evidence
+    reaches accept_evidence and released again once it falls below half of
+    that (a sequential test with decay). Another name only takes over a
+    decided track once it leads and has itself reached accept_evidence.
+
+    Undecided tracks are recognized every recognize_every frames, decided
+    ones only every recheck_interval frames.
+    """
+
+    def __init__(
+        self,
+        iou_threshold=0.3,
+        max_missed_frames=5,
+        recheck_interval=15,
+        recognize_every=3,
+        evidence_decay=0.97,
+        accept_evidence=4.0,
+        max_evidence=3.0,
+    ):
+        self.iou_threshold = iou_threshold
+        self.max_missed_frames = max_missed_frames
+        self.recheck_interval = recheck_interval
+        self.recognize_every = recognize_every
+        self.evidence_decay = evidence_decay
+        self.accept_evidence = accept_evidence
+        self.max_evidence = max_evidence
+
+        self.tracks = []
+        self.next_track_id = 1
+        self.frame_index = 0
+
+        # Statistics
+        self.recognitions = 0
+        self.reuses = 0
+        self.decisions = 0
+        self.frames_to_decision = 0
+
+    @classmethod
+    def from_config(cls, config):
+        section = "RECOGNITION"
+        return cls(
+            recheck_interval=config.getint(section, "TRACK_RECHECK_FRAMES", fallback=15),
+            recognize_every=config.getint(section, "TRACK_RECOGNIZE_EVERY", fallback=3),
+            evidence_decay=config.getfloat(section, "EVIDENCE_DECAY", fallback=0.97),
+            accept_evidence=config.getfloat(section, "EVIDENCE_THRESHOLD", fallback=4.0),
+            max_missed_frames=config.getint(
+                section, "TRACK_MAX_MISSED_FRAMES", fallback=5
+            ),
+        )
+
+    def _associate(self, boxes):
+        """Greedy matching of detections to tracks, best overlap first
+
+        Falls back to centre distance (within half the track's box size)
+        for fast movement that leaves no overlap.
+        """
+        assignments = {}
+        if not self.tracks or not boxes:
+            return assignments
+
+        iou = box_iou([t.box for t in self.tracks], boxes)
+        for flat in np.argsort(-iou, axis=None):
+            t, d = np.unravel_index(flat, iou.shape)
+            if iou[t, d] < self.iou_threshold:
+                break
+            if t in assignments.values() or d in assignments:
+                continue
+            assignments[d] = t
+
+        for d, (x, y, w, h) in enumerate(boxes):
+            if d in assignments:
+                continue
+            center = np.array([x + w / 2, y + h / 2])
+            best_track, best_distance = None, None
+            for t, track in enumerate(self.tracks):
+                if t in assignments.values():
+                    continue
+                distance = np.linalg.norm(center - np.array(track.center))
+                if distance < max(track.box[2], track.box[3]) / 2 and (
+                    best_distance is None or distance < best_distance
+                ):
+                    best_track, best_distance = t, distance
+            if best_track is not None:
+                assignments[d] = best_track
+
+        return assignments
+
+    def update(self, boxes):
+        """Advance one frame; returns the track of every detection, in order"""
+        self.frame_index += 1
+        boxes = [tuple(int(v) for v in box) for box in boxes]
+        assignments = self._associate(boxes)
+
+        matched_tracks = set()
+        frame_tracks = []
+        for d, box in enumerate(boxes):
+            if d in assignments:
+                track = self.tracks[assignments[d]]
+                track.update_position(box)
+                track.last_seen_frame = self.frame_index
+                track.missed_frames = 0
+                track.hits += 1
+            else:
+                track = FaceTrack(self.next_track_id, box, self.frame_index)
+                self.next_track_id += 1
+                self.tracks.append(track)
+            matched_tracks.add(track.track_id)
+            frame_tracks.append(track)
+
+        # Age out tracks that have not been seen for a while
+        for track in self.tracks:
+            if track.track_id not in matched_tracks:
+                track.missed_frames += 1
+        self.tracks = [
+            t for t in self.tracks if t.missed_frames <= self.max_missed_frames
+        ]
+
+        return frame_tracks
+
+    def needs_recognition(self, track):
+        """True if the track is due for another recognition"""
+        if track.recognition is None:
+            return True
+        interval = self.recheck_interval if track.is_decided else self.recognize_every
+        return self.frame_index - track.recognized_frame >= interval
+
+    def _decay(self, track):
+        factor = self.evidence_decay ** (self.frame_index - track.evidence_frame)
+        for name in track.evidence:
+            track.evidence[name] *= factor
+        track.evidence_frame = self.frame_index
+
+    def set_recognition(self, track, recognition):
+        """Add a recognition result (name, confidence[, raw_confidence]) to
+        the track's evidence and update its decision"""
+        self.recognitions += 1
+        track.recognition = recognition
+        track.recognized_frame = self.frame_index
+
+        name = recognition[0]
+        raw_confidence = recognition[2] if len(recognition) > 2 else recognition[1]
+        raw_confidence = raw_confidence or 0.0
+        track.update_confidence(raw_confidence)
+
+        self._decay(track)
+        p = min(max(raw_confidence, 1e-3), 1 - 1e-3)
+        weight = min(np.log(p / (1 - p)), self.max_evidence)
+        if weight > 0:
+            track.evidence[name] = track.evidence.get(name, 0.0) + weight
+
+        leader = max(track.evidence, key=track.evidence.get, default=None)
+        leading = track.evidence.get(leader, 0.0)
+        if leading >= self.accept_evidence and (
+            not track.is_decided or leader != track.decided
+        ):
+            if track.decision_frame is None:
+                track.decision_frame = self.frame_index
+                self.decisions += 1
+                self.frames_to_decision += self.frame_index - track.first_frame + 1
+            track.decided, track.is_decided = leader, True
+        elif track.is_decided and track.evidence.get(track.decided, 0.0) < (
+            self.accept_evidence / 2
+        ):
+            track.is_decided = False
+
+    def forget_identities(self):
+        """Drop every track's identity, e.g. after the gallery was reloaded"""
+        for track in self.tracks:
+            track.recognition = None
+            track.recognized_frame = None
+            track.evidence = {}
+            track.decided, track.is_decided = None, False
+
+    def note_reuse(self, count=1):
+        """Count detections that reused their track's identity"""
+        self.reuses += count
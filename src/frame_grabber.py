@@ -0,0 +1,119 @@
+"""
+Threaded camera capture for the kiosk
+A capture thread drains the camera at its own rate into a latest-frame
+slot, so a slow iteration of the processing loop (speech, a CSV write)
+skips frames instead of working through a backlog of stale ones.
+"""
+
+import threading
+import time
+
+
+class FrameGrabber:
+    """Triple-buffered latest-frame slot fed by a capture thread
+
+    Three preallocated frame buffers rotate between the capture thread
+    (writing), the slot (latest complete frame) and the consumer (the frame
+    last returned by read()), so neither side ever copies a frame or waits
+    for the other to finish with one. Frames overwritten in the slot before
+    the consumer took them are counted as dropped.
+
+    read() has the same (ret, frame) interface as cv2.VideoCapture.read();
+    the returned frame stays valid until the next call.
+
+    throttle(interval) makes the capture thread read the camera only every
+    interval seconds (the kiosk's idle polling rate) until it is called
+    again with 0.
+    """
+
+    def __init__(self, video, read_timeout=2.0, max_failures=30):
+        self.video = video
+        self.read_timeout = read_timeout
+        self.max_failures = max_failures
+
+        self._buffers = [None, None, None]
+        self._capture_times = [0.0, 0.0, 0.0]
+        self._writing, self._latest, self._reading = 0, 1, 2
+        self._fresh = False
+        self._failed = False
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # set unless throttled
+        self._wake.set()
+        self._thread = None
+        self.idle_interval = 0.0
+
+        # Statistics
+        self.captured = 0
+        self.consumed = 0
+        self.dropped = 0
+        self.frame_time = None  # capture time of the frame last returned
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._capture, name="frame-grabber", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.read_timeout)
+            self._thread = None
+
+    def throttle(self, interval):
+        """Read the camera every interval seconds; 0 for its full rate"""
+        self.idle_interval = interval
+        if interval > 0:
+            self._wake.clear()
+        else:
+            self._wake.set()  # cut a throttled wait short
+
+    def _capture(self):
+        failures = 0
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            # Reuses the buffer when shape and type match; the first read
+            # into each slot allocates it
+            ret, frame = self.video.read(self._buffers[self._writing])
+            if not ret:
+                failures += 1
+                if failures >= self.max_failures:
+                    with self._condition:
+                        self._failed = True
+                        self._condition.notify_all()
+                    return
+                time.sleep(0.01)
+                continue
+            failures = 0
+
+            with self._condition:
+                self._buffers[self._writing] = frame
+                self._capture_times[self._writing] = time.time()
+                if self._fresh:
+                    self.dropped += 1
+                self._writing, self._latest = self._latest, self._writing
+                self._fresh = True
+                self.captured += 1
+                self._condition.notify_all()
+
+            if self.idle_interval > 0:
+                self._wake.wait(self.idle_interval - (time.perf_counter() - started))
+
+    def read(self):
+        """(True, freshest frame) or (False, None) if the camera stopped
+        delivering frames"""
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._fresh or self._failed,
+                timeout=self.read_timeout + self.idle_interval,
+            ) or not self._fresh:
+                return False, None
+            self._reading, self._latest = self._latest, self._reading
+            self._fresh = False
+            self.consumed += 1
+            self.frame_time = self._capture_times[self._reading]
+            return True, self._buffers[self._reading]
@@ -0,0 +1,453 @@
+"""
+Incremental face gallery store
+Keeps registered face samples as one immutable .npy shard per person listed
+in a small manifest, so enrolling or removing one person costs time
+proportional to that person's samples instead of re-pickling the whole
+roster.
+
+Usage: python src/gallery_store.py [--compact] [--verify] [--export-legacy]
+"""
+
+import os
+import re
+import sys
+import json
+import pickle
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+# Inter-process locking is POSIX only; elsewhere the locks are no-ops
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from face_features import SAMPLE_EXTRACTOR, get_feature_extractor
+
+# Bump when the store layout changes
+GALLERY_FORMAT_VERSION = 1
+
+# Pre-store gallery files, imported once; written again only on request
+# (--export-legacy) for external tools that still read them
+LEGACY_FILES = ("faces_data.pkl", "names.pkl")
+
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """Exclusive lock on a lock file shared by every process on the host
+
+    Yields True once the lock is held. With blocking=False it yields False
+    right away if another process holds it.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GalleryStore:
+    """Per-person sharded gallery in data/gallery/
+
+    Layout:
+        manifest.json          format version, shard counter and one entry
+                               per shard: {"id", "name", "file", "samples",
+                               "extractor", "sha256", "deleted"}
+        shards/<id>-<name>.npy uint8 (samples, 7500) raw_bgr samples of one
+                               person, never modified once written
+
+    Every file is written to a temporary name and renamed into place, and a
+    shard is listed in the manifest only after it is complete, so a crash
+    never leaves a half-written shard or manifest behind. Writers hold
+    gallery.lock from reading the manifest until it is saved, so concurrent
+    processes (two registration sessions, a --compact run) never lose an
+    update or take the same shard id.
+
+    add_person and replace_person write one new shard, replace_person and
+    remove_person tombstone the person's older shard. compact() deletes
+    tombstoned shards; it is run in the background once tombstones pass
+    compact_ratio of the samples. The legacy pickles are not kept in sync;
+    export_legacy() writes a snapshot of the live gallery on request.
+    """
+
+    def __init__(self, data_dir, compact_ratio=0.25):
+        self.data_dir = Path(data_dir)
+        self.gallery_dir = self.data_dir / "gallery"
+        self.shards_dir = self.gallery_dir / "shards"
+        self.manifest_file = self.gallery_dir / "manifest.json"
+        self.lock_file = self.data_dir / "gallery.lock"
+        self.compact_ratio = compact_ratio
+        self.sample_extractor = get_feature_extractor(SAMPLE_EXTRACTOR)
+
+        self._lock = threading.RLock()
+        self._compaction = None
+
+    # Manifest -----------------------------------------------------------
+
+    def legacy_paths(self):
+        return [self.data_dir / name for name in LEGACY_FILES]
+
+    def exists(self):
+        """True if there is a gallery, in the store or still in the pickles"""
+        return self.manifest_file.exists() or all(
+            path.exists() for path in self.legacy_paths()
+        )
+
+    def imported(self):
+        """True once the store has a manifest (the pickles were imported)"""
+        return self.manifest_file.exists()
+
+    def read_manifest(self):
+        """Current manifest; empty until the legacy pickles are imported"""
+        with self._lock:
+            if not self.manifest_file.exists():
+                return self._empty_manifest()
+            with open(self.manifest_file, "r") as f:
+                manifest = json.load(f)
+        if manifest.get("format_version") != GALLERY_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported gallery format {manifest.get('format_version')}"
+            )
+        return manifest
+
+    def _empty_manifest(self):
+        return {"format_version": GALLERY_FORMAT_VERSION, "next_id": 1, "shards": []}
+
+    def _write_manifest(self, manifest):
+        self.gallery_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.manifest_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(manifest, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.manifest_file)
+
+    def _read_legacy(self):
+        """Samples and per-sample names from faces_data.pkl / names.pkl"""
+        with open(self.data_dir / "names.pkl", "rb") as f:
+            names = list(pickle.load(f))
+        with open(self.data_dir / "faces_data.pkl", "rb") as f:
+            faces = pickle.load(f)
+        return np.asarray(faces).reshape(len(names), -1), names
+
+    def import_legacy(self):
+        """One-time migration from faces_data.pkl / names.pkl
+
+        An explicit step, run when registration or the kiosk starts; until
+        then read-only users (the web app, benchmarks) read the pickles
+        without writing anything. Serialized across processes by a lock
+        file. Returns True if this call imported the pickles.
+        """
+        with file_lock(self.lock_file), self._lock:
+            if self.imported() or not all(
+                path.exists() for path in self.legacy_paths()
+            ):
+                return False
+
+            faces, names = self._read_legacy()
+            manifest = self._empty_manifest()
+            names = np.asarray(names)
+            for name in dict.fromkeys(names.tolist()):
+                self._append_shard(manifest, name, faces[names == name])
+            self._write_manifest(manifest)
+        print(f"📦 Imported {len(names)} samples into {self.gallery_dir}")
+        return True
+
+    # Shards -------------------------------------------------------------
+
+    def shard_path(self, entry):
+        return self.gallery_dir / entry["file"]
+
+    def _shard_entry(self, shard_id, name, samples):
+        # Readable file names; the id keeps them unique per write
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "_", name).strip("_")[:40] or "person"
+        return {
+            "id": shard_id,
+            "name": name,
+            "file": f"shards/{shard_id:06d}-{slug}.npy",
+            "samples": int(samples),
+            "extractor": self.sample_extractor.describe(),
+            "sha256": None,
+            "deleted": False,
+        }
+
+    def _validate_samples(self, samples):
+        samples = np.asarray(samples)
+        samples = samples.reshape(samples.shape[0], -1)
+        if samples.shape[1] != self.sample_extractor.dims:
+            raise ValueError(
+                f"Expected {self.sample_extractor.dims} features per sample "
+                f"({SAMPLE_EXTRACTOR}), got {samples.shape[1]}"
+            )
+        return np.ascontiguousarray(samples, dtype=np.uint8)
+
+    def _append_shard(self, manifest, name, samples):
+        """Write a shard file and list it in the (unsaved) manifest"""
+        samples = self._validate_samples(samples)
+        entry = self._shard_entry(manifest["next_id"], name, len(samples))
+        manifest["next_id"] += 1
+
+        path = self.shard_path(entry)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix(".npy.tmp")
+        with open(tmp_file, "wb") as f:
+            np.save(f, samples)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+
+        entry["sha256"] = file_sha256(path)
+        manifest["shards"].append(entry)
+        return entry
+
+    def read_shard(self, entry, verify=False):
+        """Samples of one shard, optionally checked against its checksum"""
+        path = self.shard_path(entry)
+        if verify and file_sha256(path) != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch in {path.name} ({entry['name']})")
+        if entry["extractor"]["name"] != SAMPLE_EXTRACTOR:
+            raise ValueError(
+                f"{path.name} holds {entry['extractor']['name']} samples, "
+                f"expected {SAMPLE_EXTRACTOR}"
+            )
+        samples = np.load(path)
+        if samples.shape != (entry["samples"], self.sample_extractor.dims):
+            raise ValueError(f"{path.name} has shape {samples.shape}")
+        return samples
+
+    @staticmethod
+    def _live_shards(manifest, name=None):
+        shards = [e for e in manifest["shards"] if not e["deleted"]]
+        if name is not None:
+            shards = [e for e in shards if e["name"].lower() == name.lower()]
+        return shards
+
+    # Queries ------------------------------------------------------------
+
+    def people(self):
+        """{name: sample count} of registered people, in enrollment order"""
+        if not self.imported() and self.exists():
+            _, names = self._read_legacy()
+            return {name: names.count(name) for name in dict.fromkeys(names)}
+        return {
+            entry["name"]: entry["samples"]
+            for entry in self._live_shards(self.read_manifest())
+        }
+
+    def find_person(self, name):
+        """Registered spelling of a name (case-insensitive), or None"""
+        for person in self.people():
+            if person.lower() == name.lower():
+                return person
+        return None
+
+    def load_person(self, name, verify=True):
+        """One person's samples, reading only their shard"""
+        shards = self._live_shards(self.read_manifest(), name)
+        if not shards:
+            raise KeyError(name)
+        return self.read_shard(shards[-1], verify=verify)
+
+    def load(self, names=None, verify=False):
+        """Live samples and their per-sample names
+
+        Only the shards of the given names are read when names is passed.
+        Returns (uint8 (n_samples, 7500) array, list of names).
+        """
+        if not self.imported() and self.exists():
+            faces, all_names = self._read_legacy()
+            wanted = None if names is None else {name.lower() for name in names}
+            keep = [
+                i
+                for i, name in enumerate(all_names)
+                if wanted is None or name.lower() in wanted
+            ]
+            samples = self._validate_samples(faces[keep]) if keep else faces[:0]
+            return samples, [all_names[i] for i in keep]
+
+        shards = self._live_shards(self.read_manifest())
+        if names is not None:
+            wanted = {name.lower() for name in names}
+            shards = [e for e in shards if e["name"].lower() in wanted]
+        if not shards:
+            return np.empty((0, self.sample_extractor.dims), np.uint8), []
+        samples = np.concatenate([self.read_shard(e, verify) for e in shards])
+        names = [e["name"] for e in shards for _ in range(e["samples"])]
+        return samples, names
+
+    def verify(self):
+        """Names whose shard is missing or fails its checksum"""
+        damaged = []
+        for entry in self._live_shards(self.read_manifest()):
+            try:
+                self.read_shard(entry, verify=True)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  {entry['name']}: {e}")
+                damaged.append(entry["name"])
+        return damaged
+
+    def signature(self):
+        """Hash of the live shard checksums; identifies the gallery contents
+        without reading any samples"""
+        live = [
+            [e["name"], e["sha256"]] for e in self._live_shards(self.read_manifest())
+        ]
+        return hashlib.sha256(json.dumps(live).encode()).hexdigest()
+
+    # Updates ------------------------------------------------------------
+
+    def add_person(self, name, samples):
+        """Enroll a new person; raises ValueError if the name exists"""
+        self.import_legacy()
+        with file_lock(self.lock_file), self._lock:
+            manifest = self.read_manifest()
+            if self._live_shards(manifest, name):
+                raise ValueError(f"'{name}' is already registered")
+            self._append_shard(manifest, name, samples)
+            self._write_manifest(manifest)
+
+    def replace_person(self, name, samples):
+        """Swap a person's samples for new ones (enrolls them if missing)"""
+        self.import_legacy()
+        with file_lock(self.lock_file), self._lock:
+            manifest = self.read_manifest()
+            old_shards = self._live_shards(manifest, name)
+            self._append_shard(manifest, name, samples)
+            for entry in old_shards:
+                entry["deleted"] = True
+            self._write_manifest(manifest)
+        self.maybe_compact()
+
+    def remove_person(self, name):
+        """Tombstone a person's samples; returns how many were removed"""
+        self.import_legacy()
+        with file_lock(self.lock_file), self._lock:
+            manifest = self.read_manifest()
+            shards = self._live_shards(manifest, name)
+            for entry in shards:
+                entry["deleted"] = True
+            if shards:
+                self._write_manifest(manifest)
+        self.maybe_compact()
+        return sum(e["samples"] for e in shards)
+
+    # Compaction ---------------------------------------------------------
+
+    def dead_ratio(self, manifest=None):
+        shards = (manifest or self.read_manifest())["shards"]
+        total = sum(e["samples"] for e in shards)
+        dead = sum(e["samples"] for e in shards if e["deleted"])
+        return dead / total if total else 0.0
+
+    def maybe_compact(self):
+        """Start a background compaction if enough samples are tombstoned"""
+        if self.dead_ratio() <= self.compact_ratio:
+            return None
+        if self._compaction is not None and self._compaction.is_alive():
+            return self._compaction
+        # Not a daemon: a registration run finishes compacting before exit
+        self._compaction = threading.Thread(
+            target=self.compact, name="gallery-compaction"
+        )
+        self._compaction.start()
+        return self._compaction
+
+    def compact(self):
+        """Drop tombstoned shards"""
+        with file_lock(self.lock_file), self._lock:
+            manifest = self.read_manifest()
+            dead = [e for e in manifest["shards"] if e["deleted"]]
+            manifest["shards"] = self._live_shards(manifest)
+            self._write_manifest(manifest)
+
+        # Readers only open shards listed as live, so these can go now
+        for entry in dead:
+            try:
+                self.shard_path(entry).unlink()
+            except FileNotFoundError:
+                pass
+        return len(dead)
+
+    def export_legacy(self):
+        """Write a faces_data.pkl / names.pkl snapshot of the live gallery for
+        external tools; reads every shard, so it is never part of a write"""
+        with self._lock:
+            samples, names = self.load()
+            for file_name, data in (
+                ("faces_data.pkl", samples),
+                ("names.pkl", names),
+            ):
+                tmp_file = self.data_dir / (file_name + ".tmp")
+                with open(tmp_file, "wb") as f:
+                    pickle.dump(data, f)
+                os.replace(tmp_file, self.data_dir / file_name)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or compact the gallery")
+    parser.add_argument(
+        "--compact", action="store_true", help="Drop deleted samples now"
+    )
+    parser.add_argument(
+        "--verify", action="store_true", help="Check every shard's checksum"
+    )
+    parser.add_argument(
+        "--export-legacy",
+        action="store_true",
+        help="Write faces_data.pkl / names.pkl from the gallery",
+    )
+    args = parser.parse_args()
+
+    store = GalleryStore(Path(__file__).parent.parent / "data")
+    if not store.exists():
+        print("❌ Training data not found!")
+        print("💡 Please run 'python add_faces_rpi.py' first to register faces")
+        sys.exit(1)
+    store.import_legacy()
+
+    if args.compact:
+        print(f"🧹 Compacted gallery: {store.compact()} deleted shards removed")
+
+    if args.verify:
+        damaged = store.verify()
+        if damaged:
+            print(f"❌ Damaged shards: {', '.join(damaged)}")
+            sys.exit(1)
+        print("✅ All shards match their checksums")
+
+    if args.export_legacy:
+        store.export_legacy()
+        print(f"📤 Exported the gallery to {', '.join(LEGACY_FILES)}")
+
+    people = store.people()
+    print(f"📊 People: {len(people)}, samples: {sum(people.values())}")
+    print(f"🗑️  Deleted samples awaiting compaction: {store.dead_ratio() * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
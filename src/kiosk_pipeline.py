@@ -0,0 +1,158 @@
+"""
+Pipeline stages for the kiosk
+Worker threads connected by small drop-oldest queues, so capture,
+detection, recognition and rendering overlap on separate cores (OpenCV and
+NumPy release the GIL) and a slow stage never blocks the ones before it.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class DropOldestQueue:
+    """Bounded FIFO whose put() never blocks: when full, the oldest item is
+    discarded (and counted) to make room for the new one"""
+
+    def __init__(self, maxsize=2):
+        self._items = deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+        self.peak_depth = 0
+
+    def put(self, item):
+        with self._condition:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self.peak_depth = max(self.peak_depth, len(self._items))
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Oldest item, or None on timeout or once closed and drained"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self.closed, timeout)
+            return self._items.popleft() if self._items else None
+
+    def close(self):
+        """No more items will be put; wakes up waiting consumers"""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    @property
+    def depth(self):
+        return len(self._items)
+
+
+class CaptureSource:
+    """get() / closed adapter over anything with VideoCapture's read()
+
+    Items are (frame, capture_time); the capture time comes from the
+    reader's frame_time (FrameGrabber) when it has one. Closes after the
+    first failed read.
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.closed = False
+
+    def get(self, timeout=None):
+        if self.closed:
+            return None
+        ret, frame = self.reader.read()
+        if not ret:
+            self.closed = True
+            return None
+        return frame, getattr(self.reader, "frame_time", None) or time.time()
+
+
+class PipelineStage:
+    """Worker thread: take an item from source, process it, put the result
+
+    A stage without start() is driven by calling step() directly.
+    process() returning None drops the item. Exceptions are reported and
+    counted without stopping the stage. When the source is closed and
+    drained, the output queue is closed too, so the end of the camera
+    stream propagates down the pipeline.
+
+    Per-stage counters: items processed, average and worst processing
+    latency, errors, and the depth / drop count of the input queue.
+    """
+
+    def __init__(self, name, process, source, output=None):
+        self.name = name
+        self.process = process
+        self.source = source
+        self.output = output
+
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Statistics
+        self.processed = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"pipeline-{self.name}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                item = self.source.get(timeout=0.1)
+                if item is None:
+                    if self.source.closed:
+                        break
+                    continue
+
+                try:
+                    result = self.step(item)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"⚠️  {self.name} stage error: {e}")
+                    continue
+                if result is not None and self.output is not None:
+                    self.output.put(result)
+        finally:
+            if self.output is not None:
+                self.output.close()
+
+    def step(self, item):
+        """Process one item and record its latency; also how a stage that
+        must stay on the calling thread (rendering) is driven"""
+        start = time.perf_counter()
+        result = self.process(item)
+        self.record(time.perf_counter() - start)
+        return result
+
+    def record(self, elapsed):
+        """Count one processed item that took elapsed seconds"""
+        self.processed += 1
+        self.latency_total += elapsed
+        self.latency_max = max(self.latency_max, elapsed)
+
+    def stats(self):
+        """Counters of this stage as a dict"""
+        return {
+            "processed": self.processed,
+            "latency_avg_ms": self.latency_total / max(self.processed, 1) * 1000,
+            "latency_max_ms": self.latency_max * 1000,
+            "errors": self.errors,
+            "queue_depth": getattr(self.source, "depth", 0),
+            "queue_peak": getattr(self.source, "peak_depth", 0),
+            "queue_dropped": getattr(self.source, "dropped", 0),
+        }
@@ -0,0 +1,323 @@
+"""
+Worker processes for the kiosk
+In process mode, detection and recognition each run in their own process
+so the Python glue between OpenCV calls is spread over several cores.
+Frames live in a multiprocessing.shared_memory ring buffer; only slot
+numbers, face boxes and identities cross process boundaries.
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+import types
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from kiosk_pipeline import PipelineStage
+
+
+class FrameRing:
+    """n_slots frames of one shape in a single shared memory block
+
+    The creating process owns (and finally unlinks) the block; workers
+    attach to it by name. slot(i) is a zero-copy numpy view.
+    """
+
+    def __init__(self, n_slots, shape, dtype=np.uint8, name=None):
+        self.n_slots = n_slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        if self.owner:
+            size = n_slots * int(np.prod(self.shape)) * self.dtype.itemsize
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            try:
+                # Python 3.13+: the owner alone tracks (and unlinks) the block
+                self.shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                self.shm = shared_memory.SharedMemory(name=name)
+        self.frames = np.ndarray(
+            (n_slots, *self.shape), dtype=self.dtype, buffer=self.shm.buf
+        )
+
+    def attach_args(self):
+        """Arguments for FrameRing(*args) in another process"""
+        return (self.n_slots, self.shape, self.dtype.str, self.shm.name)
+
+    def slot(self, index):
+        return self.frames[index]
+
+    def close(self):
+        self.frames = None  # views must be gone before the buffer is closed
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def track_snapshot(track):
+    """Picklable copy of what the kiosk reads from a track"""
+    return types.SimpleNamespace(
+        identity=track.identity,
+        hits=track.hits,
+        first_seen=track.first_seen,
+        center_var=np.array(track.center_var),
+        confidence_var=track.confidence_var,
+    )
+
+
+def detection_worker(
+    ring_args, data_dir, min_area_ratio, jobs, detected, faces_in_view, idle
+):
+    """Process: motion gate and face detection on ring slots; publishes
+    the gate's idle state so the kiosk can slow down capture"""
+    from face_detector import DetectionScheduler, FaceDetector
+    from motion_gate import MotionGate
+    from system_config import load_system_config
+
+    config = load_system_config()
+    ring = FrameRing(*ring_args)
+    scheduler = DetectionScheduler(
+        FaceDetector.from_config(data_dir, config),
+        full_scan_every=config.getint(
+            "PERFORMANCE", "PROCESS_EVERY_N_FRAMES", fallback=5
+        ),
+    )
+    motion_gate = (
+        MotionGate.from_config(config)
+        if config.getboolean("PERFORMANCE", "MOTION_GATE", fallback=True)
+        else None
+    )
+
+    try:
+        finished = False
+        while not finished:
+            job = jobs.get()
+            if job is None:
+                break
+            # Skip to the newest frame; older ones go back as dropped
+            while True:
+                try:
+                    newer = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if newer is None:
+                    finished = True
+                    break
+                detected.put((*job, None, 0.0))
+                job = newer
+
+            slot, frame_time = job
+            start = time.perf_counter()
+            frame = ring.slot(slot)
+
+            faces = []
+            if motion_gate and not motion_gate.update(
+                frame, faces_in_view=bool(faces_in_view.value)
+            ):
+                idle.value = 1
+            else:
+                idle.value = 0
+                area = frame.shape[0] * frame.shape[1]
+                faces = [
+                    box
+                    for box in scheduler.detect(frame)
+                    if box[2] * box[3] / area >= min_area_ratio
+                ]
+            del frame
+            detected.put((slot, frame_time, faces, time.perf_counter() - start))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detected.put(None)
+        ring.close()
+
+
+def recognition_worker(
+    ring_args, data_dir, confidence_threshold, detected, results, faces_in_view
+):
+    """Process: tracking and recognition; loads the gallery once"""
+    from face_recognizer import FaceRecognizer
+    from system_config import load_system_config
+
+    ring = FrameRing(*ring_args)
+    recognizer = None
+    try:
+        recognizer = FaceRecognizer.from_config(
+            data_dir, load_system_config(), confidence_threshold=confidence_threshold
+        )
+        recognizer.load()
+
+        while True:
+            item = detected.get()
+            if item is None:
+                break
+            slot, frame_time, faces, detect_time = item
+            if faces is None:
+                results.put((slot, frame_time, None, None, 0.0, 0.0))
+                continue
+            start = time.perf_counter()
+
+            manifest = recognizer.apply_model_update()
+            if manifest is not None:
+                print(
+                    f"🔄 Face gallery reloaded in worker: "
+                    f"{manifest.get('n_people')} people"
+                )
+            tracks = recognizer.process(ring.slot(slot), faces)
+            faces_in_view.value = bool(recognizer.face_tracker.tracks)
+
+            results.put(
+                (
+                    slot,
+                    frame_time,
+                    faces,
+                    [track_snapshot(track) for track in tracks],
+                    detect_time,
+                    time.perf_counter() - start,
+                )
+            )
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"❌ Recognition worker failed: {e}")
+    finally:
+        results.put(None)
+        if recognizer is not None:
+            recognizer.stop()
+        ring.close()
+
+
+class ProcessPipeline:
+    """Detection and recognition worker processes fed from a frame ring
+
+    Used like a queue by the kiosk: put((frame, capture_time)) copies the
+    frame (resized to frame_shape) into a free ring slot and hands the slot
+    to the detection worker; get() returns (frame, capture_time, boxes,
+    tracks) once the recognition worker is done with it. The detection
+    worker skips to the newest waiting frame and new frames are dropped
+    while every slot is in flight, which bounds latency the way the
+    threaded pipeline's drop-oldest queues do. close() ends the workers'
+    input; closed is set once their output has ended. idle reports the
+    detection worker's motion gate, for throttling capture.
+    """
+
+    def __init__(
+        self,
+        data_dir,
+        frame_shape=(480, 800, 3),
+        n_slots=4,
+        confidence_threshold=0.6,
+        min_area_ratio=0.0,
+    ):
+        context = mp.get_context("spawn")  # no fork of the kiosk's threads
+        self.ring = FrameRing(n_slots, frame_shape)
+        self._free = list(range(n_slots))
+        self._lock = threading.Lock()
+        self._jobs = context.Queue()
+        self._detected = context.Queue()
+        self._results = context.Queue()
+        self._faces_in_view = context.Value("b", 0)
+        self._idle = context.Value("b", 0)
+        ring_args = self.ring.attach_args()
+        self.workers = [
+            context.Process(
+                target=detection_worker,
+                args=(
+                    ring_args,
+                    str(data_dir),
+                    min_area_ratio,
+                    self._jobs,
+                    self._detected,
+                    self._faces_in_view,
+                    self._idle,
+                ),
+                name="kiosk-detect",
+                daemon=True,
+            ),
+            context.Process(
+                target=recognition_worker,
+                args=(
+                    ring_args,
+                    str(data_dir),
+                    confidence_threshold,
+                    self._detected,
+                    self._results,
+                    self._faces_in_view,
+                ),
+                name="kiosk-recognize",
+                daemon=True,
+            ),
+        ]
+        self.closed = False
+
+        # Statistics: worker latencies, frames in flight, ring-full drops
+        self.detect_stage = PipelineStage("detect", None, None)
+        self.recognize_stage = PipelineStage("recognize", None, None)
+        self.peak_depth = 0
+        self.dropped = 0
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+        return self
+
+    @property
+    def idle(self):
+        """True while the detection worker's motion gate is idle"""
+        return bool(self._idle.value)
+
+    @property
+    def depth(self):
+        """Frames currently in the workers"""
+        return self.ring.n_slots - len(self._free)
+
+    def put(self, captured):
+        frame, frame_time = captured
+        with self._lock:
+            if not self._free:
+                self.dropped += 1
+                return
+            slot = self._free.pop()
+            self.peak_depth = max(self.peak_depth, self.depth)
+        height, width = self.ring.shape[:2]
+        cv2.resize(frame, (width, height), dst=self.ring.slot(slot))
+        self._jobs.put((slot, frame_time))
+
+    def close(self):
+        self._jobs.put(None)
+
+    def get(self, timeout=None):
+        """(frame, capture_time, boxes, tracks), or None on timeout / end"""
+        if self.closed:
+            return None
+        try:
+            result = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if result is None:
+            self.closed = True
+            return None
+
+        slot, frame_time, faces, tracks, detect_time, recognize_time = result
+        frame = None if faces is None else self.ring.slot(slot).copy()
+        with self._lock:
+            self._free.append(slot)
+        if frame is None:
+            self.dropped += 1  # skipped by the detection worker
+            return None
+        self.detect_stage.record(detect_time)
+        self.recognize_stage.record(recognize_time)
+        return frame, frame_time, faces, tracks
+
+    def stop(self, timeout=2.0):
+        self.close()
+        self._jobs.cancel_join_thread()  # workers may already be gone
+        for worker in self.workers:
+            worker.join(timeout=timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self.ring.close()
@@ -0,0 +1,113 @@
+"""
+Background hot-reload of the face model for the running kiosk
+Polls the gallery manifest and the model manifest, rebuilds or reloads
+the matcher on a worker thread, and hands the result to the capture loop,
+which swaps it in between frames.
+"""
+
+import threading
+
+
+class ModelReloader:
+    """Watches a FaceModelArtifact and prepares fresh matchers off-thread
+
+    Polling is a couple of stat() calls every poll_interval seconds. A change
+    to the gallery manifest is only acted on once its (size, mtime) has been
+    stable for one full poll. While another process (registration) holds
+    the model lock the reload is skipped and retried on the next poll, and
+    the current gallery keeps being served. The capture loop calls
+    take_update() once per frame; it never blocks.
+    """
+
+    def __init__(self, face_model, n_neighbors=5, poll_interval=2.0):
+        self.face_model = face_model
+        self.n_neighbors = n_neighbors
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._pending = None  # (matcher, feature_extractor, manifest)
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.loaded_hash = None
+        self.reloads = 0
+
+    def _snapshot(self):
+        """Cheap change marker: source fingerprint plus manifest mtime"""
+        try:
+            fingerprint = self.face_model.source_fingerprint()
+        except OSError:
+            fingerprint = None
+        try:
+            manifest_mtime = self.face_model.manifest_file.stat().st_mtime_ns
+        except OSError:
+            manifest_mtime = None
+        return fingerprint, manifest_mtime
+
+    def start(self, loaded_manifest=None):
+        """Begin watching; loaded_manifest is the one the kiosk started with"""
+        if self.poll_interval <= 0 or self._thread is not None:
+            return
+        if loaded_manifest:
+            self.loaded_hash = loaded_manifest.get("content_hash")
+        self._thread = threading.Thread(
+            target=self._watch, name="model-reloader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _watch(self):
+        last_seen = self._snapshot()
+        settled = True
+        while not self._stop.wait(self.poll_interval):
+            snapshot = self._snapshot()
+            if snapshot != last_seen:
+                # Still changing: wait for one quiet interval before acting
+                last_seen = snapshot
+                settled = False
+                continue
+            if settled:
+                continue
+
+            try:
+                settled = self._reload()
+            except Exception as e:
+                # Keep serving the current gallery, retry on the next poll
+                print(f"⚠️  Model reload failed, keeping current gallery: {e}")
+            last_seen = self._snapshot()
+
+    def _reload(self):
+        """Rebuild if needed and load a new matcher, unless nothing changed;
+        False if another process is building and this should be retried"""
+        face_model = self.face_model
+        if not face_model.sources_exist():
+            return True
+
+        if not face_model.ensure(blocking=False):
+            return False
+        manifest = face_model.read_manifest() or {}
+        content_hash = manifest.get("content_hash")
+        if content_hash is not None and content_hash == self.loaded_hash:
+            return True  # only the fingerprint changed, the gallery is the same
+
+        matcher = face_model.load_matcher(n_neighbors=self.n_neighbors)
+        feature_extractor = face_model.load_feature_extractor()
+        with self._lock:
+            self._pending = (matcher, feature_extractor, manifest)
+        self.loaded_hash = content_hash
+        return True
+
+    def take_update(self):
+        """(matcher, feature_extractor, manifest) if a new model is ready"""
+        if self._pending is None:
+            return None
+        with self._lock:
+            update, self._pending = self._pending, None
+        if update is not None:
+            self.reloads += 1
+        return update
@@ -0,0 +1,89 @@
+"""
+Motion gate for the kiosk
+Compares a tiny blurred grayscale copy of each frame against a slowly
+adapting background, so face detection can be skipped while the camera
+looks at an empty hallway.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Frame differencing on a downscaled image with an idle timer
+
+    A pixel counts as changed when it differs from the background by more
+    than pixel_threshold gray levels; motion is min_changed_fraction of the
+    pixels changing. The background follows the scene with a running
+    average (learning_rate per frame) so lighting drift is absorbed.
+
+    The gate goes idle once idle_after seconds pass without motion and
+    without faces in view, and becomes active again on the first frame
+    with motion, so that frame is processed in full.
+    """
+
+    def __init__(
+        self,
+        width=80,
+        pixel_threshold=15,
+        min_changed_fraction=0.01,
+        idle_after=3.0,
+        learning_rate=0.05,
+    ):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.idle_after = idle_after
+        self.learning_rate = learning_rate
+
+        self.background = None
+        self.last_activity = time.time()
+        self.idle = False
+
+        # Statistics
+        self.idle_frames = 0
+        self.active_frames = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            min_changed_fraction=config.getfloat(
+                "PERFORMANCE", "MOTION_THRESHOLD", fallback=0.01
+            ),
+            idle_after=config.getfloat("PERFORMANCE", "IDLE_AFTER_SECONDS", fallback=3.0),
+        )
+
+    def _small_gray(self, frame):
+        height = max(1, round(frame.shape[0] * self.width / frame.shape[1]))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0).astype(np.float32)
+
+    def motion(self, frame):
+        """Fraction of (downscaled) pixels that changed against the background"""
+        small = self._small_gray(frame)
+        if self.background is None or self.background.shape != small.shape:
+            self.background = small
+            return 1.0
+        changed = np.abs(small - self.background) > self.pixel_threshold
+        cv2.accumulateWeighted(small, self.background, self.learning_rate)
+        return float(np.count_nonzero(changed)) / changed.size
+
+    def update(self, frame, faces_in_view=False):
+        """True if the frame should be processed, False while idle"""
+        now = time.time()
+        moving = self.motion(frame) >= self.min_changed_fraction
+        if moving or faces_in_view:
+            self.last_activity = now
+            self.idle = False
+        elif now - self.last_activity >= self.idle_after:
+            self.idle = True
+
+        if self.idle:
+            self.idle_frames += 1
+        else:
+            self.active_frames += 1
+        return not self.idle
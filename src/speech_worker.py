@@ -0,0 +1,130 @@
+"""
+Background text-to-speech for the kiosk
+Announcements are queued to a speech thread so a sentence being spoken
+never holds up the frame loop.
+"""
+
+import threading
+from collections import deque
+
+
+class SpeechWorker:
+    """Speaks queued announcements on its own thread
+
+    The speech engine is created on the worker thread (pyttsx3 engines
+    must be driven from the thread that created them) by engine_factory.
+    say() returns immediately. At most max_pending announcements wait:
+    when people arrive faster than they can be announced the oldest
+    waiting one is dropped (latest wins), and an announcement identical to
+    one already waiting or being spoken is coalesced into it.
+
+    With a clip_cache (VoiceClipCache), an announcement about a person is
+    played from its pre-rendered clip; a missing clip is rendered on first
+    use and played from the cache afterwards.
+    """
+
+    def __init__(
+        self, engine_factory, rate=150, volume=0.8, max_pending=2, clip_cache=None
+    ):
+        self.engine_factory = engine_factory
+        self.rate = rate
+        self.volume = volume
+        self.clip_cache = clip_cache
+
+        self._pending = deque(maxlen=max_pending)
+        self._speaking = None
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self.engine = None
+
+        # Statistics
+        self.spoken = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.clip_plays = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="speech", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        with self._condition:
+            self._stopped = True
+            self._pending.clear()
+            self._condition.notify_all()
+        if self.engine is not None:
+            try:
+                self.engine.stop()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def say(self, text, person=None):
+        """Queue text to be spoken; never blocks. person names whose
+        announcement this is, making it eligible for the clip cache"""
+        with self._condition:
+            if self._stopped:
+                return
+            if text == self._speaking or any(
+                text == waiting for waiting, _ in self._pending
+            ):
+                self.coalesced += 1
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append((text, person))
+            self._condition.notify()
+
+    def _play_clip(self, text, person):
+        """Play the cached clip of an announcement, rendering it if needed;
+        False if it has to be spoken directly instead"""
+        if self.clip_cache is None or person is None:
+            return False
+        path = self.clip_cache.lookup(text, person)
+        if path is None:
+            try:
+                path = self.clip_cache.render(self.engine, text, person)
+            except Exception as e:
+                print(f"⚠️  Could not render announcement clip: {e}")
+                return False
+        if path is None or not self.clip_cache.play(path):
+            return False
+        self.clip_plays += 1
+        return True
+
+    def _run(self):
+        try:
+            self.engine = self.engine_factory()
+            self.engine.setProperty("rate", self.rate)  # Speed
+            self.engine.setProperty("volume", self.volume)  # Volume
+        except Exception as e:
+            print(f"⚠️  Could not initialize text-to-speech: {e}")
+            with self._condition:
+                self._stopped = True
+            return
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopped)
+                if self._stopped:
+                    return
+                text, person = self._pending.popleft()
+                self._speaking = text
+
+            try:
+                if not self._play_clip(text, person):
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+                self.spoken += 1
+            except Exception as e:
+                print(f"⚠️  Speech synthesis failed: {e}")  # Log speech errors
+
+            with self._condition:
+                self._speaking = None
@@ -0,0 +1,20 @@
+"""
+System configuration loader
+Reads config/config.ini, falling back to built-in defaults when the file
+or a key is missing
+"""
+
+import configparser
+from pathlib import Path
+
+CONFIG_FILE = Path(__file__).parent.parent / "config" / "config.ini"
+
+
+def load_system_config(config_file=CONFIG_FILE):
+    """Parse config.ini; returns an empty parser if it cannot be read"""
+    config = configparser.ConfigParser(inline_comment_prefixes=("#",))
+    try:
+        config.read(config_file)
+    except configparser.Error as e:
+        print(f"⚠️  Could not parse {config_file}: {e}")
+    return config
@@ -1,10 +1,7 @@
 import cv2
-import pickle
-import os
 import csv
 import time
 import sys
-import json  # Added for logging suspicious activities
 from datetime import datetime
 from pathlib import Path
 
@@ -33,14 +30,6 @@ except ImportError as e:
     print("💡 Or manually: pip uninstall numpy -y && pip install numpy==1.24.3")
     sys.exit(1)
 
-# Handle scikit-learn import
-try:
-    from sklearn.neighbors import KNeighborsClassifier
-except ImportError as e:
-    print("❌ Scikit-learn import error:", str(e))
-    print("💡 Try running: scripts/troubleshooting/fix_rpi_installation.sh")
-    sys.exit(1)
-
 # Try to import speech synthesis (optional)
 try:
     import pyttsx3
@@ -51,6 +40,18 @@ except ImportError:
     SPEECH_AVAILABLE = False
     print("🔇 Text-to-speech not available (install pyttsx3 for speech feedback)")
 
+from attendance_index import DailyAttendanceIndex
+from face_detector import DetectionScheduler, FaceDetector
+from face_recognizer import FaceRecognizer
+from frame_grabber import FrameGrabber
+from gallery_store import GalleryStore
+from kiosk_pipeline import CaptureSource, DropOldestQueue, PipelineStage
+from kiosk_workers import ProcessPipeline
+from motion_gate import MotionGate
+from speech_worker import SpeechWorker
+from system_config import load_system_config
+from voice_cache import VoiceClipCache, auto_phrase, recorded_phrase
+
 
 class TouchscreenAttendanceSystem:
     def __init__(self):
@@ -59,33 +60,51 @@ class TouchscreenAttendanceSystem:
         self.data_dir = self.base_dir / "data"
         self.attendance_dir = self.base_dir / "Attendance"
         self.log_dir = self.base_dir / "logs"  # Added for consistency
+        self.config = load_system_config()
 
         # Create directories
         self.attendance_dir.mkdir(exist_ok=True)
         self.log_dir.mkdir(exist_ok=True)  # Ensure log directory exists
 
-        # File paths
-        self.names_file = self.data_dir / "names.pkl"
-        self.faces_file = self.data_dir / "faces_data.pkl"
+        # In-memory index of today's records (avoids re-reading CSV every frame)
+        self.attendance_index = DailyAttendanceIndex(self.attendance_dir)
 
         # Initialize components
         self.video = None
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        self.frame_source = None  # self.video, or a FrameGrabber around it
+        self.pipeline = []  # detect / recognize / render stages
+        self.worker_processes = None  # ProcessPipeline in process mode
+        self.use_processes = self.config.getboolean(
+            "PERFORMANCE", "USE_PROCESSES", fallback=False
+        )
+        self.faces_in_view = False  # set by the recognize stage
+        self.decision_count = 0
+        self.decision_latency_total = 0.0
+        self.decision_latency_max = 0.0
+        # Backend chosen by [FACE_DETECTION] DETECTOR; it runs on a downscaled
+        # copy of the frame when DETECT_WIDTH is set, boxes come back in
+        # frame coordinates
+        self.face_detector = FaceDetector.from_config(self.data_dir, self.config)
+        # Between full scans only the windows around known faces are searched
+        self.detection_scheduler = DetectionScheduler(
+            self.face_detector,
+            full_scan_every=self.config.getint(
+                "PERFORMANCE", "PROCESS_EVERY_N_FRAMES", fallback=5
+            ),
         )
-        self.knn = None
-        self.labels = None
 
-        # Speech synthesis
-        self.tts_engine = None
-        if SPEECH_AVAILABLE:
-            try:
-                self.tts_engine = pyttsx3.init()
-                self.tts_engine.setProperty("rate", 150)  # Speed
-                self.tts_engine.setProperty("volume", 0.8)  # Volume
-            except:
-                self.tts_engine = None
-                print("⚠️  Could not initialize text-to-speech")
+        # Speech synthesis on its own thread, so announcements never pause
+        # the frame loop
+        self.speech = None
+        if SPEECH_AVAILABLE and self.config.getboolean(
+            "AUDIO", "TTS_ENABLED", fallback=True
+        ):
+            self.speech = SpeechWorker(
+                pyttsx3.init,
+                rate=self.config.getint("AUDIO", "TTS_RATE", fallback=150),
+                volume=self.config.getfloat("AUDIO", "TTS_VOLUME", fallback=0.8),
+                clip_cache=self.load_voice_cache(),
+            ).start()
         self.csv_columns = [
             "NAME",
             "TIME",
@@ -156,41 +175,80 @@ class TouchscreenAttendanceSystem:
         self.min_face_distance = 100  # Minimum pixels between face center and previous (not directly used but good to keep)
         self.face_tracking = {}  # Track face positions for stability
 
-    def speak(self, text):
-        """Text-to-speech feedback"""
+        # Face model (compiled from the gallery store in data/, hot-reloaded
+        # on new registrations), matcher and the face tracker
+        self.recognizer = FaceRecognizer.from_config(
+            self.data_dir, self.config, confidence_threshold=self.confidence_threshold
+        )
+        self.face_model = self.recognizer.face_model
+        self.model_reloader = self.recognizer.reloader
+        self.face_tracker = self.recognizer.face_tracker
+
+        # Skip detection while nothing moves in front of the camera
+        self.motion_gate = (
+            MotionGate.from_config(self.config)
+            if self.config.getboolean("PERFORMANCE", "MOTION_GATE", fallback=True)
+            else None
+        )
+        self.idle_frame_delay = int(
+            1000 / max(self.config.getfloat("PERFORMANCE", "IDLE_FPS", fallback=3), 0.1)
+        )
+
+    @property
+    def matcher(self):
+        return self.recognizer.matcher
+
+    @property
+    def feature_extractor(self):
+        return self.recognizer.feature_extractor
+
+    @property
+    def labels(self):
+        return self.matcher.names if self.matcher else None
+
+    def load_voice_cache(self):
+        """Cache of pre-rendered announcement clips, or None if disabled or
+        no audio player is installed"""
+        if not self.config.getboolean("AUDIO", "VOICE_CACHE", fallback=True):
+            return None
+        cache = VoiceClipCache.from_config(self.data_dir, self.config)
+        if not cache.available:
+            print(f"🔇 Voice clip cache disabled: '{cache.player[0]}' not found")
+            return None
+        # Drop clips of people deleted or renamed since they were rendered
+        removed = cache.retain(GalleryStore(self.data_dir).people())
+        if removed:
+            print(f"🧹 Removed {removed} stale announcement clips")
+        return cache
+
+    def speak(self, text, person=None):
+        """Text-to-speech feedback; queued, returns immediately. Announcements
+        about a person are played from the voice clip cache"""
         print(f"🔊 {text}")
-        if self.tts_engine:
-            try:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
-            except Exception as e:
-                print(f"⚠️  Speech synthesis failed: {e}")  # Log speech errors
-                pass  # Fail silently if speech doesn't work
+        if self.speech:
+            self.speech.say(text, person=person)
 
     def load_training_data(self):
         """Load trained face data"""
-        if not self.names_file.exists() or not self.faces_file.exists():
+        if not self.face_model.sources_exist():
             print("❌ Training data not found!")
             print("💡 Please run 'python add_faces_rpi.py' first to register faces")
             return False
 
         try:
-            with open(self.names_file, "rb") as f:
-                self.labels = pickle.load(f)
-
-            with open(self.faces_file, "rb") as f:
-                faces_data = pickle.load(f)
-
-            # Train KNN classifier
-            self.knn = KNeighborsClassifier(n_neighbors=5)
-            self.knn.fit(faces_data, self.labels)
+            # Memory-mapped model artifact and KNN matcher, reloaded in the
+            # background when someone registers
+            self.recognizer.load()
 
             print(f"✅ Training data loaded successfully")
-            unique_faces = len(set(self.labels))
-            total_samples = len(self.labels)
-            print(f"📊 Registered faces: {unique_faces}")
-            print(f"📊 Total training samples: {total_samples}")
-            print(f"📋 Registered names: {', '.join(sorted(set(self.labels)))}")
+            print(f"📊 Registered faces: {len(self.labels)}")
+            print(f"📊 Total training samples: {self.matcher.n_samples}")
+            print(f"📋 Registered names: {', '.join(self.labels)}")
+            print(f"🧬 Feature extractor: {self.feature_extractor.name}")
+            if self.matcher.projection is not None:
+                print(
+                    f"📉 PCA projection: {self.matcher.projection.n_components} dims"
+                )
             return True
 
         except Exception as e:
@@ -198,6 +256,16 @@ class TouchscreenAttendanceSystem:
             print(f"💡 Try running: python tools/analyze_training_data.py")
             return False
 
+    def apply_model_update(self):
+        """Swap in a gallery reloaded in the background, between frames"""
+        manifest = self.recognizer.apply_model_update()
+        if manifest is None:
+            return
+        print(
+            f"🔄 Face gallery reloaded: {manifest.get('n_people', len(self.labels))} "
+            f"people, {self.matcher.n_samples} samples"
+        )
+
     def initialize_camera(self):
         """Initialize camera for Raspberry Pi"""
         try:
@@ -214,48 +282,43 @@ class TouchscreenAttendanceSystem:
             self.video.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             self.video.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
             self.video.set(cv2.CAP_PROP_FPS, 15)
-            self.video.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Warm up camera
+            self.video.set(
+                cv2.CAP_PROP_BUFFERSIZE,
+                self.config.getint("CAMERA", "BUFFER_SIZE", fallback=1),
+            )
+            # Warm up camera
             for _ in range(10):
                 ret, frame = self.video.read()
                 if not ret:
                     raise Exception("Camera not responding")
 
+            # A capture thread keeps only the newest frame, so slow loop
+            # iterations never leave the kiosk working on stale frames
+            self.frame_source = self.video
+            if self.config.getboolean("PERFORMANCE", "USE_THREADING", fallback=True):
+                self.frame_source = FrameGrabber(self.video).start()
+                print("📹 Threaded capture enabled")
+
             return True
 
         except Exception as e:
             print(f"❌ Camera initialization failed: {e}")
             return False
 
+    def load_attendance_index(self):
+        """Load today's attendance records into the in-memory index"""
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        total_records = self.attendance_index.load(current_date)
+        print(f"📋 Attendance records loaded for {current_date}: {total_records}")
+
     def get_current_status(self, name, date):
         """Check current attendance status"""
-        attendance_file = self.attendance_dir / f"Attendance_{date}.csv"
-
-        if not attendance_file.exists():
-            return None
-
-        try:
-            with open(attendance_file, "r") as f:
-                reader = csv.DictReader(f)
-                records = [row for row in reader if row["NAME"] == name]
-                return records[-1]["STATUS"] if records else None
-        except Exception as e:
-            print(f"⚠️ Error reading current status: {e}")
-            return None
+        last_record = self.attendance_index.last_record(name, date)
+        return last_record["STATUS"] if last_record else None
 
     def get_all_records_today(self, name, date):
         """Get all attendance records for a person today"""
-        attendance_file = self.attendance_dir / f"Attendance_{date}.csv"
-
-        if not attendance_file.exists():
-            return []
-
-        try:
-            with open(attendance_file, "r") as f:
-                reader = csv.DictReader(f)
-                return [row for row in reader if row["NAME"] == name]
-        except Exception as e:
-            print(f"⚠️ Error reading all records today: {e}")
-            return []
+        return self.attendance_index.records(name, date)
 
     def determine_attendance_status(self, name, current_time, date):
         """Determine if this should be Clock In or Clock Out"""
@@ -278,42 +341,12 @@ class TouchscreenAttendanceSystem:
     # Work hours calculation removed - not needed in simplified format
 
     def recognize_face(self, face_roi):
-        """Recognize face using KNN classifier"""
-        try:
-            resized_face = cv2.resize(face_roi, (50, 50))
-            face_flattened = resized_face.flatten().reshape(1, -1)
-
-            expected_features = 50 * 50 * 3  # 7500 for color images
-            if face_flattened.shape[1] != expected_features:
-                print(
-                    f"⚠️ Warning: Feature size mismatch: {face_flattened.shape[1]} vs expected {expected_features}"
-                )
-                # Attempt to convert to grayscale if feature mismatch
-                if resized_face.ndim == 3 and resized_face.shape[2] == 3:
-                    gray_resized_face = cv2.cvtColor(resized_face, cv2.COLOR_BGR2GRAY)
-                    face_flattened = gray_resized_face.flatten().reshape(1, -1)
-                    expected_features = 50 * 50  # 2500 for grayscale
-                    if face_flattened.shape[1] != expected_features:
-                        print(
-                            f"⚠️ Still mismatch after grayscale conversion: {face_flattened.shape[1]} vs expected {expected_features}"
-                        )
-                        return None, 0.0
-                else:
-                    return None, 0.0
-
-            prediction = self.knn.predict(face_flattened)[0]
-            probabilities = self.knn.predict_proba(face_flattened)[0]
-            confidence = max(probabilities)
-
-            return (
-                prediction,
-                confidence if confidence >= self.confidence_threshold else None,
-                confidence,
-            )
+        """Recognize face using the KNN face matcher"""
+        return self.recognizer.recognize_face(face_roi)
 
-        except Exception as e:
-            print(f"❌ Face recognition error: {e}")
-            return None, 0.0
+    def recognize_faces(self, frame, faces):
+        """Recognize all faces from a detectMultiScale result in one batch"""
+        return self.recognizer.recognize_faces(frame, faces)
 
     def can_process_recognition(self, name):
         """Check if enough time has passed since last recognition for a specific person"""
@@ -514,241 +547,423 @@ class TouchscreenAttendanceSystem:
         )
         cv2.setMouseCallback("Touchscreen Attendance System", self.mouse_callback)
 
+        # Capture, detection and recognition run on worker threads (or
+        # processes); this thread renders and handles touch input. Bounded
+        # queues keep every stage on the newest frame
+        recognized = self.start_pipeline()
+        render_stage = self.pipeline[-1]
+
         while True:
-            ret, frame = self.video.read()
-            if not ret:
+            item = recognized.get(timeout=0.05)
+            if item is None and recognized.closed:
                 print("❌ Error reading from camera")
                 break
+            if item is not None:
+                cv2.imshow("Touchscreen Attendance System", render_stage.step(item))
 
-            frame = cv2.resize(frame, (800, 480))
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.equalizeHist(gray)
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,  # More sensitive detection
-                minNeighbors=3,  # Reduced for more detections
-                minSize=(20, 20),
-                maxSize=(400, 400),
-            )
+            # Handle button clicks with ultra-flexible confidence requirements
+            if self.button_clicked:
+                self.button_clicked = False
+                if self.current_recognition_data:
+                    data = self.current_recognition_data
+                    if self.can_process_recognition(data["name"]):
+                        # Accept manual recording
+                        if self.save_attendance(data["name"], data["time"], data["status"]):
+                            message = f"Attendance recorded: {data['name']} - {data['status']} (Manual)"
+                            self.speak(recorded_phrase(data["name"]), person=data["name"])
+                            print(f"✅ {message}")
+                    else:
+                        print(
+                            f"⏳ Please wait before recording again for {data['name']}"
+                        )
+                else:
+                    print("👤 No face recognized to record attendance")
+
+            if self.exit_clicked:
+                break
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == 27:
+                break
 
-            recognized_name = None
+        self.cleanup()
 
-            for x, y, w, h in faces:
-                face_roi = frame[y : y + h, x : x + w]
-                face_rect = (x, y, w, h)
+    def start_pipeline(self):
+        """Start the capture -> detect -> recognize stages; returns the
+        queue render_frame items come out of"""
+        capture = CaptureSource(self.frame_source)
+        if not self.use_processes:
+            detected = DropOldestQueue(maxsize=2)
+            recognized = DropOldestQueue(maxsize=2)
+            self.pipeline = [
+                PipelineStage("detect", self.detect_frame, capture, detected).start(),
+                PipelineStage(
+                    "recognize", self.recognize_frame, detected, recognized
+                ).start(),
+                PipelineStage("render", self.render_frame, recognized),
+            ]
+            return recognized
+
+        # Process mode: detection and recognition in worker processes that
+        # share frames through a shared memory ring; the workers load the
+        # gallery and watch for registrations themselves
+        self.recognizer.stop()
+        self.worker_processes = ProcessPipeline(
+            self.data_dir,
+            n_slots=self.config.getint("PERFORMANCE", "FRAME_RING_SLOTS", fallback=4),
+            confidence_threshold=self.confidence_threshold,
+            min_area_ratio=self.face_area_threshold,
+        ).start()
+        print("🧵 Detection and recognition running in worker processes")
+        self.pipeline = [
+            PipelineStage(
+                "dispatch", self.dispatch_frame, capture, self.worker_processes
+            ).start(),
+            self.worker_processes.detect_stage,
+            self.worker_processes.recognize_stage,
+            PipelineStage("render", self.render_worker_result, self.worker_processes),
+        ]
+        return self.worker_processes
+
+    def dispatch_frame(self, captured):
+        """Dispatch stage in process mode: pass frames on to the workers,
+        polling the camera slowly while their motion gate is idle"""
+        self.set_capture_idle(self.worker_processes.idle)
+        return captured
+
+    def set_capture_idle(self, idle):
+        """Poll the camera at IDLE_FPS while idle, at full rate otherwise"""
+        if isinstance(self.frame_source, FrameGrabber):
+            # The capture thread itself slows down, not just processing
+            self.frame_source.throttle(self.idle_frame_delay / 1000 if idle else 0)
+        elif idle:
+            time.sleep(self.idle_frame_delay / 1000)
+
+    def render_worker_result(self, result):
+        """Render stage in process mode: finish a worker result and draw it"""
+        frame, frame_time, faces, tracks = result
+        return self.render_frame(
+            {
+                "frame": frame,
+                "frame_time": frame_time,
+                "faces": self.describe_faces(frame, faces, tracks),
+            }
+        )
 
-                # Basic validation (replaces strict quality checking)
-                validation = self.validate_face_basic(face_roi, face_rect, frame.shape)
+    def detect_frame(self, captured):
+        """Detection stage: resize, motion gate and face detection"""
+        frame, frame_time = captured
+        frame = cv2.resize(frame, (800, 480))
+        item = {"frame": frame, "frame_time": frame_time, "faces": []}
+
+        # Idle: nobody in view and nothing moving, so skip detection and
+        # poll the camera at IDLE_FPS; the first frame with motion is
+        # processed in full
+        idle = bool(self.motion_gate) and not self.motion_gate.update(
+            frame, faces_in_view=self.faces_in_view
+        )
+        self.set_capture_idle(idle)
+        if idle:
+            return item
+
+        faces = self.detection_scheduler.detect(frame)
+
+        # REMOVED: Quality threshold blocking
+        # OLD: if quality_score < self.min_face_quality: continue
+
+        # NEW: Only check basic area threshold (very permissive)
+        frame_area = frame.shape[0] * frame.shape[1]
+        item["faces"] = [
+            (x, y, w, h)
+            for x, y, w, h in faces
+            if (w * h) / frame_area >= self.face_area_threshold
+        ]  # Only skip extremely small faces
+        return item
+
+    def recognize_frame(self, item):
+        """Recognition stage: tracking, recognition and per-face checks"""
+        self.apply_model_update()
+        frame, faces = item["frame"], item["faces"]
+
+        # Attempt face recognition regardless of calculated quality
+        tracks = self.recognizer.process(frame, faces)
+        self.faces_in_view = bool(self.face_tracker.tracks)
+        item["faces"] = self.describe_faces(frame, faces, tracks)
+        return item
+
+    def describe_faces(self, frame, faces, tracks):
+        """Per-face results for render_frame: identity, validation, quality
+        and stability of every box"""
+        frame_area = frame.shape[0] * frame.shape[1]
+        described = []
+        for (x, y, w, h), track in zip(faces, tracks):
+            face_roi = frame[y : y + h, x : x + w]
+            described.append(
+                {
+                    "box": (x, y, w, h),
+                    "identity": track.identity,
+                    # Basic validation (replaces strict quality checking)
+                    "validation": self.validate_face_basic(
+                        face_roi, (x, y, w, h), frame.shape
+                    ),
+                    # Quality for display only
+                    "quality": self.calculate_face_quality(
+                        face_roi, (w * h) / frame_area
+                    ),
+                    "stability": self.is_face_stable_enhanced(track),
+                }
+            )
+        return described
 
-                # REMOVED: Quality threshold blocking
-                # OLD: if quality_score < self.min_face_quality: continue
+    def render_frame(self, item):
+        """Render stage (main thread): attendance decisions and drawing"""
+        frame = item["frame"]
+        recognized_name = None
 
-                # NEW: Only check basic area threshold (very permissive)
-                frame_area = frame.shape[0] * frame.shape[1]
-                face_area = w * h
-                face_area_ratio = face_area / frame_area
+        for face in item["faces"]:
+            x, y, w, h = face["box"]
+            recognition_result = face["identity"]
+            validation = face["validation"]
+            quality_score = face["quality"]
 
-                if face_area_ratio < self.face_area_threshold:
-                    continue  # Only skip extremely small faces
+            if len(recognition_result) == 3:
+                name, confidence, raw_confidence = recognition_result
+            else:
+                name, confidence = recognition_result
+                raw_confidence = confidence if confidence else 0.0
 
-                # Attempt face recognition regardless of calculated quality
-                recognition_result = self.recognize_face(face_roi)
+            if name is not None:
+                # Enhanced stability (not required for recording)
+                is_stable, stability_msg = face["stability"]
 
-                if len(recognition_result) == 3:
-                    name, confidence, raw_confidence = recognition_result
-                else:
-                    name, confidence = recognition_result
-                    raw_confidence = confidence if confidence else 0.0
+                # FLEXIBLE MODE: Accept face even if not fully stable
+                recognized_name = name
 
-                # Calculate quality for display only
-                quality_score = self.calculate_face_quality(face_roi, face_area_ratio)
+                current_time_str = datetime.now().strftime("%H:%M:%S")
+                current_date_str = datetime.now().strftime("%Y-%m-%d")
+                attendance_status = self.determine_attendance_status(
+                    name, current_time_str, current_date_str
+                )
 
-                if name is not None:
-                    face_center = (x + w // 2, y + h // 2)
+                # Use different confidence thresholds for auto vs manual
+                min_conf = (
+                    self.min_confidence_for_auto
+                    if self.auto_record_mode
+                    else self.min_confidence_manual
+                )
 
-                    # Use enhanced stability checking (but don't require it for recording)
-                    is_stable, stability_msg = self.is_face_stable_enhanced(
-                        name, face_center, confidence, face_rect
-                    )
+                # confidence is None below confidence_threshold
+                if confidence is not None and confidence >= min_conf:
+                    self.current_recognition_data = {
+                        "name": name,
+                        "time": current_time_str,
+                        "date": current_date_str,
+                        "status": attendance_status,
+                        "confidence": confidence,
+                        "quality_score": quality_score,
+                    }
+
+                    # Draw enhanced rectangle - color based on confidence and warnings
+                    if confidence >= 0.8:
+                        color = (0, 255, 0)  # Green for high confidence
+                    elif confidence >= 0.6:
+                        color = (0, 255, 255)  # Yellow for medium confidence
+                    else:
+                        color = (0, 165, 255)  # Orange for low confidence
 
-                    # FLEXIBLE MODE: Accept face even if not fully stable
-                    recognized_name = name
+                    # Add red tint if there are warnings
+                    if validation["warnings"]:
+                        color = (0, 100, 255)  # Orange-red for warnings
 
-                    current_time_str = datetime.now().strftime("%H:%M:%S")
-                    current_date_str = datetime.now().strftime("%Y-%m-%d")
-                    attendance_status = self.determine_attendance_status(
-                        name, current_time_str, current_date_str
-                    )
+                    cv2.rectangle(frame, (x, y), (x + w, y + h), color, 3)
 
-                    # Use different confidence thresholds for auto vs manual
-                    min_conf = (
-                        self.min_confidence_for_auto
-                        if self.auto_record_mode
-                        else self.min_confidence_manual
+                    # Display information with stability status
+                    stability_indicator = "✓" if is_stable else "~"
+                    cv2.putText(
+                        frame,
+                        f"{stability_indicator} {name}",
+                        (x, y - 50),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.8,
+                        color,
+                        2,
+                    )
+                    cv2.putText(
+                        frame,
+                        f"Conf: {confidence*100:.1f}%",
+                        (x, y - 30),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.6,
+                        color,
+                        2,
+                    )
+                    cv2.putText(
+                        frame,
+                        f"Q: {quality_score:.2f} | {stability_msg}",
+                        (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.4,
+                        color,
+                        1,
+                    )
+                    cv2.putText(
+                        frame,
+                        f"Next: {attendance_status}",
+                        (x, y + h + 20),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.6,
+                        (255, 255, 0),
+                        2,
                     )
 
-                    if confidence >= min_conf:
-                        self.current_recognition_data = {
-                            "name": name,
-                            "time": current_time_str,
-                            "date": current_date_str,
-                            "status": attendance_status,
-                            "confidence": confidence,
-                            "quality_score": quality_score,
-                        }
-
-                        # Draw enhanced rectangle - color based on confidence and warnings
-                        if confidence >= 0.8:
-                            color = (0, 255, 0)  # Green for high confidence
-                        elif confidence >= 0.6:
-                            color = (0, 255, 255)  # Yellow for medium confidence
-                        else:
-                            color = (0, 165, 255)  # Orange for low confidence
-
-                        # Add red tint if there are warnings
-                        if validation["warnings"]:
-                            color = (0, 100, 255)  # Orange-red for warnings
-
-                        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 3)
-
-                        # Display information with stability status
-                        stability_indicator = "✓" if is_stable else "~"
+                    # Show validation info
+                    if validation["warnings"]:
+                        warning_text = validation["warnings"][0][
+                            :20
+                        ]  # Truncate long warnings
                         cv2.putText(
                             frame,
-                            f"{stability_indicator} {name}",
-                            (x, y - 50),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.8,
-                            color,
-                            2,
-                        )
-                        cv2.putText(
-                            frame,
-                            f"Conf: {confidence*100:.1f}%",
-                            (x, y - 30),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.6,
-                            color,
-                            2,
-                        )
-                        cv2.putText(
-                            frame,
-                            f"Q: {quality_score:.2f} | {stability_msg}",
-                            (x, y - 10),
+                            f"⚠️ {warning_text}",
+                            (x, y + h + 40),
                             cv2.FONT_HERSHEY_SIMPLEX,
                             0.4,
-                            color,
+                            (0, 165, 255),
                             1,
                         )
-                        cv2.putText(
-                            frame,
-                            f"Next: {attendance_status}",
-                            (x, y + h + 20),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.6,
-                            (255, 255, 0),
-                            2,
-                        )
 
-                        # Show validation info
-                        if validation["warnings"]:
-                            warning_text = validation["warnings"][0][
-                                :20
-                            ]  # Truncate long warnings
-                            cv2.putText(
-                                frame,
-                                f"⚠️ {warning_text}",
-                                (x, y + h + 40),
-                                cv2.FONT_HERSHEY_SIMPLEX,
-                                0.4,
-                                (0, 165, 255),
-                                1,
-                            )
-
-                        # Auto record logic
-                        if (
-                            self.auto_record_mode
-                            and self.can_auto_record(name)
-                            and confidence >= self.min_confidence_for_auto
-                        ):
-                            if self.save_attendance(name, current_time_str, attendance_status):
-                                message = f"Auto recorded: {name} - {attendance_status}"
-                                self.speak(f"Auto recorded: {name} - {attendance_status}")
-                                print(f"🤖 {message}")
-                    else:
-                        # Confidence too low but still show the face
-                        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
-                        stability_indicator = "✓" if is_stable else "~"
-                        cv2.putText(
-                            frame,
-                            f"{stability_indicator} {name} (Low Conf: {confidence*100:.1f}%)",
-                            (x, y - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.5,
-                            (0, 0, 255),
-                            2,
-                        )
-                        # Still store recognition data for manual recording
-                        self.current_recognition_data = {
-                            "name": name,
-                            "time": current_time_str,
-                            "date": current_date_str,
-                            "status": attendance_status,
-                            "confidence": confidence,
-                            "quality_score": quality_score,
-                        }
+                    # Auto record logic
+                    if (
+                        self.auto_record_mode
+                        and self.can_auto_record(name)
+                        and confidence >= self.min_confidence_for_auto
+                    ):
+                        if self.save_attendance(name, current_time_str, attendance_status):
+                            message = f"Auto recorded: {name} - {attendance_status}"
+                            self.speak(auto_phrase(name, attendance_status), person=name)
+                            print(f"🤖 {message}")
                 else:
-                    # Unknown face
+                    # Confidence too low but still show the face
                     cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
+                    stability_indicator = "✓" if is_stable else "~"
                     cv2.putText(
                         frame,
-                        "Unknown",
+                        f"{stability_indicator} {name} (Low Conf: {raw_confidence*100:.1f}%)",
                         (x, y - 10),
                         cv2.FONT_HERSHEY_SIMPLEX,
-                        0.6,
+                        0.5,
                         (0, 0, 255),
                         2,
                     )
+                    # Still store recognition data for manual recording
+                    self.current_recognition_data = {
+                        "name": name,
+                        "time": current_time_str,
+                        "date": current_date_str,
+                        "status": attendance_status,
+                        "confidence": raw_confidence,
+                        "quality_score": quality_score,
+                    }
+            else:
+                # Unknown face
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
+                cv2.putText(
+                    frame,
+                    "Unknown",
+                    (x, y - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6,
+                    (0, 0, 255),
+                    2,
+                )
 
-            # Clear recognition data if no stable face
-            if not recognized_name:
-                self.current_recognition_data = None
-
-            frame = self.draw_touchscreen_ui(frame, recognized_name)
-            cv2.imshow("Touchscreen Attendance System", frame)
-
-            # Handle button clicks with ultra-flexible confidence requirements
-            if self.button_clicked:
-                self.button_clicked = False
-                if self.current_recognition_data:
-                    data = self.current_recognition_data
-                    if self.can_process_recognition(data["name"]):
-                        # Accept manual recording
-                        if self.save_attendance(data["name"], data["time"], data["status"]):
-                            message = f"Attendance recorded: {data['name']} - {data['status']} (Manual)"
-                            self.speak(f"Attendance recorded for {data['name']}")
-                            print(f"✅ {message}")
-                    else:
-                        print(
-                            f"⏳ Please wait before recording again for {data['name']}"
-                        )
-                else:
-                    print("👤 No face recognized to record attendance")
-
-            if self.exit_clicked:
-                break
+        # Clear recognition data if no stable face
+        if not recognized_name:
+            self.current_recognition_data = None
 
-            key = cv2.waitKey(1) & 0xFF
-            if key == 27:
-                break
+        # Glass-to-decision latency: camera capture to results on screen
+        latency = time.time() - item["frame_time"]
+        self.decision_count += 1
+        self.decision_latency_total += latency
+        self.decision_latency_max = max(self.decision_latency_max, latency)
 
-        self.cleanup()
+        return self.draw_touchscreen_ui(frame, recognized_name)
 
     def cleanup(self):
         """Clean up resources"""
+        self.recognizer.stop()
+        if self.speech:
+            self.speech.stop()
+            if self.speech.coalesced or self.speech.dropped:
+                print(
+                    f"📊 Announcements: {self.speech.spoken} spoken, "
+                    f"{self.speech.coalesced} merged, {self.speech.dropped} skipped"
+                )
+            clip_cache = self.speech.clip_cache
+            if clip_cache is not None and self.speech.clip_plays:
+                print(
+                    f"📊 Announcement clips: {self.speech.clip_plays} played, "
+                    f"{clip_cache.rendered} rendered, {clip_cache.evicted} evicted"
+                )
+        for stage in self.pipeline:
+            stage.stop()
+        if self.worker_processes is not None:
+            self.worker_processes.stop()
+        if isinstance(self.frame_source, FrameGrabber):
+            self.frame_source.stop()
+            grabber = self.frame_source
+            print(
+                f"📊 Frames: {grabber.captured} captured, {grabber.consumed} "
+                f"processed, {grabber.dropped} dropped as stale"
+            )
         if self.video:
             self.video.release()
         cv2.destroyAllWindows()
+
+        if self.decision_count:
+            print(
+                f"📊 Capture-to-decision latency: "
+                f"{self.decision_latency_total / self.decision_count * 1000:.0f} ms average, "
+                f"{self.decision_latency_max * 1000:.0f} ms worst"
+            )
+
+        for stage in self.pipeline:
+            stats = stage.stats()
+            if stats["processed"]:
+                print(
+                    f"📊 {stage.name:>9} stage: {stats['processed']} frames, "
+                    f"{stats['latency_avg_ms']:.1f} ms avg / "
+                    f"{stats['latency_max_ms']:.1f} ms worst, input queue peak "
+                    f"{stats['queue_peak']}, {stats['queue_dropped']} dropped"
+                )
+
+        gate = self.motion_gate
+        if gate and gate.idle_frames:
+            total = gate.idle_frames + gate.active_frames
+            print(
+                f"📊 Idle frames: {gate.idle_frames} of {total} "
+                f"({gate.idle_frames / total * 100:.0f}%)"
+            )
+
+        scheduler = self.detection_scheduler
+        if scheduler.full_scans:
+            print(
+                f"📊 Detection: {scheduler.full_scans} full-frame scans, "
+                f"{scheduler.window_scans} window scans"
+            )
+
+        tracker = self.face_tracker
+        if tracker.recognitions:
+            observations = tracker.recognitions + tracker.reuses
+            print(
+                f"📊 Recognition calls: {tracker.recognitions} for "
+                f"{observations} face observations "
+                f"({observations / tracker.recognitions:.1f}x reuse)"
+            )
+        if tracker.decisions:
+            print(
+                f"📊 Identities decided: {tracker.decisions}, after "
+                f"{tracker.frames_to_decision / tracker.decisions:.1f} frames on average"
+            )
         print("🧹 Resources cleaned up")
 
     def run(self):
@@ -756,6 +971,7 @@ class TouchscreenAttendanceSystem:
         try:
             if not self.load_training_data():
                 return False
+            self.load_attendance_index()
             if not self.initialize_camera():
                 return False
             self.run_attendance()
@@ -923,63 +1139,34 @@ class TouchscreenAttendanceSystem:
 
         return validation_results
 
-    def is_face_stable_enhanced(self, name, face_center, confidence, face_rect):
-        """Enhanced face stability checking - replaces quality gating"""
-        current_time = time.time()
-
-        if name not in self.face_tracking:
-            self.face_tracking[name] = {
-                "positions": [],
-                "confidences": [],
-                "sizes": [],
-                "first_detection": current_time,
-                "stable_count": 0,
-                "last_validation": current_time,
-            }
-
-        tracking = self.face_tracking[name]
-
-        # Add current detection
-        tracking["positions"].append(face_center)
-        tracking["confidences"].append(confidence)
-        tracking["sizes"].append((face_rect[2], face_rect[3]))  # w, h
-
-        # Keep recent history
-        max_history = 10
-        if len(tracking["positions"]) > max_history:
-            tracking["positions"] = tracking["positions"][-max_history:]
-            tracking["confidences"] = tracking["confidences"][-max_history:]
-            tracking["sizes"] = tracking["sizes"][-max_history:]
+    def is_face_stable_enhanced(self, track):
+        """Enhanced face stability checking - replaces quality gating
 
+        Uses the running position and confidence statistics the tracker
+        keeps on each track instead of per-name history lists.
+        """
         # Check if we have enough detections
-        if len(tracking["positions"]) < self.stability_frames_required:
+        if track.hits < self.stability_frames_required:
             return False, "Collecting samples..."
 
-        # Calculate stability metrics
-        positions = np.array(tracking["positions"])
-        confidences = np.array(tracking["confidences"])
-
         # Position stability
-        pos_variance = np.var(positions, axis=0)
-        position_stable = np.all(pos_variance < self.max_position_variance)
+        position_stable = np.all(track.center_var < self.max_position_variance)
 
         # Confidence stability
-        conf_variance = np.var(confidences)
-        confidence_stable = conf_variance < self.confidence_consistency_threshold
+        confidence_stable = (
+            track.confidence_var < self.confidence_consistency_threshold
+        )
 
         # Time requirement - ULTRA FLEXIBLE
-        time_elapsed = current_time - tracking["first_detection"]
+        time_elapsed = time.time() - track.first_seen
         time_sufficient = time_elapsed >= 0.5  # Very short time requirement
 
         # Overall stability assessment - VERY PERMISSIVE
         if position_stable and confidence_stable and time_sufficient:
-            tracking["stable_count"] += 1
             return True, "Stable"  # Immediately stable
         elif time_sufficient:  # If enough time passed, consider it stable enough
-            tracking["stable_count"] += 1
             return True, "Flexible"  # Flexible stability
         else:
-            tracking["stable_count"] = 0
             return False, f"Wait {0.5-time_elapsed:.1f}s"
 
     def save_attendance(self, name, time_str, status):
@@ -1003,6 +1190,8 @@ class TouchscreenAttendanceSystem:
                     writer.writeheader()
                 writer.writerow(row_data)
 
+            self.attendance_index.append(row_data, current_date)
+
             print(f"✅ Attendance saved: {name} - {status} at {time_str}")
             return True
 
@@ -1028,11 +1217,11 @@ def main():
     missing_deps = []
 
     try:
-        import sklearn
+        import numpy
 
-        print("✅ scikit-learn available")
+        print("✅ NumPy available")
     except ImportError:
-        missing_deps.append("scikit-learn")
+        missing_deps.append("numpy")
 
     try:
         import cv2
@@ -0,0 +1,214 @@
+"""
+Pre-rendered announcement clips
+The per-person phrases the kiosk announces are synthesized to WAV files
+once (at registration, or on first use) and played back with a small
+command-line player afterwards, so an announcement no longer costs a
+text-to-speech synthesis on the kiosk.
+"""
+
+import hashlib
+import os
+import re
+import shlex
+import shutil
+import subprocess
+from pathlib import Path
+
+ATTENDANCE_STATUSES = ("Clock In", "Clock Out")
+
+
+def recorded_phrase(name):
+    """Announcement after a manual (touch) recording"""
+    return f"Attendance recorded for {name}"
+
+
+def auto_phrase(name, status):
+    """Announcement after an automatic recording"""
+    return f"Auto recorded: {name} - {status}"
+
+
+def announcement_phrases(name):
+    """Every phrase the kiosk can announce for this person"""
+    return [recorded_phrase(name)] + [
+        auto_phrase(name, status) for status in ATTENDANCE_STATUSES
+    ]
+
+
+def person_slug(name):
+    """File-name-safe, case-insensitive form of a person's name
+
+    The readable part drops non-Latin characters, so a hash of the whole
+    name keeps e.g. two names in another script from sharing a slug.
+    """
+    readable = re.sub(r"[^A-Za-z0-9_-]+", "_", name).strip("_")[:40] or "person"
+    digest = hashlib.sha1(name.lower().encode("utf-8")).hexdigest()[:8]
+    return f"{readable.lower()}_{digest}"
+
+
+class VoiceClipCache:
+    """Announcement clips on disk, one WAV file per (person, phrase)
+
+    Clips are named <person-slug>-<hash>.wav, where the hash covers the
+    phrase and the voice settings, so a changed TTS_RATE / TTS_VOLUME
+    renders new clips. All state is in the file names and modification
+    times: clips can be written by the registration tool while the kiosk
+    plays others, without a shared index. A clip's mtime is refreshed each
+    time it is played and the least recently played clips are evicted
+    once the directory grows past max_bytes.
+
+    Renaming or deleting a person changes or removes their phrases;
+    invalidate(name) removes their clips and retain(names) removes the
+    clips of everyone not in names.
+    """
+
+    CLIP_PATTERN = re.compile(r"(?P<slug>.+)-[0-9a-f]{12}\.wav")
+
+    def __init__(
+        self,
+        cache_dir,
+        player="aplay -q",
+        max_bytes=20 * 1024 * 1024,
+        rate=150,
+        volume=0.8,
+        play_timeout=10.0,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.player = shlex.split(player) if isinstance(player, str) else list(player)
+        self.max_bytes = max_bytes
+        self.rate = rate
+        self.volume = volume
+        self.play_timeout = play_timeout
+
+        # Statistics
+        self.rendered = 0
+        self.played = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_config(cls, data_dir, config):
+        return cls(
+            Path(data_dir) / "voice_cache",
+            player=config.get("AUDIO", "VOICE_PLAYER", fallback="aplay -q"),
+            max_bytes=int(
+                config.getfloat("AUDIO", "VOICE_CACHE_MB", fallback=20) * 1024 * 1024
+            ),
+            rate=config.getint("AUDIO", "TTS_RATE", fallback=150),
+            volume=config.getfloat("AUDIO", "TTS_VOLUME", fallback=0.8),
+        )
+
+    @property
+    def available(self):
+        """True if the player command is installed"""
+        return bool(self.player) and shutil.which(self.player[0]) is not None
+
+    def configure_engine(self, engine):
+        """Apply the cache's voice settings to a pyttsx3 engine"""
+        engine.setProperty("rate", self.rate)  # Speed
+        engine.setProperty("volume", self.volume)  # Volume
+        return engine
+
+    def clip_path(self, text, person):
+        key = f"{text}\0{self.rate}\0{self.volume}".encode("utf-8")
+        digest = hashlib.sha1(key).hexdigest()[:12]
+        return self.cache_dir / f"{person_slug(person)}-{digest}.wav"
+
+    def _clips(self):
+        """(path, stat) of every clip in the cache"""
+        if not self.cache_dir.exists():
+            return []
+        clips = []
+        for path in self.cache_dir.iterdir():
+            if self.CLIP_PATTERN.fullmatch(path.name):
+                try:
+                    clips.append((path, path.stat()))
+                except FileNotFoundError:
+                    pass  # removed by another process meanwhile
+        return clips
+
+    def lookup(self, text, person):
+        """Path of the cached clip, or None"""
+        path = self.clip_path(text, person)
+        return path if path.exists() else None
+
+    def render(self, engine, text, person):
+        """Synthesize text with a configured engine; returns the clip path,
+        or None if the engine produced no audio"""
+        path = self.clip_path(text, person)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.wav")
+        try:
+            engine.save_to_file(text, str(temp_path))
+            engine.runAndWait()
+            if not temp_path.exists() or temp_path.stat().st_size == 0:
+                return None
+            os.replace(temp_path, path)  # never a half-written clip
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        self.rendered += 1
+        self.enforce_budget(keep=path)
+        return path
+
+    def prerender(self, engine, name):
+        """Render every announcement phrase of a person that is not cached
+        yet; returns the number of clips rendered"""
+        rendered = 0
+        for text in announcement_phrases(name):
+            if self.lookup(text, name) is None and self.render(engine, text, name):
+                rendered += 1
+        return rendered
+
+    def play(self, path):
+        """Play a clip, blocking until it ends; False if playback failed"""
+        try:
+            result = subprocess.run(
+                [*self.player, str(path)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=self.play_timeout,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        if result.returncode != 0:
+            return False
+
+        try:
+            os.utime(path)  # most recently used
+        except FileNotFoundError:
+            pass
+        self.played += 1
+        return True
+
+    def enforce_budget(self, keep=None):
+        """Evict least recently played clips until the cache fits max_bytes"""
+        clips = sorted(self._clips(), key=lambda clip: clip[1].st_mtime)
+        total = sum(stat.st_size for _, stat in clips)
+        for path, stat in clips:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            self.evicted += 1
+
+    def invalidate(self, name):
+        """Remove every clip of a person; returns the number removed"""
+        slug = person_slug(name)
+        removed = 0
+        for path, _ in self._clips():
+            if self.CLIP_PATTERN.fullmatch(path.name).group("slug") == slug:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def retain(self, names):
+        """Remove the clips of everyone not in names (deleted or renamed
+        people); returns the number removed"""
+        slugs = {person_slug(name) for name in names}
+        removed = 0
+        for path, _ in self._clips():
+            if self.CLIP_PATTERN.fullmatch(path.name).group("slug") not in slugs:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
@@ -16,8 +16,10 @@ fi
 echo "🐍 Activating virtual environment..."
 source venv/bin/activate
 
-# Check if this is first run (no training data)
-if [ ! -f "data/faces_data.pkl" ] || [ ! -f "data/names.pkl" ]; then
+# Check if this is first run (no training data: neither a gallery store nor
+# the legacy pickles it is imported from)
+if [ ! -f "data/gallery/manifest.json" ] && \
+   { [ ! -f "data/faces_data.pkl" ] || [ ! -f "data/names.pkl" ]; }; then
     echo ""
     echo "👤 No training data found!"
     echo "📝 You need to register faces first."
@@ -1,34 +1,40 @@
 #!/usr/bin/env python3
 """
 Analyze Training Data Script
-Check the contents of face training data files
+Check the contents of the registered face gallery
 """
 
-import pickle
+import sys
 import numpy as np
 from pathlib import Path
 from collections import Counter
 
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from gallery_store import GalleryStore
+
 class TrainingDataAnalyzer:
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent
         self.data_dir = self.base_dir / "data"
-        self.names_file = self.data_dir / "names.pkl"
-        self.faces_file = self.data_dir / "faces_data.pkl"
+        # Reads the gallery store, or the legacy pickles if not imported yet
+        self.gallery = GalleryStore(self.data_dir)
     
     def analyze_names_data(self):
-        """Analyze names.pkl file"""
-        print("[INFO] Analyzing names.pkl...")
+        """Analyze the registered names"""
+        print("[INFO] Analyzing registered names...")
         
-        if not self.names_file.exists():
-            print("❌ names.pkl not found!")
-            return None
+        if not self.gallery.exists():
+            print("❌ No face gallery found!")
+            return None, []
         
         try:
-            with open(self.names_file, 'rb') as f:
-                names_data = pickle.load(f)
+            names_data = [
+                name for name, count in self.gallery.people().items()
+                for _ in range(count)
+            ]
             
-            print(f"[SUCCESS] Successfully loaded names.pkl")
+            print(f"[SUCCESS] Successfully loaded names")
             print(f"[INFO] Data type: {type(names_data)}")
             print(f"[INFO] Total entries: {len(names_data)}")
             
@@ -50,22 +56,21 @@ class TrainingDataAnalyzer:
                 return names_data, []
                 
         except Exception as e:
-            print(f"[ERROR] Error loading names.pkl: {e}")
+            print(f"[ERROR] Error loading names: {e}")
             return None, []
     
     def analyze_faces_data(self):
-        """Analyze faces_data.pkl file"""
-        print("\n[INFO] Analyzing faces_data.pkl...")
+        """Analyze the registered face samples"""
+        print("\n[INFO] Analyzing face samples...")
         
-        if not self.faces_file.exists():
-            print("[ERROR] faces_data.pkl not found!")
+        if not self.gallery.exists():
+            print("[ERROR] No face gallery found!")
             return None
         
         try:
-            with open(self.faces_file, 'rb') as f:
-                faces_data = pickle.load(f)
+            faces_data, _ = self.gallery.load()
             
-            print(f"[SUCCESS] Successfully loaded faces_data.pkl")
+            print(f"[SUCCESS] Successfully loaded face samples")
             print(f"[INFO] Data type: {type(faces_data)}")
             
             if isinstance(faces_data, np.ndarray):
@@ -94,7 +99,7 @@ class TrainingDataAnalyzer:
                 return faces_data
                 
         except Exception as e:
-            print(f"[ERROR] Error loading faces_data.pkl: {e}")
+            print(f"[ERROR] Error loading face samples: {e}")
             return None
     
     def check_data_consistency(self, names_data, faces_data):
@@ -137,16 +142,16 @@ class TrainingDataAnalyzer:
             if duplicates:
                 issues.append(f"Excessive samples for some names: {duplicates}")
         
-        # Check file sizes
-        names_size = self.names_file.stat().st_size if self.names_file.exists() else 0
-        faces_size = self.faces_file.stat().st_size if self.faces_file.exists() else 0
+        # Check gallery size
+        total_samples = len(names_data) if names_data else 0
+        print(f"[INFO] Gallery size: {total_samples} samples")
         
-        print(f"[INFO] File sizes:")
-        print(f"   names.pkl: {names_size:,} bytes")
-        print(f"   faces_data.pkl: {faces_size:,} bytes")
+        if total_samples < 10:  # Very small gallery
+            issues.append("The gallery is very small - may contain insufficient data")
         
-        if faces_size < 1000:  # Very small file
-            issues.append("faces_data.pkl is very small - may contain insufficient data")
+        damaged = self.gallery.verify() if self.gallery.imported() else []
+        if damaged:
+            issues.append(f"Damaged gallery shards: {damaged}")
         
         if issues:
             print("\n[WARNING] Issues found:")
@@ -179,6 +184,9 @@ class TrainingDataAnalyzer:
             
             elif "insufficient data" in issue:
                 print("   6. Re-register faces with more samples per person")
+            
+            elif "Damaged" in issue:
+                print("   7. Re-register the affected users with add_faces_rpi.py")
     
     def run_analysis(self):
         """Run complete analysis"""
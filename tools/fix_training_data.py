@@ -10,7 +10,7 @@ def analyze_training_data():
     print("🔍 Analyzing training data...")
 
     # Path ke file data
-    base_dir = Path(__file__).parent
+    base_dir = Path(__file__).parent.parent
     data_dir = base_dir / "data"
     names_file = data_dir / "names.pkl"
     faces_file = data_dir / "faces_data.pkl"
@@ -55,6 +55,12 @@ def analyze_training_data():
         if possible_dims:
             print(f"   Possible dimensions: {possible_dims}")
 
+        # Setelah diimpor, galeri yang dipakai; pickle tidak dibaca lagi
+        if (data_dir / "gallery" / "manifest.json").exists():
+            print("\n⚠️ Data is stored in data/gallery/ (the pickles are not used)")
+            print("💡 Re-register affected users with add_faces_rpi.py instead")
+            return False
+
         # Tanya apakah ingin memperbaiki
         fix = input(
             "\n❓ Would you like to fix the data by converting to 50x50? (y/n): "
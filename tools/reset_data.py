@@ -10,10 +10,16 @@ from pathlib import Path
 from datetime import datetime
 import csv
 
+# Registered faces live in the gallery store; the pickles are the pre-store
+# format it imports. The model artifact and voice clips are rebuilt from it.
+FACE_FILES = ["faces_data.pkl", "names.pkl"]
+GALLERY_DIR = "gallery"
+DERIVED_DIRS = ["model", "voice_cache"]
+
 
 class DataResetManager:
     def __init__(self):
-        self.base_dir = Path(__file__).parent
+        self.base_dir = Path(__file__).parent.parent
         self.data_dir = self.base_dir / "data"
         self.attendance_dir = self.base_dir / "Attendance"
         self.backup_dir = self.base_dir / "data_backup"
@@ -29,8 +35,7 @@ class DataResetManager:
         files_backed_up = []
 
         # Backup face recognition data
-        face_files = ["faces_data.pkl", "names.pkl"]
-        for filename in face_files:
+        for filename in FACE_FILES:
             file_path = self.data_dir / filename
             if file_path.exists():
                 backup_file = backup_path / filename
@@ -38,6 +43,12 @@ class DataResetManager:
                 files_backed_up.append(filename)
                 print(f"✅ Backed up: {filename}")
 
+        gallery_dir = self.data_dir / GALLERY_DIR
+        if gallery_dir.exists():
+            shutil.copytree(gallery_dir, backup_path / GALLERY_DIR)
+            files_backed_up.append(f"{GALLERY_DIR}/")
+            print(f"✅ Backed up: {GALLERY_DIR}/")
+
         # Backup attendance CSV files
         if self.attendance_dir.exists():
             attendance_backup = backup_path / "Attendance"
@@ -62,16 +73,23 @@ class DataResetManager:
         """Remove face recognition training data"""
         print("\n🧹 Cleaning face recognition data...")
 
-        face_files = ["faces_data.pkl", "names.pkl"]
         cleaned_files = []
 
-        for filename in face_files:
+        for filename in FACE_FILES:
             file_path = self.data_dir / filename
             if file_path.exists():
                 file_path.unlink()
                 cleaned_files.append(filename)
                 print(f"🗑️  Deleted: {filename}")
 
+        scratch_dirs = [path.name for path in self.data_dir.glob("model.*/")]
+        for dirname in [GALLERY_DIR] + DERIVED_DIRS + scratch_dirs:
+            dir_path = self.data_dir / dirname
+            if dir_path.exists():
+                shutil.rmtree(dir_path)
+                cleaned_files.append(f"{dirname}/")
+                print(f"🗑️  Deleted: {dirname}/")
+
         if cleaned_files:
             print(f"✅ Cleaned {len(cleaned_files)} face data files")
         else:
@@ -166,14 +184,24 @@ class DataResetManager:
         print(f"🔄 Restoring from backup: {backup_name}")
 
         # Restore face data
-        face_files = ["faces_data.pkl", "names.pkl"]
-        for filename in face_files:
+        for filename in FACE_FILES:
             backup_file = backup_path / filename
             if backup_file.exists():
                 target_file = self.data_dir / filename
                 shutil.copy2(backup_file, target_file)
                 print(f"✅ Restored: {filename}")
 
+        # The gallery store wins over the pickles, so it is replaced too; a
+        # backup without one (older backups) has its pickles imported instead
+        if (backup_path / GALLERY_DIR).exists() or any(
+            (backup_path / filename).exists() for filename in FACE_FILES
+        ):
+            for dirname in [GALLERY_DIR] + DERIVED_DIRS:
+                shutil.rmtree(self.data_dir / dirname, ignore_errors=True)
+            if (backup_path / GALLERY_DIR).exists():
+                shutil.copytree(backup_path / GALLERY_DIR, self.data_dir / GALLERY_DIR)
+                print(f"✅ Restored: {GALLERY_DIR}/")
+
         # Restore attendance data
         attendance_backup = backup_path / "Attendance"
         if attendance_backup.exists():
@@ -266,7 +294,10 @@ def main():
             print("❌ Reset dibatalkan")
 
     elif choice == "3":
-        print("\n⚠️  Ini akan menghapus data wajah (faces_data.pkl, names.pkl)")
+        print(
+            "\n⚠️  Ini akan menghapus data wajah "
+            "(gallery/, model/, faces_data.pkl, names.pkl)"
+        )
         confirm = input("Apakah Anda yakin? (y/n): ").strip().lower()
         if confirm == "y":
             manager.clean_face_data()
@@ -4,33 +4,32 @@ Test Attendance System
 Quick test to verify face recognition system is working properly
 """
 
-import pickle
+import sys
 import numpy as np
 from pathlib import Path
 from sklearn.neighbors import KNeighborsClassifier
 
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from gallery_store import GalleryStore
+
 class AttendanceSystemTester:
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent
         self.data_dir = self.base_dir / "data"
-        self.names_file = self.data_dir / "names.pkl"
-        self.faces_file = self.data_dir / "faces_data.pkl"
+        # Reads the gallery store, or the legacy pickles if not imported yet
+        self.gallery = GalleryStore(self.data_dir)
     
     def test_training_data_loading(self):
-        """Test if training data loads correctly like in take_attendance_touchscreen.py"""
+        """Test if training data loads correctly from the face gallery"""
         print("[TEST] Testing training data loading...")
         
-        if not self.names_file.exists() or not self.faces_file.exists():
+        if not self.gallery.exists():
             print("[ERROR] Training data not found!")
-            return False
+            return False, None
         
         try:
-            # Load data exactly like in take_attendance_touchscreen.py
-            with open(self.names_file, 'rb') as f:
-                labels = pickle.load(f)
-            
-            with open(self.faces_file, 'rb') as f:
-                faces_data = pickle.load(f)
+            faces_data, labels = self.gallery.load()
             
             # Train KNN classifier exactly like in the main system
             knn = KNeighborsClassifier(n_neighbors=5)
@@ -81,8 +80,7 @@ class AttendanceSystemTester:
         knn = model_data['knn_model']
         
         # Load test data
-        with open(self.faces_file, 'rb') as f:
-            faces_data = pickle.load(f)
+        faces_data, _ = self.gallery.load()
         
         # Test with random samples (simulating camera input)
         test_indices = [0, 10, 20, 30, 39]  # Test different samples
@@ -107,29 +105,17 @@ class AttendanceSystemTester:
         
         issues = []
         
-        # Check file existence
-        if not self.names_file.exists():
-            issues.append("names.pkl file missing")
-        if not self.faces_file.exists():
-            issues.append("faces_data.pkl file missing")
-        
-        # Check file sizes
-        if self.names_file.exists():
-            names_size = self.names_file.stat().st_size
-            if names_size < 50:
-                issues.append(f"names.pkl very small ({names_size} bytes)")
-        
-        if self.faces_file.exists():
-            faces_size = self.faces_file.stat().st_size
-            if faces_size < 1000:
-                issues.append(f"faces_data.pkl very small ({faces_size} bytes)")
+        # Check gallery existence and integrity
+        if not self.gallery.exists():
+            issues.append("Face gallery missing")
+        elif self.gallery.imported():
+            damaged = self.gallery.verify()
+            if damaged:
+                issues.append(f"Damaged gallery shards: {', '.join(damaged)}")
         
         # Check data consistency
         try:
-            with open(self.names_file, 'rb') as f:
-                names = pickle.load(f)
-            with open(self.faces_file, 'rb') as f:
-                faces = pickle.load(f)
+            faces, names = self.gallery.load()
             
             if len(names) != len(faces):
                 issues.append(f"Data mismatch: {len(names)} names vs {len(faces)} faces")